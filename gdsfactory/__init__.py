@@ -29,7 +29,7 @@ from gdsfactory.config import CONFIG, CONF, call_if_func
 from gdsfactory.port import Port
 from gdsfactory.cell import cell
 from gdsfactory.cell import cell_without_validator
-from gdsfactory.cell import clear_cache
+from gdsfactory.cell import clear_cache, get_cache, set_cache, set_disk_cache
 from gdsfactory.tech import LAYER
 from gdsfactory.show import show
 from gdsfactory.read.import_gds import import_gds
@@ -115,6 +115,7 @@ __all__ = (
     "functions",
     "geometry",
     "get_active_pdk",
+    "get_cache",
     "get_cell",
     "get_cells",
     "get_component",
@@ -132,6 +133,8 @@ __all__ = (
     "path",
     "read",
     "routing",
+    "set_cache",
+    "set_disk_cache",
     "show",
     "snap",
     "tech",
@@ -0,0 +1,461 @@
+"""Cache backends for the @cell decorator.
+
+By default the CACHE is unbounded, so every Component built stays in memory
+until you call `gf.clear_cache()`.
+
+For large builds (DOE sweeps, reticles) you can plug in a bounded cache that
+evicts the least recently used Components once a size or item limit is reached.
+
+.. code::
+
+    import gdsfactory as gf
+    from gdsfactory.cache import ComponentCache
+
+    gf.set_cache(ComponentCache(max_bytes=4e9))
+    c = gf.components.mzi()
+    print(gf.get_cache().stats)
+
+Components that are referenced by a live ComponentReference are pinned and
+never evicted, even if the parent that holds the reference is not cached (or was
+evicted), so rebuilding them can not produce two different cells with the same
+name.
+
+You can also share cells across processes (CI jobs, build farm workers) with an
+opt-in DiskCache, keyed by the cell function source code, its settings and the
+active PDK.
+
+.. code::
+
+    gf.set_disk_cache(gf.CONFIG["cache_directory"] / "cells")
+
+Cells are stored with pickle, so only point the DiskCache to a trusted directory.
+"""
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+from pydantic import BaseModel
+
+from gdsfactory.component import Component
+from gdsfactory.component_reference import has_referrers, register_referrer
+from gdsfactory.config import CONFIG, __version__, logger
+from gdsfactory.serialization import get_string
+
+_VERTEX_BYTES = 16  # x, y as float64
+_ARRAY_OVERHEAD = 112  # numpy array header
+_POLYGONSET_OVERHEAD = 200
+_REFERENCE_OVERHEAD = 500
+_PORT_OVERHEAD = 400
+_LABEL_OVERHEAD = 200
+_COMPONENT_OVERHEAD = 2000
+
+
+class CacheStats(BaseModel):
+    """Counters for a ComponentCache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def get_component_size(component: Component) -> int:
+    """Returns an estimate of the memory footprint of a Component in bytes.
+
+    Only counts the Component own geometry (polygon vertices, paths, labels),
+    references and ports. Referenced Components are cached separately.
+
+    Args:
+        component: to estimate.
+    """
+    nbytes = _COMPONENT_OVERHEAD
+
+    for polygonset in component.polygons:
+        nbytes += _POLYGONSET_OVERHEAD
+        for points in polygonset.polygons:
+            nbytes += len(points) * _VERTEX_BYTES + _ARRAY_OVERHEAD
+
+    for path in component.paths:
+        nbytes += _POLYGONSET_OVERHEAD
+        points = getattr(path, "points", None)
+        if points is not None:
+            nbytes += len(points) * _VERTEX_BYTES + _ARRAY_OVERHEAD
+
+    nbytes += len(component.references) * _REFERENCE_OVERHEAD
+    nbytes += len(component.ports) * _PORT_OVERHEAD
+    nbytes += len(component.labels) * _LABEL_OVERHEAD
+    return nbytes
+
+
+class ComponentCache(MutableMapping):
+    """Component cache with least recently used (LRU) eviction.
+
+    Args:
+        max_items: maximum number of Components. None for no limit.
+        max_bytes: maximum estimated memory in bytes. None for no limit.
+        get_size: function that estimates the footprint of a Component in bytes.
+
+    Components referenced by any live ComponentReference are pinned.
+    If all Components are pinned the cache can temporarily go over its limits.
+
+    Pinned Components found while evicting are set aside, so each insert only
+    checks the least recently used Components that were not pinned. The
+    Components set aside are checked again after as many inserts as there are
+    of them, so they are evicted a few inserts after their last reference dies.
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[float] = None,
+        get_size=get_component_size,
+    ) -> None:
+        """Initialize the cache."""
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.get_size = get_size
+        self.stats = CacheStats()
+        self.nbytes = 0
+
+        self._data: "OrderedDict[str, Component]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._keys_by_id: Dict[int, str] = {}
+        # keys not known to be pinned, from least to most recently used
+        self._unpinned: "OrderedDict[str, None]" = OrderedDict()
+        self._pinned: Dict[str, None] = {}
+        self._inserts_since_unpin = 0
+
+    def __getitem__(self, key: str) -> Component:
+        """Returns a Component. Does not change the LRU order."""
+        return self._data[key]
+
+    def get(self, key: str, default=None):
+        """Returns a Component, marks it as most recently used and updates counters."""
+        if key in self._data:
+            self.stats.hits += 1
+            self._data.move_to_end(key)
+            self._pinned.pop(key, None)
+            self._unpinned[key] = None
+            self._unpinned.move_to_end(key)
+            return self._data[key]
+        self.stats.misses += 1
+        return default
+
+    def __setitem__(self, key: str, component: Component) -> None:
+        """Adds a Component and evicts old ones if the cache is full."""
+        if key in self._data:
+            self._remove(key)
+
+        size = self.get_size(component) if self._is_bounded else 0
+        self._data[key] = component
+        self._sizes[key] = size
+        self._keys_by_id[id(component)] = key
+        self._unpinned[key] = None
+        self.nbytes += size
+
+        # references unpickled from disk or from another process skip __init__
+        for reference in component.references:
+            register_referrer(reference)
+
+        if self._is_bounded:
+            self.evict()
+
+    def __delitem__(self, key: str) -> None:
+        """Removes a Component from the cache."""
+        if key not in self._data:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over keys, from least to most recently used."""
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        """Returns the number of cached Components."""
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        """Returns True if key is cached. Does not change the LRU order."""
+        return key in self._data
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the cache."""
+        return (
+            f"{self.__class__.__name__}({len(self)} components, "
+            f"{self.nbytes} bytes, {self.stats})"
+        )
+
+    def clear(self) -> None:
+        """Removes all Components. Keeps the counters."""
+        self._data.clear()
+        self._sizes.clear()
+        self._keys_by_id.clear()
+        self._unpinned.clear()
+        self._pinned.clear()
+        self.nbytes = 0
+
+    @property
+    def _is_bounded(self) -> bool:
+        return self.max_items is not None or self.max_bytes is not None
+
+    def _is_full(self) -> bool:
+        return (self.max_items is not None and len(self._data) > self.max_items) or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        )
+
+    def has_component(self, component: Component) -> bool:
+        """Returns True if the Component object is cached under any key."""
+        return id(component) in self._keys_by_id
+
+    def is_pinned(self, key: str) -> bool:
+        """Returns True if the Component is referenced by a live reference."""
+        return has_referrers(self._data[key])
+
+    def evict(self) -> int:
+        """Evicts least recently used Components until the cache fits.
+
+        Returns the number of evicted Components.
+        """
+        evicted = 0
+        self._inserts_since_unpin += 1
+        if not self._is_full():
+            return evicted
+
+        if self._pinned and self._inserts_since_unpin >= len(self._pinned):
+            self._unpin()
+
+        while self._unpinned and self._is_full():
+            key = next(iter(self._unpinned))
+            if self.is_pinned(key):
+                del self._unpinned[key]
+                self._pinned[key] = None
+                continue
+            self._remove(key)
+            evicted += 1
+
+        self.stats.evictions += evicted
+        return evicted
+
+    def _unpin(self) -> None:
+        """Moves the keys that are no longer pinned back to the LRU order."""
+        self._inserts_since_unpin = 0
+        released = [key for key in self._pinned if not self.is_pinned(key)]
+        for key in reversed(released):
+            del self._pinned[key]
+            self._unpinned[key] = None
+            self._unpinned.move_to_end(key, last=False)
+
+    def _remove(self, key: str) -> None:
+        component = self._data.pop(key)
+        self._unpinned.pop(key, None)
+        self._pinned.pop(key, None)
+        self.nbytes -= self._sizes.pop(key)
+        if self._keys_by_id.get(id(component)) == key:
+            del self._keys_by_id[id(component)]
+
+
+class DiskCache:
+    """Persistent Component cache shared across processes.
+
+    Each cell is pickled (geometry, references, ports, info and settings) into
+    a file named by its key. Writes are atomic, so many processes can share the
+    same directory.
+
+    Args:
+        dirpath: directory to store the cells.
+    """
+
+    def __init__(self, dirpath: Optional[os.PathLike] = None) -> None:
+        """Initialize the cache."""
+        self.dirpath = pathlib.Path(dirpath or CONFIG["cache_directory"] / "cells")
+        self.dirpath.mkdir(exist_ok=True, parents=True)
+        self.stats = CacheStats()
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the cache."""
+        return f"{self.__class__.__name__}({str(self.dirpath)!r}, {self.stats})"
+
+    @staticmethod
+    def get_key(*values: Any) -> str:
+        """Returns a content hash for JSON serializable values.
+
+        Includes the gdsfactory version, as pickled cells depend on it.
+        """
+        key = get_string([__version__, *values])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get_filepath(self, key: str) -> pathlib.Path:
+        return self.dirpath / f"{key}.pkl"
+
+    def load(self, key: str, cache: Optional[MutableMapping] = None):
+        """Returns a locked Component from disk or None if key is not cached.
+
+        Args:
+            key: cell key.
+            cache: in-memory cache to reuse (and register) cells from the hierarchy.
+                Avoids two different cells with the same name.
+        """
+        filepath = self.get_filepath(key)
+        try:
+            component = pickle.loads(filepath.read_bytes())
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load {str(filepath)!r} from cache: {e}")
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        if cache is not None:
+            _merge_hierarchy(component, cache=cache, visited=set())
+        return component
+
+    def save(self, key: str, component: Component) -> None:
+        """Writes Component into the cache."""
+        filepath = self.get_filepath(key)
+        with tempfile.NamedTemporaryFile(
+            dir=self.dirpath, suffix=".tmp", delete=False
+        ) as f:
+            pickle.dump(component, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, filepath)
+
+    def clear(self) -> None:
+        """Deletes all cells from disk."""
+        for filepath in self.dirpath.glob("*.pkl"):
+            filepath.unlink()
+
+
+def merge_into_cache(component: Component, cache: MutableMapping) -> Component:
+    """Returns the cached Component with the same name or adds it to the cache.
+
+    Use it for Components built in another process (or loaded from disk), so
+    the cells in their hierarchy are shared with the ones already in cache.
+
+    Args:
+        component: to merge.
+        cache: for example the @cell CACHE.
+    """
+    from gdsfactory.cell import Settings
+
+    name = component.name
+    if name in cache:
+        return cache[name]
+    _merge_hierarchy(component, cache=cache, visited=set())
+    if isinstance(component.settings, Settings):
+        cache[name] = component
+    return component
+
+
+def _merge_hierarchy(component: Component, cache: MutableMapping, visited) -> None:
+    """Replaces cells loaded from disk by the ones already in cache.
+
+    Registers the new @cell Components (the ones with Settings) in the cache.
+    """
+    from gdsfactory.cell import Settings
+
+    for reference in component.references:
+        child = reference.parent
+        if id(child) in visited:
+            continue
+        name = child.name
+        cached = cache[name] if name in cache else None
+        if cached is not None and cached is not child:
+            reference.parent = cached
+            continue
+        visited.add(id(child))
+        _merge_hierarchy(child, cache=cache, visited=visited)
+        if cached is None and isinstance(child.settings, Settings):
+            cache[name] = child
+
+
+def test_component_cache_lru() -> None:
+    import gdsfactory as gf
+
+    cache = ComponentCache(max_items=2)
+    cache["a"] = gf.Component("a")
+    cache["b"] = gf.Component("b")
+    assert cache.get("a") is not None
+    cache["c"] = gf.Component("c")
+
+    assert list(cache) == ["a", "c"], list(cache)
+    assert cache.stats.evictions == 1
+    assert cache.get("b") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_component_cache_pinned() -> None:
+    import gdsfactory as gf
+
+    cache = ComponentCache(max_items=1)
+    child = gf.Component("child")
+    cache["child"] = child
+
+    parent = gf.Component("parent")
+    parent << child
+    cache["parent"] = parent
+
+    assert cache.is_pinned("child")
+    assert "child" in cache
+    assert "parent" not in cache, "parent is not referenced, so it is evicted"
+
+    del parent
+    import gc
+
+    gc.collect()
+    cache["other"] = gf.Component("other")
+    assert "child" not in cache
+    assert len(cache) == 1
+
+
+def test_component_cache_max_bytes() -> None:
+    import gdsfactory as gf
+
+    c1 = gf.Component("c1")
+    c1.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    size = get_component_size(c1)
+
+    cache = ComponentCache(max_bytes=size * 1.5)
+    cache["c1"] = c1
+    cache["c2"] = gf.Component("c2")
+    assert "c1" not in cache
+    assert cache.nbytes <= size * 1.5
+
+
+def test_disk_cache() -> None:
+    import gdsfactory as gf
+
+    cache = DiskCache(dirpath=pathlib.Path(tempfile.mkdtemp()))
+    c = gf.components.mzi()
+    key = cache.get_key("mzi", c.name)
+    assert cache.load(key) is None
+    cache.save(key, c)
+
+    memory = {c.references[0].parent.name: c.references[0].parent}
+    c2 = cache.load(key, cache=memory)
+    assert c2 is not c
+    assert c2.name == c.name
+    assert c2.hash_geometry() == c.hash_geometry()
+    assert list(c2.ports) == list(c.ports)
+    assert c2.settings == c.settings
+    assert c2.references[0].parent is c.references[0].parent
+    assert c2._locked
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+if __name__ == "__main__":
+    test_component_cache_lru()
+    test_component_cache_pinned()
+    test_component_cache_max_bytes()
+    test_disk_cache()
@@ -2,16 +2,21 @@
 import functools
 import hashlib
 import inspect
-from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from typing import Any, Callable, Dict, MutableMapping, Optional, Tuple, TypeVar
 
 import toolz
 from pydantic import BaseModel, validate_arguments
 
+from gdsfactory.cache import ComponentCache, DiskCache
 from gdsfactory.component import Component
 from gdsfactory.name import MAX_NAME_LENGTH, clean_name, get_name_short
+from gdsfactory.profiler import CellProfiler
 from gdsfactory.serialization import clean_dict, clean_value_name
+from gdsfactory.types import PathType
 
-CACHE: Dict[str, Component] = {}
+CACHE: ComponentCache = ComponentCache()
+DISK_CACHE: Optional[DiskCache] = None
+PROFILER: Optional[CellProfiler] = None
 
 INFO_VERSION = 2
 
@@ -21,9 +26,71 @@ class CellReturnTypeError(ValueError):
 
 
 def clear_cache() -> None:
-    """Clears Component CACHE."""
+    """Clears Component CACHE and the caches of imported GDS files."""
+    from gdsfactory.read.gds_index import clear_gds_index_cache
+    from gdsfactory.read.import_cache import clear_import_cache
+
+    CACHE.clear()
+    clear_import_cache()
+    clear_gds_index_cache()
+
+
+def get_cache() -> MutableMapping:
+    """Returns the Component CACHE backend."""
+    return CACHE
+
+
+def set_cache(cache: MutableMapping) -> None:
+    """Sets the Component CACHE backend.
+
+    .. code::
+
+        from gdsfactory.cache import ComponentCache, DiskCache
+
+        set_cache(ComponentCache(max_bytes=4e9))
+
+    Args:
+        cache: mapping of cell name to Component. For example a ComponentCache.
+    """
     global CACHE
-    CACHE = {}
+    CACHE = cache
+
+
+def set_disk_cache(dirpath: Optional[PathType] = None, enabled: bool = True) -> None:
+    """Enables a persistent on-disk cell cache shared across processes.
+
+    Cells are keyed by the function source code, the full settings and the
+    active PDK, so that a cache hit returns a locked Component without running
+    the cell function. Imported GDS cells are not cached on disk.
+
+    Args:
+        dirpath: directory for the cache. Defaults to CONFIG['cache_directory']/cells.
+        enabled: False disables the disk cache.
+    """
+    global DISK_CACHE
+    DISK_CACHE = DiskCache(dirpath) if enabled else None
+
+
+def set_profiler(profiler: Optional[CellProfiler]) -> None:
+    """Sets the profiler that records cell builds. None disables profiling."""
+    global PROFILER
+    PROFILER = profiler
+
+
+def _get_disk_cache_key(
+    func: Callable, name: str, full: Dict[str, Any], **kwargs
+) -> Optional[str]:
+    """Returns the DISK_CACHE key for a cell or None if it can not be cached."""
+    from gdsfactory.pdk import get_active_pdk
+
+    try:
+        source = get_source_code(func)
+    except (OSError, TypeError, ValueError):
+        return None
+    settings = clean_dict(dict(full))
+    return DISK_CACHE.get_key(
+        source, name, settings, get_active_pdk().name, clean_dict(kwargs)
+    )
 
 
 def print_cache() -> None:
@@ -58,6 +125,41 @@ class Settings(BaseModel):
     child: Optional[Dict[str, Any]] = None
 
 
+class CellSignature:
+    """Signature of a cell function, computed once per decorated function.
+
+    Stores the parameter names and the default values, both raw and
+    serialized, so that each call only serializes the arguments passed.
+    """
+
+    __slots__ = ("parameter_names", "parameters", "default", "default_names")
+
+    def __init__(self, func: Callable) -> None:
+        """Initialize from the function signature."""
+        sig = inspect.signature(func)
+        self.parameter_names = tuple(sig.parameters.keys())
+        self.parameters = frozenset(self.parameter_names)
+        self.default = {
+            p.name: p.default
+            for p in sig.parameters.values()
+            if p.default is not inspect.Parameter.empty
+        }
+        self.default_names = {
+            key: clean_value_name(value) for key, value in self.default.items()
+        }
+
+    @property
+    def accepts_any_kwargs(self) -> bool:
+        return bool(self.parameters & {"args", "kwargs", "settings"})
+
+
+def _is_cached(component: Component) -> bool:
+    """Returns True if the component is already in CACHE (under any name)."""
+    if isinstance(CACHE, ComponentCache):
+        return CACHE.has_component(component)
+    return any(v is component for v in CACHE.values())
+
+
 def cell_without_validator(func):
     """Decorator for Component functions.
 
@@ -66,11 +168,16 @@ def cell_without_validator(func):
 
     I recommend using @cell instead
     """
+    signature: Optional[CellSignature] = None
 
     @functools.wraps(func)
     def _cell(*args, **kwargs):
         from gdsfactory.pdk import get_active_pdk
 
+        nonlocal signature
+        if signature is None:
+            signature = CellSignature(func)
+
         with_hash = kwargs.pop("with_hash", False)
         autoname = kwargs.pop("autoname", True)
         name = kwargs.pop("name", None)
@@ -80,35 +187,18 @@ def cell_without_validator(func):
         prefix = kwargs.pop("prefix", func.__name__)
         max_name_length = kwargs.pop("max_name_length", MAX_NAME_LENGTH)
 
-        sig = inspect.signature(func)
-        args_as_kwargs = dict(zip(sig.parameters.keys(), args))
+        args_as_kwargs = dict(zip(signature.parameter_names, args))
         args_as_kwargs.update(kwargs)
 
-        default = {
-            p.name: p.default
-            for p in sig.parameters.values()
-            if p.default != inspect._empty
-        }
-
-        changed = args_as_kwargs
-        full = default.copy()
-        full.update(**args_as_kwargs)
-
-        default2 = default.copy()
-        changed2 = changed.copy()
-
-        # list of default args as strings
-        default_args_list = [
-            f"{key}={clean_value_name(default2[key])}" for key in sorted(default.keys())
-        ]
-        # list of explicitly passed args as strings
-        passed_args_list = [
-            f"{key}={clean_value_name(changed2[key])}" for key in sorted(changed.keys())
-        ]
-
         # get only the args which are explicitly passed and different from defaults
-        changed_arg_set = set(passed_args_list).difference(default_args_list)
-        changed_arg_list = sorted(changed_arg_set)
+        default_names = signature.default_names
+        changed_args = []
+        for key, value in args_as_kwargs.items():
+            value_name = clean_value_name(value)
+            if default_names.get(key) != value_name:
+                changed_args.append((f"{key}={value_name}", key))
+        changed_args.sort()
+        changed_arg_list = [carg for carg, _ in changed_args]
 
         # if any args were different from default, append a hash of those args.
         # else, keep only the base name
@@ -126,93 +216,130 @@ def cell_without_validator(func):
         else:
             name_signature = prefix
 
-        # filter the changed dictionary to only keep entries which have truly changed
-        changed_arg_names = [carg.split("=")[0] for carg in changed_arg_list]
-        changed = {k: changed[k] for k in changed_arg_names}
-
         name = name or name_signature
         decorator = kwargs.pop("decorator", get_active_pdk().default_decorator)
-        name = get_name_short(name, max_name_length=max_name_length)
+        if len(name) > max_name_length:
+            name = get_name_short(name, max_name_length=max_name_length)
 
-        if (
-            "args" not in sig.parameters
-            and "kwargs" not in sig.parameters
-            and "settings" not in sig.parameters
-        ):
+        if not signature.accepts_any_kwargs:
             for key in kwargs:
-                if key not in sig.parameters.keys():
+                if key not in signature.parameters:
                     raise TypeError(
                         f"{func.__name__!r}() got invalid argument {key!r}\n"
-                        f"valid arguments are {list(sig.parameters.keys())}"
+                        f"valid arguments are {list(signature.parameter_names)}"
                     )
 
-        if cache and name in CACHE:
-            # print(f"CACHE LOAD {name} {func.__name__}({named_args_string})")
-            return CACHE[name]
-        # print(f"BUILD {name} {func.__name__}({named_args_string})")
-
-        if not callable(func):
-            raise ValueError(
-                f"{func!r} is not callable! @cell decorator is only for functions"
-            )
-
-        component = func(*args, **kwargs)
-
-        # if the component is already in the cache, but under a different alias,
-        # make sure we use a copy, so we don't run into mutability errors
-        if id(component) in [id(v) for v in CACHE.values()]:
-            component = component.copy()
-
-        metadata_child = (
-            dict(component.child.settings) if hasattr(component, "child") else None
-        )
-
-        if not isinstance(component, Component):
-            raise CellReturnTypeError(
-                f"function {func.__name__!r} return type = {type(component)}",
-                "make sure that functions with @cell decorator return a Component",
-            )
-
-        if metadata_child and component.get_child_name:
-            component_name = f"{metadata_child.get('name')}_{name}"
-            component_name = get_name_short(
-                component_name, max_name_length=max_name_length
+        profiler = PROFILER
+        if cache:
+            component = CACHE.get(name)
+            if component is not None:
+                # print(f"CACHE LOAD {name} {func.__name__}({named_args_string})")
+                if profiler is not None:
+                    profiler.record_hit(func.__name__, name)
+                return component
+
+        if profiler is not None:
+            profiler_event = profiler.record_start(func.__name__, name)
+
+        try:
+            changed = {key: args_as_kwargs[key] for _, key in changed_args}
+            default = dict(signature.default)
+            full = {**default, **args_as_kwargs}
+
+            disk_cache_key = (
+                _get_disk_cache_key(
+                    func,
+                    name=name,
+                    full=full,
+                    info=info,
+                    flatten=flatten,
+                    decorator=decorator,
+                )
+                if cache and DISK_CACHE is not None
+                else None
             )
-        else:
-            component_name = name
-
-        if autoname and not hasattr(component, "imported_gds"):
-            component.name = component_name
-
-        if component.info is None:
-            component.info = {}
-
-        component.info.update(**info)
-
-        if not hasattr(component, "imported_gds"):
-            component.settings = Settings(
-                name=component_name,
-                module=func.__module__,
-                function_name=func.__name__,
-                changed=clean_dict(changed),
-                default=clean_dict(default),
-                full=clean_dict(full),
-                info=component.info,
-                child=metadata_child,
+            if disk_cache_key:
+                component = DISK_CACHE.load(disk_cache_key, cache=CACHE)
+                if component is not None:
+                    CACHE[name] = component
+                    if profiler is not None:
+                        profiler.record_stop(profiler_event, component)
+                    return component
+            # print(f"BUILD {name} {func.__name__}({named_args_string})")
+
+            if not callable(func):
+                raise ValueError(
+                    f"{func!r} is not callable! @cell decorator is only for functions"
+                )
+
+            component = func(*args, **kwargs)
+
+            # if the component is already in the cache, but under a different alias,
+            # make sure we use a copy, so we don't run into mutability errors
+            if _is_cached(component):
+                component = component.copy()
+
+            metadata_child = (
+                dict(component.child.settings) if hasattr(component, "child") else None
             )
 
-        if decorator:
-            if not callable(decorator):
-                raise ValueError(f"decorator = {type(decorator)} needs to be callable")
-            component_new = decorator(component)
-            component = component_new or component
-
-        if flatten:
-            component = component.flatten()
-
-        component.lock()
-        CACHE[name] = component
-        return component
+            if not isinstance(component, Component):
+                raise CellReturnTypeError(
+                    f"function {func.__name__!r} return type = {type(component)}",
+                    "make sure that functions with @cell decorator return a Component",
+                )
+
+            if metadata_child and component.get_child_name:
+                component_name = f"{metadata_child.get('name')}_{name}"
+                component_name = get_name_short(
+                    component_name, max_name_length=max_name_length
+                )
+            else:
+                component_name = name
+
+            if autoname and not hasattr(component, "imported_gds"):
+                component.name = component_name
+
+            if component.info is None:
+                component.info = {}
+
+            component.info.update(**info)
+
+            if not hasattr(component, "imported_gds"):
+                component.settings = Settings(
+                    name=component_name,
+                    module=func.__module__,
+                    function_name=func.__name__,
+                    changed=clean_dict(changed),
+                    default=clean_dict(default),
+                    full=clean_dict(full),
+                    info=component.info,
+                    child=metadata_child,
+                )
+
+            if decorator:
+                if not callable(decorator):
+                    raise ValueError(
+                        f"decorator = {type(decorator)} needs to be callable"
+                    )
+                component_new = decorator(component)
+                component = component_new or component
+
+            if flatten:
+                component = component.flatten()
+
+            component.lock()
+            CACHE[name] = component
+
+            if disk_cache_key and not hasattr(component, "imported_gds"):
+                DISK_CACHE.save(disk_cache_key, component)
+            if profiler is not None:
+                profiler.record_stop(profiler_event, component)
+            return component
+        except BaseException:
+            if profiler is not None:
+                profiler.record_error(profiler_event)
+            raise
 
     return _cell
 
@@ -2,11 +2,11 @@ import datetime
 import hashlib
 import itertools
 import math
-import os
 import pathlib
 import tempfile
 import uuid
 import warnings
+import weakref
 from collections import Counter
 from collections.abc import Iterable
 from pathlib import Path
@@ -26,6 +26,7 @@ from gdsfactory.cross_section import CrossSection
 from gdsfactory.layers import LAYER_COLORS, LayerColor, LayerColors
 from gdsfactory.port import (
     Port,
+    PortsDict,
     auto_rename_ports,
     auto_rename_ports_counter_clockwise,
     auto_rename_ports_layer_orientation,
@@ -75,6 +76,11 @@ tmp.mkdir(exist_ok=True, parents=True)
 _timestamp2019 = datetime.datetime.fromtimestamp(1572014192.8273)
 MAX_NAME_LENGTH = 32
 
+# child Component -> Components whose cached bounding box depends on it
+_BBOX_PARENTS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+# attributes of locked Components that are computed from their geometry
+_MEMOIZED = ("_geometry_hashes", "_spatial_index", "_netlists")
+
 
 def _rnd(arr, precision=1e-4):
     arr = np.ascontiguousarray(arr)
@@ -139,6 +145,16 @@ class Component(Device):
         self._reference_names_counter = Counter()
         self._reference_names_used = set()
 
+    @property
+    def ports(self) -> Dict[str, Port]:
+        """Returns the ports by name."""
+        return self._ports
+
+    @ports.setter
+    def ports(self, ports: Dict[str, Port]) -> None:
+        self._ports = PortsDict(ports)
+        Port._changes += 1
+
     def __lshift__(self, element):
         """Convenience operator equivalent to add_ref()."""
         return self.add_ref(element)
@@ -146,6 +162,8 @@ class Component(Device):
     def unlock(self) -> None:
         """Only do this if you know what you are doing."""
         self._locked = False
+        for attribute in _MEMOIZED:
+            self.__dict__.pop(attribute, None)
 
     def lock(self) -> None:
         """Makes sure components can't add new elements or move existing ones.
@@ -246,6 +264,123 @@ class Component(Device):
             bbox = ((0, 0), (0, 0))
         return np.round(bbox, 3)
 
+    @property
+    def _bb_valid(self) -> bool:
+        return self.__dict__.get("_bbox_valid", False)
+
+    @_bb_valid.setter
+    def _bb_valid(self, valid: bool) -> None:
+        """Invalidating the bounding box also invalidates the Components that reference this one."""
+        if valid:
+            self.__dict__["_bbox_valid"] = True
+            return
+
+        stack = [self]
+        while stack:
+            component = stack.pop()
+            component.__dict__["_bbox_valid"] = False
+            component.__dict__["_hull"] = None
+            for attribute in _MEMOIZED:
+                component.__dict__.pop(attribute, None)
+            parents = _BBOX_PARENTS.pop(component, ())
+            # an invalid parent already invalidated its own parents
+            stack.extend(parent for parent in parents if parent._bb_valid)
+
+    def _clear_memoized(self) -> None:
+        """Clears the memoized hashes, spatial index and netlists.
+
+        Also clears them in the Components that reference this one. Unlike
+        invalidating the bounding box, it keeps the subscriptions to children.
+        """
+        stack = [self]
+        visited = set()
+        while stack:
+            component = stack.pop()
+            if id(component) in visited:
+                continue
+            visited.add(id(component))
+            for attribute in _MEMOIZED:
+                component.__dict__.pop(attribute, None)
+            stack.extend(_BBOX_PARENTS.get(component, ()))
+
+    def get_bounding_box(self) -> Optional[np.ndarray]:
+        """Returns the bounding box [[xmin, ymin], [xmax, ymax]] or None if empty.
+
+        The bounding box is cached until the Component changes. Changes in any
+        Component it references invalidate the cache up the hierarchy, so
+        repeated queries do not traverse the hierarchy.
+        """
+        if not self._bb_valid:
+            bboxes = []
+            points = self._get_points()
+            if len(points):
+                bboxes.append((points.min(axis=0), points.max(axis=0)))
+            for reference in self.references:
+                bbox = reference.get_bounding_box()
+                if bbox is not None:
+                    bboxes.append(bbox)
+                if isinstance(reference.ref_cell, Component):
+                    _BBOX_PARENTS.setdefault(
+                        reference.ref_cell, weakref.WeakSet()
+                    ).add(self)
+            if bboxes:
+                bboxes = np.array(bboxes)
+                self._bounding_box = np.array(
+                    (bboxes[:, 0].min(axis=0), bboxes[:, 1].max(axis=0))
+                )
+            else:
+                self._bounding_box = None
+            self._bb_valid = True
+
+        if self._bounding_box is None:
+            return None
+        return np.array(self._bounding_box)
+
+    def _get_points(self) -> np.ndarray:
+        """Returns the vertices of the polygons and paths of this Component, without references."""
+        from gdsfactory.polygon_array import PolygonArray
+
+        points = []
+        for polygonset in self.polygons:
+            if isinstance(polygonset, PolygonArray):
+                points.append(polygonset.points)
+            else:
+                points.extend(polygonset.polygons)
+        for path in self.paths:
+            points.extend(path.to_polygonset().polygons)
+        return np.concatenate(points) if points else np.empty((0, 2))
+
+    def _get_hull(self) -> Optional[np.ndarray]:
+        """Returns the vertices of the convex hull of the Component or None if empty.
+
+        Cached together with the bounding box. References use it for the
+        bounding box of non-manhattan rotations.
+        """
+        from scipy.spatial import ConvexHull
+
+        if self.get_bounding_box() is None:
+            return None
+        hull = self.__dict__.get("_hull")
+        if hull is None:
+            points = [self._get_points()]
+            for reference in self.references:
+                parent = reference.ref_cell
+                if isinstance(reference, ComponentReference) and isinstance(
+                    parent, Component
+                ):
+                    child_hull = parent._get_hull()
+                    if child_hull is not None:
+                        points.extend(reference._transform_polygons([child_hull]))
+                else:
+                    points.extend(reference.get_polygons())
+            points = np.concatenate(points)
+            try:
+                hull = points[ConvexHull(points).vertices]
+            except Exception:  # fewer than 3 points or all collinear
+                hull = points
+            self.__dict__["_hull"] = hull
+        return hull
+
     @property
     def ports_layer(self) -> Dict[str, str]:
         """Returns a mapping from layer0_layer1_E0: portName."""
@@ -653,21 +788,37 @@ class Component(Device):
                     if keep_layer:
                         new_labels += [label]
                 D.labels = new_labels
+            D._clear_memoized()
         return self
 
     def extract(
         self,
         layers: Union[List[Tuple[int, int]], Tuple[int, int]] = (),
+        flatten: bool = True,
     ) -> "Component":
         """Extract polygons from a Component and returns a new Component.
 
         Adapted from phidl.geometry.
+
+        Args:
+            layers: list of layers to extract.
+            flatten: False keeps the hierarchy, filtering each unique cell once
+                (see gdsfactory.hierarchy.select_layers).
         """
         from gdsfactory.name import clean_value
 
-        component = Component(f"{self.name}_{clean_value(layers)}")
         if type(layers) not in (list, tuple):
             raise ValueError("layers needs to be a list or tuple")
+        if not flatten:
+            from gdsfactory.hierarchy import select_layers
+
+            component = select_layers(self, layers=layers)
+            if component is self:
+                component = self.copy()
+            component.name = f"{self.name}_{clean_value(layers)}"
+            return component
+
+        component = Component(f"{self.name}_{clean_value(layers)}")
         poly_dict = self.get_polygons(by_spec=True)
         parsed_layer_list = [_parse_layer(layer) for layer in layers]
         for layer, polys in poly_dict.items():
@@ -683,9 +834,65 @@ class Component(Device):
             layer: layer spec to add polygon on.
         """
         from gdsfactory.pdk import get_layer
+        from gdsfactory.polygon_array import PolygonArray
+
+        if isinstance(points, PolygonArray) and layer is np.nan:
+            if points.parent is None:
+                points.parent = self
+            elif points.parent is not self:
+                points = points.copy(parent=self)
+            self.add(points)
+            return points
 
         return super().add_polygon(points=points, layer=get_layer(layer))
 
+    def query(self, bbox, layers=None):
+        """Returns the polygons, references and ports that intersect a region.
+
+        Uses a spatial index per Component, cached for locked Components,
+        and only goes down the references that intersect the region.
+
+        Args:
+            bbox: ((xmin, ymin), (xmax, ymax)) region.
+            layers: only return polygons and ports on these layers. None returns all.
+
+        Returns:
+            ComponentQuery with polygons (dict of layer to polygons),
+            references and ports.
+        """
+        from gdsfactory.spatial_index import query
+
+        return query(self, bbox=bbox, layers=layers)
+
+    def compact_polygons(self) -> "Component":
+        """Stores the polygons of each layer in a single PolygonArray.
+
+        One contiguous vertex buffer per layer uses less memory than one
+        Polygon per polygon and makes whole-layer operations vectorized.
+        The geometry does not change, so it also works on locked Components.
+        """
+        from gdsfactory.polygon_array import compact_polygons
+
+        compact_polygons(self)
+        return self
+
+    def stats(self, sort_by: str = "gds_bytes", ascending: bool = False):
+        """Returns a pandas DataFrame with stats for each unique cell.
+
+        Polygons, vertices, estimated bytes in memory, number of placements in
+        the flattened layout and bytes in the GDS file of each cell, computed
+        without flattening. See gdsfactory.stats.
+
+        Args:
+            sort_by: column to sort by (name, placements, polygons, vertices,
+                references, ports, labels, nbytes, gds_bytes, flat_polygons,
+                flat_vertices).
+            ascending: sort order.
+        """
+        from gdsfactory.stats import get_dataframe
+
+        return get_dataframe(self, sort_by=sort_by, ascending=ascending)
+
     def copy(self) -> "Component":
         from gdsfactory.copy import copy
 
@@ -860,6 +1067,7 @@ class Component(Device):
                     alias = f"{prefix}_{self._reference_names_counter[prefix]}"
 
         reference.name = alias
+        self._reference_names_used.add(alias)
 
     def get_layers(self) -> Union[Set[Tuple[int, int]], Set[Tuple[int64, int64]]]:
         """Return a set of (layer, datatype).
@@ -1084,6 +1292,7 @@ class Component(Device):
         timestamp: Optional[datetime.datetime] = _timestamp2019,
         logging: bool = True,
         on_duplicate_cell: Optional[str] = "warn",
+        max_workers: Optional[int] = 1,
     ) -> Path:
         """Write component to GDS and returns gdspath.
 
@@ -1100,7 +1309,15 @@ class Component(Device):
                 "error": throw a ValueError when attempting to write a gds with duplicate cells.
                 "overwrite": overwrite all duplicate cells with one of the duplicates, without warning.
                 None: do not try to resolve (at your own risk!)
+            max_workers: number of processes to encode cells in parallel.
+                1 encodes them serially, None uses the number of CPUs.
+                The GDS file is the same in both cases.
+
+        Cells are written one at a time, children before parents, so memory
+        does not grow with the size of the GDS file.
         """
+        from gdsfactory.export.write_gds import write_gds
+
         gdsdir = (
             gdsdir or pathlib.Path(tempfile.TemporaryDirectory().name) / "gdsfactory"
         )
@@ -1110,43 +1327,15 @@ class Component(Device):
         gdsdir = gdspath.parent
         gdsdir.mkdir(exist_ok=True, parents=True)
 
-        cells = self.get_dependencies(recursive=True)
-        cell_names = [cell.name for cell in list(cells)]
-        cell_names_unique = set(cell_names)
-
-        if len(cell_names) != len(set(cell_names)):
-            for cell_name in cell_names_unique:
-                cell_names.remove(cell_name)
-
-            if on_duplicate_cell == "error":
-                raise ValueError(
-                    f"Duplicated cell names in {self.name!r}: {cell_names!r}"
-                )
-            elif on_duplicate_cell in {"warn", "overwrite"}:
-                if on_duplicate_cell == "warn":
-                    warnings.warn(
-                        f"Duplicated cell names in {self.name!r}:  {cell_names}",
-                    )
-                cells_dict = {cell.name: cell for cell in cells}
-                cells = cells_dict.values()
-            elif on_duplicate_cell is not None:
-                raise ValueError(
-                    f"on_duplicate_cell: {on_duplicate_cell!r} not in (None, warn, error, overwrite)"
-                )
-
-        all_cells = [self] + list(cells)
-
-        no_name_cells = [
-            cell.name for cell in all_cells if cell.name.startswith("Unnamed")
-        ]
-
-        if no_name_cells:
-            warnings.warn(
-                f"Component {self.name!r} contains {len(no_name_cells)} Unnamed cells"
-            )
-
-        lib = gdspy.GdsLibrary(unit=unit, precision=precision)
-        lib.write_gds(gdspath, cells=all_cells, timestamp=timestamp)
+        write_gds(
+            self,
+            gdspath,
+            unit=unit,
+            precision=precision,
+            timestamp=timestamp,
+            on_duplicate_cell=on_duplicate_cell,
+            max_workers=max_workers,
+        )
         self.path = gdspath
         if logging:
             logger.info(f"Write GDS to {str(gdspath)!r}")
@@ -1160,34 +1349,69 @@ class Component(Device):
         logger.info(f"Write YAML metadata to {str(metadata)!r}")
         return gdspath
 
-    def write_oas(self, filename, **write_kwargs) -> Path:
-        """Write component in OASIS format."""
+    def write_oas(
+        self,
+        filename,
+        unit: float = 1e-6,
+        precision: float = 1e-9,
+        logging: bool = True,
+        on_duplicate_cell: Optional[str] = "warn",
+        compression_level: int = 2,
+        write_cblocks: bool = True,
+        strict_mode: bool = True,
+        **write_kwargs,
+    ) -> Path:
+        """Write component in OASIS format.
+
+        Builds the klayout Layout in memory, without a temporary GDS file.
+
+        Args:
+            filename: OASIS file path.
+            unit: unit size for objects in library. 1um by default.
+            precision: for dimensions in the library (m). 1nm by default.
+            logging: disable OASIS path logging.
+            on_duplicate_cell: how to resolve duplicate-named cells.
+            compression_level: OASIS shape compression level (0-10).
+            write_cblocks: compress the cells with CBLOCK records.
+            strict_mode: write strict mode OASIS.
+
+        Keyword Args:
+            gdsdir, timestamp, max_workers: write_gds arguments, only used when
+                filename ends with .gds.
+        """
+        from gdsfactory.export.to_klayout import _import_klayout, to_klayout
+
+        invalid = set(write_kwargs) - {"gdsdir", "timestamp", "max_workers"}
+        if invalid:
+            raise TypeError(f"write_oas() got invalid arguments {sorted(invalid)}")
+
         if str(filename).lower().endswith(".gds"):
             # you are looking for write_gds
-            self.write_gds(filename, **write_kwargs)
+            self.write_gds(
+                filename,
+                unit=unit,
+                precision=precision,
+                logging=logging,
+                on_duplicate_cell=on_duplicate_cell,
+                **write_kwargs,
+            )
             return
-        try:
-            import klayout.db as pya
-        except ImportError as err:
-            err.args = (
-                "you need klayout package to write OASIS\n"
-                "pip install klayout\n" + err.args[0],
-            ) + err.args[1:]
-            raise
+        pya = _import_klayout()
+        filename = str(filename)
         if not filename.lower().endswith(".oas"):
             filename += ".oas"
-        fileroot = os.path.splitext(filename)[0]
-        tempfilename = f"{fileroot}-tmp.gds"
-
-        self.write_gds(tempfilename, **write_kwargs)
-        layout = pya.Layout()
-        layout.read(tempfilename)
-
-        # there can only be one top_cell because we only wrote one device
-        topcell = layout.top_cell()
-        topcell.write(filename)
-        os.remove(tempfilename)
-        logger.info(f"Write OASIS to {filename!r}")
+
+        layout = to_klayout(
+            self, unit=unit, precision=precision, on_duplicate_cell=on_duplicate_cell
+        )
+        options = pya.SaveLayoutOptions()
+        options.format = "OASIS"
+        options.oasis_compression_level = compression_level
+        options.oasis_write_cblocks = write_cblocks
+        options.oasis_strict_mode = strict_mode
+        layout.write(filename, options)
+        if logging:
+            logger.info(f"Write OASIS to {filename!r}")
         return Path(filename)
 
     def to_dict(
@@ -1425,34 +1649,109 @@ class Component(Device):
         self._bb_valid = False
         return self
 
-    def hash_geometry(self, precision: float = 1e-4) -> str:
+    def hash_geometry(self, precision: float = 1e-4, flat: bool = True) -> str:
         """Returns an SHA1 hash of the geometry in the Component.
 
         For each layer, each polygon is individually hashed and then the polygon hashes
         are sorted, to ensure the hash stays constant regardless of the ordering
         the polygons.  Similarly, the layers are sorted by (layer, datatype).
 
+        Locked Components memoize their hash until they or any Component they
+        reference change.
+
         Args:
             precision: Rounding precision for the the objects in the Component.
                 For instance, a precision of 1e-2 will round a point at
                 (0.124, 1.748) to (0.12, 1.75).
+            flat: hashes the flattened polygons, so the hash does not depend on
+                the hierarchy. False combines the hashes of the referenced
+                Components with the reference transformations and array
+                parameters, so after changing one cell only its branch is hashed
+                again. Equal hierarchical hashes imply equal flat hashes.
 
         """
-        polygons_by_spec = self.get_polygons(by_spec=True)
-        layers = np.array(list(polygons_by_spec.keys()))
-        sorted_layers = layers[np.lexsort((layers[:, 0], layers[:, 1]))]
-
-        final_hash = hashlib.sha1()
-        for layer in sorted_layers:
-            layer_hash = hashlib.sha1(layer.astype(np.int64)).digest()
-            polygons = polygons_by_spec[tuple(layer)]
-            polygons = [_rnd(p, precision) for p in polygons]
-            polygon_hashes = np.sort([hashlib.sha1(p).digest() for p in polygons])
-            final_hash.update(layer_hash)
-            for ph in polygon_hashes:
-                final_hash.update(ph)
-
-        return final_hash.hexdigest()
+        key = (precision, flat)
+        if self._locked:
+            # subscribe to changes in the referenced Components
+            self.get_bounding_box()
+            hashes = self.__dict__.setdefault("_geometry_hashes", {})
+            if key in hashes:
+                return hashes[key]
+
+        if flat:
+            final_hash = _hash_polygons(self.get_polygons(by_spec=True), precision)
+        else:
+            final_hash = self._hash_geometry_hierarchical(precision)
+
+        h = final_hash.hexdigest()
+        if self._locked:
+            hashes[key] = h
+        return h
+
+    def _hash_geometry_hierarchical(self, precision: float) -> "hashlib._Hash":
+        """Returns the hash of the own polygons and the references of the Component."""
+        polygons_by_spec: Dict[Tuple[int, int], List[np.ndarray]] = {}
+        for polygonset in itertools.chain(
+            self.polygons, (path.to_polygonset() for path in self.paths)
+        ):
+            for points, layer, datatype in zip(
+                polygonset.polygons, polygonset.layers, polygonset.datatypes
+            ):
+                polygons_by_spec.setdefault((layer, datatype), []).append(points)
+        final_hash = _hash_polygons(polygons_by_spec, precision)
+
+        reference_hashes = []
+        for reference in self.references:
+            parent = reference.ref_cell
+            if isinstance(parent, Component):
+                parent_hash = parent.hash_geometry(precision=precision, flat=False)
+            else:
+                parent_hash = _hash_polygons(
+                    parent.get_polygons(by_spec=True), precision
+                ).hexdigest()
+            h = hashlib.sha1(parent_hash.encode())
+            h.update(_rnd(np.asarray(reference.origin, dtype=float), precision))
+            h.update(
+                _rnd(
+                    np.array(
+                        (
+                            (reference.rotation or 0) % 360,
+                            reference.magnification or 1,
+                        )
+                    ),
+                    precision,
+                )
+            )
+            h.update(b"1" if reference.x_reflection else b"0")
+            if isinstance(reference, gdspy.CellArray):
+                h.update(np.array((reference.columns, reference.rows), dtype=np.int64))
+                h.update(_rnd(np.asarray(reference.spacing, dtype=float), precision))
+            reference_hashes.append(h.digest())
+
+        for h in sorted(reference_hashes):
+            final_hash.update(h)
+        return final_hash
+
+
+def _hash_polygons(
+    polygons_by_spec: Dict[Tuple[int, int], List[np.ndarray]], precision: float
+) -> "hashlib._Hash":
+    """Returns the SHA1 of the sorted polygon hashes of each layer."""
+    final_hash = hashlib.sha1()
+    if not polygons_by_spec:
+        return final_hash
+    layers = np.array(list(polygons_by_spec.keys()))
+    sorted_layers = layers[np.lexsort((layers[:, 0], layers[:, 1]))]
+
+    for layer in sorted_layers:
+        layer_hash = hashlib.sha1(layer.astype(np.int64)).digest()
+        polygons = polygons_by_spec[tuple(layer)]
+        polygons = [_rnd(p, precision) for p in polygons]
+        polygon_hashes = np.sort([hashlib.sha1(p).digest() for p in polygons])
+        final_hash.update(layer_hash)
+        for ph in polygon_hashes:
+            final_hash.update(ph)
+    return final_hash
 
 
 def test_get_layers() -> Component:
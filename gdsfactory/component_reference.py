@@ -1,5 +1,6 @@
 import typing
 import warnings
+import weakref
 from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
 import numpy as np
@@ -9,6 +10,7 @@ from phidl.device_layout import DeviceReference
 
 from gdsfactory.port import (
     Port,
+    PortArray,
     map_ports_layer_to_orientation,
     map_ports_to_orientation_ccw,
     map_ports_to_orientation_cw,
@@ -23,6 +25,19 @@ Number = Union[float64, int64, float, int]
 Coordinate = Union[Tuple[Number, Number], ndarray, List[Number]]
 Coordinates = Union[List[Coordinate], ndarray, List[Number], Tuple[Number, ...]]
 
+# Component -> live ComponentReferences that point to it
+_REFERRERS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def register_referrer(reference: "ComponentReference") -> None:
+    """Records that reference points to its parent Component."""
+    _REFERRERS.setdefault(reference.ref_cell, weakref.WeakSet()).add(reference)
+
+
+def has_referrers(component: "Component") -> bool:
+    """Returns True if any live ComponentReference points to component."""
+    return bool(_REFERRERS.get(component))
+
 
 class SizeInfo:
     def __init__(self, bbox: ndarray) -> None:
@@ -142,13 +157,14 @@ class ComponentReference(DeviceReference):
         )
         self._owner = None
         self._name = None
+        register_referrer(self)
 
         # The ports of a ComponentReference have their own unique id (uid),
         # since two ComponentReferences of the same parent Component can be
-        # in different locations and thus do not represent the same port
-        self._local_ports = {
-            name: port._copy(new_uid=True) for name, port in component.ports.items()
-        }
+        # in different locations and thus do not represent the same port.
+        # They are copied from the parent the first time ports are accessed
+        self._local_ports = {}
+        self._ports_cache = None
         self.visual_label = visual_label
         # self.uid = str(uuid.uuid4())[:8]
 
@@ -158,7 +174,23 @@ class ComponentReference(DeviceReference):
 
     @parent.setter
     def parent(self, value):
+        referrers = _REFERRERS.get(self.ref_cell)
+        if referrers is not None:
+            referrers.discard(self)
         self.ref_cell = value
+        register_referrer(self)
+
+    @property
+    def _bb_valid(self) -> bool:
+        return self.__dict__.get("_bb_valid", False)
+
+    @_bb_valid.setter
+    def _bb_valid(self, valid: bool) -> None:
+        """Transforming a reference clears the memoized caches of its owner."""
+        self.__dict__["_bb_valid"] = valid
+        owner = self.__dict__.get("_owner")
+        if not valid and owner is not None and hasattr(owner, "_clear_memoized"):
+            owner._clear_memoized()
 
     @property
     def owner(self):
@@ -182,7 +214,13 @@ class ComponentReference(DeviceReference):
     @name.setter
     def name(self, value: str):
         if value != self._name:
-            if self.owner and value in self.owner.named_references:
+            # names not used before in the owner can not clash, so skip
+            # building named_references for each new reference
+            if (
+                self.owner
+                and value in self.owner._reference_names_used
+                and value in self.owner.named_references
+            ):
                 raise ValueError(
                     f"This reference's owner already has a reference with name {value!r}. Please choose another name."
                 )
@@ -236,6 +274,23 @@ class ComponentReference(DeviceReference):
             bbox = ((0, 0), (0, 0))
         return np.round(bbox, 3)
 
+    def get_bounding_box(self) -> Optional[ndarray]:
+        """Returns the bounding box [[xmin, ymin], [xmax, ymax]] or None if empty.
+
+        Transforms the cached bounding box of the parent Component, or its
+        convex hull for non-manhattan rotations, instead of its polygons.
+        """
+        if self.rotation is None or self.rotation % 90 == 0:
+            return super().get_bounding_box()
+        if not hasattr(self.parent, "_get_hull"):
+            return super().get_bounding_box()
+
+        hull = self.parent._get_hull()
+        if hull is None:
+            return None
+        points = self._transform_polygons([hull])[0]
+        return np.array((points.min(axis=0), points.max(axis=0)))
+
     @classmethod
     def __get_validators__(cls):
         """Get validators."""
@@ -284,29 +339,46 @@ class ComponentReference(DeviceReference):
         """This property allows you to access myref.ports, and receive a copy.
 
         of the ports dict which is correctly rotated and translated.
+
+        The transformed ports are cached until the reference moves, rotates or
+        reflects (origin, rotation or x_reflection change) or some Component
+        ports change (added, removed, replaced, moved or resized), as counted by
+        Port._changes. Editing a port center array in place is not counted.
         """
-        for name, port in self.parent.ports.items():
-            port = self.parent.ports[name]
-            new_center, new_orientation = self._transform_port(
-                port.center,
-                port.orientation,
-                self.origin,
-                self.rotation,
-                self.x_reflection,
-            )
+        parent_ports = self.parent.ports
+        state = (
+            Port._changes,
+            None if self.origin is None else tuple(self.origin),
+            self.rotation,
+            self.x_reflection,
+        )
+        cache = self._ports_cache
+        if cache and cache[0] is parent_ports and cache[1] == state:
+            return self._local_ports
+
+        port_array = PortArray(parent_ports)
+        centers, orientations = port_array.transform(
+            self.origin, self.rotation, self.x_reflection
+        )
+        for name, port, center, orientation in zip(
+            port_array.keys, port_array.ports, centers, orientations
+        ):
             if name not in self._local_ports:
                 self._local_ports[name] = port.copy(new_uid=True)
-            self._local_ports[name].center = new_center
-            self._local_ports[name].orientation = (
-                mod(new_orientation, 360) if new_orientation else new_orientation
+            # sets the fields directly, so Port._changes only counts the
+            # changes to the ports of Components
+            local_port = self._local_ports[name]
+            local_port._center = center
+            local_port._orientation = (
+                None if port.orientation is None else orientation
             )
-            self._local_ports[name].parent = self
+            local_port._width = port.width
+            local_port.parent = self
         # Remove any ports that no longer exist in the reference's parent
-        parent_names = self.parent.ports.keys()
-        local_names = list(self._local_ports.keys())
-        for name in local_names:
-            if name not in parent_names:
+        for name in list(self._local_ports.keys()):
+            if name not in parent_ports:
                 self._local_ports.pop(name)
+        self._ports_cache = (parent_ports, (Port._changes, *state[1:]))
         return self._local_ports
 
     @property
@@ -668,6 +740,54 @@ def test_move():
     bend.move("o1", mzi.ports["o2"])
 
 
+def test_ports_cache():
+    import gdsfactory as gf
+
+    c = gf.Component()
+    mzi = c.add_ref(gf.components.mzi())
+    ref = c.add_ref(gf.components.mmi1x2())
+    ports = ref.ports
+    assert ref.ports is ports
+    o2 = ports["o2"].center.copy()
+
+    def transform_ports():
+        return {
+            name: ref._transform_port(
+                p.center, p.orientation, ref.origin, ref.rotation, ref.x_reflection
+            )
+            for name, p in ref.parent.ports.items()
+        }
+
+    for transform in [
+        lambda: ref.move((10, 5)),
+        lambda: ref.rotate(33, center="o1"),
+        lambda: ref.reflect_h("o1"),
+        lambda: ref.reflect_v(y0=3),
+        lambda: ref.connect("o1", mzi.ports["o2"]),
+        lambda: ref.mirror(),
+        lambda: setattr(ref, "origin", (0, 0)),
+    ]:
+        transform()
+        for name, (center, orientation) in transform_ports().items():
+            assert np.array_equal(ref.ports[name].center, center)
+            assert ref.ports[name].orientation == orientation
+    assert not np.array_equal(ports["o2"].center, o2)
+
+    parent = gf.components.straight().copy()
+    ref = c.add_ref(parent)
+    assert ref.ports["o2"].center.tolist() == [10, 0]
+    parent.ports["o2"].move((5, 0))
+    assert ref.ports["o2"].center.tolist() == [15, 0]
+    parent.ports["o2"].width = 2
+    assert ref.ports["o2"].width == 2
+    ports = ref.ports
+    parent.ports.pop("o1")
+    assert list(ref.ports) == ["o2"]
+    parent.ports = {"o3": parent.ports["o2"].copy(name="o3")}
+    assert list(ref.ports) == ["o3"]
+    assert ref.ports is ports
+
+
 if __name__ == "__main__":
     import gdsfactory as gf
 
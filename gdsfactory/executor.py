@@ -0,0 +1,149 @@
+"""Build independent cells in parallel with a process pool.
+
+Inside a `parallel_build` context, functions that build many independent cells
+(`pack`, `grid` and `from_yaml` instances) send them to a pool of worker
+processes. Each worker returns its locked Component, which is merged into the
+@cell CACHE under its deterministic name, reusing the cells already in cache.
+
+.. code::
+
+    import gdsfactory as gf
+    from gdsfactory.executor import parallel_build
+
+    specs = [gf.partial(gf.components.spiral_inner_io, length=length) for length in range(500, 5000, 500)]
+
+    with parallel_build(max_workers=8):
+        c = gf.pack(specs)
+
+Component specs need to be picklable: strings, dicts or functools.partial of
+module level functions. Components already built are used as they are.
+"""
+import contextlib
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from gdsfactory.component import Component
+from gdsfactory.serialization import clean_value_name
+from gdsfactory.types import ComponentSpec
+
+_EXECUTOR: Optional[Executor] = None
+
+
+def get_executor() -> Optional[Executor]:
+    """Returns the active build executor or None if building serially."""
+    return _EXECUTOR
+
+
+def _init_worker(pdk) -> None:
+    global _EXECUTOR
+    _EXECUTOR = None
+    pdk.activate()
+
+
+def _build_component(component: ComponentSpec) -> Component:
+    from gdsfactory.pdk import get_component
+
+    return get_component(component)
+
+
+@contextlib.contextmanager
+def parallel_build(max_workers: Optional[int] = None) -> Iterator[Executor]:
+    """Context manager that builds independent cells in a process pool.
+
+    Workers use the PDK that is active when entering the context.
+
+    Args:
+        max_workers: number of processes. Defaults to the number of CPUs.
+    """
+    from gdsfactory.pdk import get_active_pdk
+
+    global _EXECUTOR
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(get_active_pdk(),),
+    )
+    previous = _EXECUTOR
+    _EXECUTOR = executor
+    try:
+        yield executor
+    finally:
+        _EXECUTOR = previous
+        executor.shutdown()
+
+
+def get_components(
+    components: Sequence[ComponentSpec], executor: Optional[Executor] = None
+) -> List[Component]:
+    """Returns a list of Components from a list of component specs.
+
+    Builds them in parallel if there is an active executor (see parallel_build).
+    Identical specs are only built once.
+
+    Args:
+        components: list of component specs.
+        executor: defaults to the active one.
+    """
+    from gdsfactory.cache import merge_into_cache
+    from gdsfactory.cell import get_cache
+    from gdsfactory.pdk import get_component
+
+    executor = executor or _EXECUTOR
+    if executor is None or len(components) < 2:
+        return [get_component(component) for component in components]
+
+    futures: Dict[str, Future] = {}
+    keys: List[Optional[str]] = []
+    for component in components:
+        if isinstance(component, Component):
+            keys.append(None)
+            continue
+        key = clean_value_name(component)
+        if key not in futures:
+            futures[key] = executor.submit(_build_component, component)
+        keys.append(key)
+
+    cache = get_cache()
+    built = {key: merge_into_cache(f.result(), cache) for key, f in futures.items()}
+    return [
+        component if key is None else built[key]
+        for component, key in zip(components, keys)
+    ]
+
+
+def test_get_components_parallel() -> None:
+    import gdsfactory as gf
+    from gdsfactory.cell import get_cache
+
+    specs = [
+        gf.partial(gf.components.straight, length=length) for length in (1, 2, 3, 1)
+    ]
+    specs += ["mzi", dict(component="mmi2x2", settings=dict(length_mmi=7))]
+
+    with parallel_build(max_workers=2):
+        components = get_components(specs)
+
+    assert get_executor() is None
+    assert components[0] is components[3]
+    for spec, component in zip(specs, components):
+        assert gf.get_component(spec) is component
+
+    c = components[4]
+    child = c.references[0].parent
+    assert c._locked
+    assert child is get_cache()[child.name]
+
+
+def test_pack_parallel() -> None:
+    import gdsfactory as gf
+
+    specs = [gf.partial(gf.components.rectangle, size=(i, i)) for i in range(1, 5)]
+    with parallel_build(max_workers=2):
+        c1 = gf.pack(specs)[0]
+    c2 = gf.pack(specs)[0]
+    assert c1.hash_geometry() == c2.hash_geometry()
+
+
+if __name__ == "__main__":
+    test_get_components_parallel()
+    test_pack_parallel()
@@ -1,5 +1,6 @@
 from gdsfactory.export.to_3d import to_3d
+from gdsfactory.export.to_klayout import to_klayout
 from gdsfactory.export.to_np import to_np
 from gdsfactory.export.to_stl import to_stl
 
-__all__ = ("to_3d", "to_stl", "to_np")
+__all__ = ("to_3d", "to_stl", "to_np", "to_klayout")
@@ -0,0 +1,208 @@
+"""Convert a Component hierarchy into a klayout Layout in memory.
+
+Useful to write OASIS or run klayout DRC checks without writing and reading a
+temporary GDS file.
+
+.. code::
+
+    import gdsfactory as gf
+    from gdsfactory.export.to_klayout import to_klayout
+
+    layout = to_klayout(gf.components.mzi())
+    layout.write("mzi.oas")
+
+"""
+from typing import Dict, Optional, Tuple
+
+import gdspy
+import numpy as np
+
+from gdsfactory.component import Component
+from gdsfactory.export.write_gds import get_cells
+
+
+def _import_klayout():
+    try:
+        import klayout.db as pya
+    except ImportError as err:
+        err.args = (
+            "you need klayout package to export to klayout\n"
+            "pip install klayout\n" + err.args[0],
+        ) + err.args[1:]
+        raise
+    return pya
+
+
+def to_klayout(
+    component: Component,
+    unit: float = 1e-6,
+    precision: float = 1e-9,
+    on_duplicate_cell: Optional[str] = "warn",
+):
+    """Returns a klayout.db.Layout with the Component and its hierarchy.
+
+    Converts cells, polygons, paths (as polygons), labels, references and
+    arrays. Coordinates are rounded to the database unit like in write_gds.
+
+    Args:
+        component: to convert.
+        unit: unit size for objects in library. 1um by default.
+        precision: database unit (m). 1nm by default.
+        on_duplicate_cell: how to resolve duplicate-named cells (warn, error,
+            overwrite or None). See gdsfactory.export.write_gds.get_cells.
+    """
+    pya = _import_klayout()
+
+    multiplier = unit / precision
+    layout = pya.Layout()
+    layout.dbu = precision / unit
+
+    layers: Dict[Tuple[int, int], int] = {}
+
+    def get_layer_index(layer: int, datatype: int) -> int:
+        key = (layer, datatype)
+        if key not in layers:
+            layers[key] = layout.layer(layer, datatype)
+        return layers[key]
+
+    def to_polygon(points: np.ndarray):
+        xy = np.round(points * multiplier).astype(np.int64).tolist()
+        return pya.Polygon([pya.Point(x, y) for x, y in xy], True)
+
+    cell_indices: Dict[str, int] = {}
+    for cell in get_cells(
+        component, on_duplicate_cell=on_duplicate_cell, warn_unnamed=True
+    ):
+        kcell = layout.create_cell(cell.name)
+        cell_indices[cell.name] = kcell.cell_index()
+
+        polygonsets = list(cell.polygons)
+        polygonsets += [path.to_polygonset() for path in cell.paths]
+        for polygonset in polygonsets:
+            for points, layer, datatype in zip(
+                polygonset.polygons, polygonset.layers, polygonset.datatypes
+            ):
+                kcell.shapes(get_layer_index(layer, datatype)).insert(
+                    to_polygon(points)
+                )
+
+        for label in cell.labels:
+            x, y = np.round(np.asarray(label.position) * multiplier).astype(int)
+            rotation = label.rotation or 0
+            trans = pya.Trans(
+                int(round(rotation / 90)) % 4 if rotation % 90 == 0 else 0,
+                bool(label.x_reflection),
+                int(x),
+                int(y),
+            )
+            text = pya.Text(label.text, trans)
+            if label.magnification:
+                text.size = int(round(label.magnification * multiplier))
+            kcell.shapes(get_layer_index(label.layer, label.texttype)).insert(text)
+
+        for reference in cell.references:
+            parent = reference.ref_cell
+            name = parent.name if isinstance(parent, gdspy.Cell) else parent
+            kcell.insert(_get_instance(pya, reference, cell_indices[name], multiplier))
+
+    return layout
+
+
+def _get_instance(pya, reference, cell_index: int, multiplier: float):
+    """Returns a klayout CellInstArray for a gdspy CellReference or CellArray."""
+    x, y = np.round(np.asarray(reference.origin) * multiplier).astype(int).tolist()
+    rotation = reference.rotation or 0
+    mirror = bool(reference.x_reflection)
+    magnification = reference.magnification
+
+    if magnification in (None, 1) and rotation % 90 == 0:
+        trans = pya.Trans(int(round(rotation / 90)) % 4, mirror, x, y)
+    else:
+        trans = pya.ICplxTrans(magnification or 1, rotation, mirror, x, y)
+
+    if not isinstance(reference, gdspy.CellArray):
+        return pya.CellInstArray(cell_index, trans)
+
+    # array vectors are reflected and rotated but not magnified
+    angle = np.radians(rotation)
+    c, s = np.cos(angle), np.sin(angle)
+    sign = -1 if mirror else 1
+    sx, sy = np.asarray(reference.spacing) * multiplier
+    a = np.round((c * sx, s * sx)).astype(int).tolist()
+    b = np.round((-s * sy * sign, c * sy * sign)).astype(int).tolist()
+    return pya.CellInstArray(
+        cell_index,
+        trans,
+        pya.Vector(*a),
+        pya.Vector(*b),
+        reference.columns,
+        reference.rows,
+    )
+
+
+def test_to_klayout() -> None:
+    import gdsfactory as gf
+
+    c = gf.Component("to_klayout")
+    mzi = gf.components.mzi()
+    ref = c << mzi
+    ref.rotate(90)
+    ref.mirror()
+    c.add_ref(gf.components.bend_circular()).rotate(30)
+    array = c.add_array(gf.components.straight(), columns=3, rows=2, spacing=(20, 5))
+    array.rotate(90)
+    c.add_label("hi", position=(1, 2))
+
+    layout = to_klayout(c)
+    gdspath = c.write_gds()
+    pya = _import_klayout()
+    layout_gds = pya.Layout()
+    layout_gds.read(str(gdspath))
+
+    top = layout.top_cell()
+    top_gds = layout_gds.top_cell()
+    assert top.name == top_gds.name
+    for layer in c.get_layers():
+        region = pya.Region(top.begin_shapes_rec(layout.layer(*layer)))
+        region_gds = pya.Region(top_gds.begin_shapes_rec(layout_gds.layer(*layer)))
+        assert (region ^ region_gds).is_empty(), layer
+
+
+def test_write_oas(tmp_path) -> None:
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    oaspath = c.write_oas(tmp_path / "mzi")
+    assert oaspath.suffix == ".oas"
+    assert [p.name for p in tmp_path.iterdir()] == ["mzi.oas"]
+
+    pya = _import_klayout()
+    layout = pya.Layout()
+    layout.read(str(oaspath))
+    assert layout.top_cell().name == c.name
+    assert layout.cells() == len(c.get_dependencies(recursive=True)) + 1
+
+
+def test_write_oas_kwargs(tmp_path) -> None:
+    import pytest
+
+    import gdsfactory as gf
+
+    c = gf.components.straight()
+    oaspath = c.write_oas(tmp_path / "straight.oas", precision=1e-10, timestamp=None)
+    pya = _import_klayout()
+    layout = pya.Layout()
+    layout.read(str(oaspath))
+    assert abs(layout.dbu - 1e-4) < 1e-12
+
+    c.write_oas(tmp_path / "straight.gds", precision=1e-10)
+    layout_gds = pya.Layout()
+    layout_gds.read(str(tmp_path / "straight.gds"))
+    assert abs(layout_gds.dbu - 1e-4) < 1e-12
+
+    with pytest.raises(TypeError):
+        c.write_oas(tmp_path / "straight.oas", with_metadata=True)
+
+
+if __name__ == "__main__":
+    test_to_klayout()
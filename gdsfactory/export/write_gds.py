@@ -0,0 +1,264 @@
+"""Streaming GDS writer.
+
+Walks the hierarchy bottom-up and encodes each cell straight into a buffered
+file, so memory does not grow with the size of the GDS file. Cells are written
+children first, in a deterministic order, to a temporary file that replaces
+`gdspath` when done.
+
+With `max_workers` > 1 the cells are encoded in a pool of forked processes and
+written in the same order, so the file is byte-identical to the serial one.
+"""
+import datetime
+import io
+import multiprocessing
+import os
+import pathlib
+import struct
+import warnings
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence
+
+import gdspy
+from gdspy.library import _eight_byte_real
+
+from gdsfactory.component import Component, _timestamp2019
+from gdsfactory.types import PathType
+
+
+def get_cells(
+    component: Component,
+    on_duplicate_cell: Optional[str] = "warn",
+    warn_unnamed: bool = False,
+) -> Iterator[gdspy.Cell]:
+    """Yields the cells of a Component hierarchy, children before parents.
+
+    Args:
+        component: top cell, yielded last.
+        on_duplicate_cell: how to resolve duplicate-named cells.
+            "warn": yields only the first cell of each name and warns.
+            "error": raises a ValueError.
+            "overwrite": yields only the first cell of each name.
+            None: yields all cells.
+        warn_unnamed: warns if some cells are Unnamed, for the GDS writers.
+    """
+    if on_duplicate_cell not in {None, "warn", "error", "overwrite"}:
+        raise ValueError(
+            f"on_duplicate_cell: {on_duplicate_cell!r} not in (None, warn, error, overwrite)"
+        )
+
+    visited = {id(component)}
+    names = set()
+    duplicates: List[str] = []
+    unnamed = 0
+    stack = [(component, iter(component.references))]
+
+    while stack:
+        cell, references = stack[-1]
+        for reference in references:
+            child = reference.ref_cell
+            if isinstance(child, gdspy.Cell) and id(child) not in visited:
+                visited.add(id(child))
+                stack.append((child, iter(child.references)))
+                break
+        else:
+            stack.pop()
+            if cell.name.startswith("Unnamed"):
+                unnamed += 1
+            if cell.name in names and cell is not component:
+                duplicates.append(cell.name)
+                if on_duplicate_cell == "error":
+                    raise ValueError(
+                        f"Duplicated cell names in {component.name!r}: {duplicates!r}"
+                    )
+                if on_duplicate_cell is not None:
+                    continue
+            names.add(cell.name)
+            yield cell
+
+    if duplicates and on_duplicate_cell == "warn":
+        warnings.warn(
+            f"Duplicated cell names in {component.name!r}:  {duplicates}",
+        )
+    if unnamed and warn_unnamed:
+        warnings.warn(f"Component {component.name!r} contains {unnamed} Unnamed cells")
+
+
+def write_library_header(
+    outfile,
+    name: str = "library",
+    unit: float = 1e-6,
+    precision: float = 1e-9,
+    timestamp: Optional[datetime.datetime] = _timestamp2019,
+) -> None:
+    """Writes the GDS HEADER, BGNLIB, LIBNAME and UNITS records."""
+    now = datetime.datetime.today() if timestamp is None else timestamp
+    name = name if len(name) % 2 == 0 else f"{name}\0"
+    date = (now.year, now.month, now.day, now.hour, now.minute, now.second)
+    outfile.write(
+        struct.pack(">5H12h", 6, 0x0002, 0x0258, 28, 0x0102, *date, *date)
+        + struct.pack(">2H", 4 + len(name), 0x0206)
+        + name.encode("ascii")
+        + struct.pack(">2H", 20, 0x0305)
+        + _eight_byte_real(precision / unit)
+        + _eight_byte_real(precision)
+    )
+
+
+def encode_cell(
+    cell: gdspy.Cell,
+    multiplier: float,
+    timestamp: Optional[datetime.datetime] = _timestamp2019,
+) -> bytes:
+    """Returns the GDS records of a cell."""
+    buffer = io.BytesIO()
+    cell.to_gds(buffer, multiplier, timestamp=timestamp)
+    return buffer.getvalue()
+
+
+# cells to encode, inherited by the forked worker processes
+_CELLS: Sequence[gdspy.Cell] = ()
+
+
+def _encode_cells(
+    start: int,
+    stop: int,
+    multiplier: float,
+    timestamp: Optional[datetime.datetime],
+) -> bytes:
+    return b"".join(
+        encode_cell(cell, multiplier, timestamp) for cell in _CELLS[start:stop]
+    )
+
+
+def _get_executor(max_workers: int) -> Executor:
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("fork")
+        )
+    # without fork the cells would need to be pickled with all their children
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _encode_parallel(
+    cells: Sequence[gdspy.Cell],
+    multiplier: float,
+    timestamp: Optional[datetime.datetime],
+    max_workers: int,
+) -> Iterator[bytes]:
+    """Yields the GDS records of chunks of cells, in order."""
+    global _CELLS
+    _CELLS = cells
+    chunk_size = max(1, -(-len(cells) // (8 * max_workers)))
+    try:
+        with _get_executor(max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _encode_cells,
+                    start,
+                    min(start + chunk_size, len(cells)),
+                    multiplier,
+                    timestamp,
+                )
+                for start in range(0, len(cells), chunk_size)
+            ]
+            for future in futures:
+                yield future.result()
+    finally:
+        _CELLS = ()
+
+
+def write_gds(
+    component: Component,
+    gdspath: PathType,
+    unit: float = 1e-6,
+    precision: float = 1e-9,
+    timestamp: Optional[datetime.datetime] = _timestamp2019,
+    on_duplicate_cell: Optional[str] = "warn",
+    buffer_size: int = 2**20,
+    max_workers: Optional[int] = 1,
+) -> pathlib.Path:
+    """Writes a Component and its hierarchy to GDS, one cell at a time.
+
+    Args:
+        component: to write.
+        gdspath: GDS file path.
+        unit: unit size for objects in library. 1um by default.
+        precision: for dimensions in the library (m). 1nm by default.
+        timestamp: Defaults to 2019-10-25 for consistent hash.
+            If None uses current time.
+        on_duplicate_cell: how to resolve duplicate-named cells (warn, error,
+            overwrite or None). See get_cells.
+        buffer_size: file buffer size in bytes.
+        max_workers: number of processes to encode cells in parallel.
+            1 encodes them serially, None uses the number of CPUs.
+    """
+    gdspath = pathlib.Path(gdspath)
+    multiplier = unit / precision
+    tmppath = gdspath.with_name(f"{gdspath.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmppath, "wb", buffering=buffer_size) as outfile:
+            write_library_header(
+                outfile, unit=unit, precision=precision, timestamp=timestamp
+            )
+            cells = get_cells(
+                component, on_duplicate_cell=on_duplicate_cell, warn_unnamed=True
+            )
+            if max_workers == 1:
+                for cell in cells:
+                    cell.to_gds(outfile, multiplier, timestamp=timestamp)
+            else:
+                for records in _encode_parallel(
+                    list(cells),
+                    multiplier,
+                    timestamp=timestamp,
+                    max_workers=max_workers or os.cpu_count(),
+                ):
+                    outfile.write(records)
+            outfile.write(struct.pack(">2H", 4, 0x0400))
+        os.replace(tmppath, gdspath)
+    except BaseException:
+        try:
+            tmppath.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    return gdspath
+
+
+def test_write_gds(tmp_path) -> None:
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    gdspath = write_gds(c, tmp_path / "mzi.gds")
+    lib = gdspy.GdsLibrary(infile=gdspath)
+    assert lib.top_level()[0].name == c.name
+    assert {cell.name for cell in c.get_dependencies(recursive=True)} | {
+        c.name
+    } == set(lib.cells)
+
+    c2 = gf.import_gds(gdspath)
+    assert c2.hash_geometry(precision=1e-3) == c.hash_geometry(precision=1e-3)
+
+
+def test_write_gds_parallel(tmp_path) -> None:
+    import gdsfactory as gf
+
+    c = gf.components.mzi_lattice()
+    gdspath1 = write_gds(c, tmp_path / "serial.gds")
+    gdspath2 = write_gds(c, tmp_path / "parallel.gds", max_workers=2)
+    assert gdspath1.read_bytes() == gdspath2.read_bytes()
+
+
+def test_write_gds_duplicated_cells(tmp_path) -> None:
+    import pytest
+
+    import gdsfactory as gf
+
+    c = gf.Component("duplicated")
+    c << gf.Component("a")
+    c << gf.Component("a")
+    with pytest.raises(ValueError):
+        write_gds(c, tmp_path / "c.gds", on_duplicate_cell="error")
+    assert not list(tmp_path.glob("*"))
+    with pytest.warns(UserWarning):
+        write_gds(c, tmp_path / "c.gds")
@@ -19,7 +19,9 @@ def xor_polygons(A: Component, B: Component, hash_geometry: bool = True):
 
     """
     # first do a geometry hash to vastly speed up if they are equal
-    if hash_geometry and (A.hash_geometry() == B.hash_geometry()):
+    # the hierarchical hash is cheaper and equal hierarchies have equal geometry.
+    # Different hierarchies go straight to the XOR, that flattens them anyway
+    if hash_geometry and A.hash_geometry(flat=False) == B.hash_geometry(flat=False):
         return Component()
 
     D = Component()
@@ -1,6 +1,7 @@
 from typing import Tuple
 
 from gdsfactory.component import Component
+from gdsfactory.export.to_klayout import to_klayout
 from gdsfactory.types import ComponentOrPath
 
 
@@ -31,7 +32,7 @@ def check_space(
     ction". If you don't want to specify one limit, pass nil to the respective value.
 
     Args:
-        gdspath: path to GDS or Component.
+        gdspath: path to GDS, Component or klayout Layout.
         layer: tuple.
         min_space: in um.
         dbu: database units (1000 um/nm).
@@ -46,10 +47,12 @@ def check_space(
     import klayout.db as pya
 
     if isinstance(gdspath, Component):
-        gdspath.flatten()
-        gdspath = gdspath.write_gds()
-    layout = pya.Layout()
-    layout.read(str(gdspath))
+        layout = to_klayout(gdspath)
+    elif isinstance(gdspath, pya.Layout):
+        layout = gdspath
+    else:
+        layout = pya.Layout()
+        layout.read(str(gdspath))
     cell = layout.top_cell()
     region = pya.Region(cell.begin_shapes_rec(layout.layer(layer[0], layer[1])))
 
@@ -2,6 +2,7 @@ from pathlib import Path
 from typing import Tuple, Union
 
 from gdsfactory.component import Component
+from gdsfactory.export.to_klayout import to_klayout
 
 
 def check_width(
@@ -13,7 +14,7 @@ def check_width(
     """Reads layer from top cell and returns a number of edges violating min width.
 
     Args:
-        gdspath: path to GDS or Component.
+        gdspath: path to GDS, Component or klayout Layout.
         layer: tuple (int, int).
         min_width: in um.
         dbu: database units (1000 um/nm).
@@ -23,10 +24,12 @@ def check_width(
     from gdsfactory.component import Component
 
     if isinstance(gdspath, Component):
-        gdspath.flatten()
-        gdspath = gdspath.write_gds()
-    layout = pya.Layout()
-    layout.read(str(gdspath))
+        layout = to_klayout(gdspath)
+    elif isinstance(gdspath, pya.Layout):
+        layout = gdspath
+    else:
+        layout = pya.Layout()
+        layout.read(str(gdspath))
     cell = layout.top_cell()
     region = pya.Region(cell.begin_shapes_rec(layout.layer(layer[0], layer[1])))
     # print(region)
@@ -1,9 +1,14 @@
+from typing import Dict, List, Optional, Tuple
+
 import gdspy as gp
+import numpy as np
 from numpy import float64
 
 from gdsfactory.component import Component
 from gdsfactory.geometry.functions import area
-from gdsfactory.types import Dict, Layer, Tuple
+from gdsfactory.types import Layer
+
+_TOLERANCE = 1e-6
 
 
 def bucket_cells_by_rank(cells):
@@ -45,22 +50,112 @@ def get_polygons_on_layer(c, layer):
     return polygons
 
 
+def _get_union_area(polygons) -> float:
+    if not polygons:
+        return 0
+    joined_polys = gp.boolean(polygons, None, operation="or")
+    return sum(abs(area(p)) for p in joined_polys.polygons) if joined_polys else 0
+
+
+def _get_reference_bbox(reference, bbox: np.ndarray) -> Tuple[np.ndarray, bool]:
+    """Returns the bbox of a reference and whether its array elements overlap.
+
+    Args:
+        reference: ComponentReference or CellArray.
+        bbox: bbox of the referenced cell.
+    """
+    mag = reference.magnification or 1
+    pmin, pmax = bbox * mag
+    overlap = False
+    if isinstance(reference, gp.CellArray):
+        spacing = np.array(reference.spacing, dtype=float)
+        size = pmax - pmin
+        counts = np.array((reference.columns, reference.rows))
+        overlap = bool(
+            np.any((counts > 1) & (np.abs(spacing) < size - _TOLERANCE))
+        )
+        extent = spacing * (counts - 1)
+        pmin = pmin + np.minimum(extent, 0)
+        pmax = pmax + np.maximum(extent, 0)
+
+    points = np.array([pmin, (pmax[0], pmin[1]), pmax, (pmin[0], pmax[1])])
+    if reference.x_reflection:
+        points[:, 1] = -points[:, 1]
+    if reference.rotation:
+        angle = np.radians(reference.rotation)
+        c, s = np.cos(angle), np.sin(angle)
+        points = points @ np.array(((c, s), (-s, c)))
+    points = points + np.asarray(reference.origin, dtype=float)
+    return np.array((points.min(axis=0), points.max(axis=0))), overlap
+
+
+def _has_overlaps(bboxes: List[np.ndarray]) -> bool:
+    """Returns True if any two bboxes overlap by more than _TOLERANCE."""
+    from gdsfactory.spatial_index import SpatialIndex
+
+    if len(bboxes) < 2:
+        return False
+    bboxes = np.array([bbox.ravel() for bbox in bboxes])
+    index = SpatialIndex(bboxes)
+    return any(
+        len(index.query((bbox[:2] + _TOLERANCE, bbox[2:] - _TOLERANCE))) > 1
+        for bbox in bboxes
+    )
+
+
 def compute_area(component: Component, layer: Layer) -> float64:
-    """Returns Computed area of the component for a given layer."""
-    c = component.copy()
-    c.flatten()
-    polys_by_spec = c.get_polygons(by_spec=True)
-    _area = 0
-    for layer_polygons, polys in polys_by_spec.items():
-        # print(layer)
-        if layer_polygons == layer:
-            joined_polys = gp.boolean(polys, None, operation="or")
-            # print(joined_polys)
-            try:
-                _area += sum(abs(area(p)) for p in joined_polys.polygons)
-            except BaseException:
-                print(f"Warning, {c.name} joinedpoly {joined_polys} could not be added")
-    return _area
+    """Returns Computed area of the component for a given layer.
+
+    Computes the area of each unique cell once, without flattening. The areas
+    of references that do not overlap each other are added up (scaled by the
+    magnification and the number of array elements). Only the cells where the
+    layer bounding boxes of the references or own polygons overlap are
+    flattened, to compute the area of the union of their polygons.
+    """
+    from gdsfactory.export.write_gds import get_cells
+
+    layer = tuple(layer)
+    # cell: (area, bbox of the layer)
+    cell_to_area: Dict[int, Tuple[float, Optional[np.ndarray]]] = {}
+
+    for cell in get_cells(component, on_duplicate_cell=None):
+        polygons = get_polygons_on_layer(cell, layer)
+        for path in cell.paths:
+            polygons += path.get_polygons(by_spec=True).get(layer, [])
+
+        _area = 0
+        bboxes = []
+        if polygons:
+            _area += _get_union_area(polygons)
+            points = np.concatenate(polygons)
+            bboxes.append(np.array((points.min(axis=0), points.max(axis=0))))
+
+        overlap = False
+        for ref in cell.references:
+            ref_area, ref_bbox = cell_to_area[id(ref.ref_cell)]
+            if ref_bbox is None:
+                continue
+            bbox, array_overlap = _get_reference_bbox(ref, ref_bbox)
+            bboxes.append(bbox)
+            overlap = overlap or array_overlap
+            n = ref.columns * ref.rows if isinstance(ref, gp.CellArray) else 1
+            _area += ref_area * (ref.magnification or 1) ** 2 * n
+
+        if cell.references and (overlap or _has_overlaps(bboxes)):
+            _area = _get_union_area(cell.get_polygons(by_spec=layer))
+
+        bbox = (
+            np.array(
+                (
+                    np.min([b[0] for b in bboxes], axis=0),
+                    np.max([b[1] for b in bboxes], axis=0),
+                )
+            )
+            if bboxes
+            else None
+        )
+        cell_to_area[id(cell)] = (_area, bbox)
+    return cell_to_area[id(component)][0]
 
 
 def compute_area_hierarchical(
@@ -142,6 +237,23 @@ def test_compute_area() -> None:
     assert int(compute_area(c, layer=(1, 0))) == 148, int(compute_area(c, layer=(1, 0)))
 
 
+def test_compute_area_overlaps() -> None:
+    import gdsfactory as gf
+
+    rectangle = gf.components.rectangle(size=(2, 1), layer=(1, 0))
+    c = gf.Component("compute_area_overlaps")
+    c.add_array(rectangle, columns=3, rows=2, spacing=(2, 1)).rotate(30)
+    assert np.isclose(compute_area(c, layer=(1, 0)), 12)
+
+    c2 = gf.Component("compute_area_overlapping_array")
+    c2.add_array(rectangle, columns=3, rows=1, spacing=(1, 0))
+    assert np.isclose(compute_area(c2, layer=(1, 0)), 4)
+
+    ref = c2 << rectangle
+    ref.move((3, 0.5))
+    assert np.isclose(compute_area(c2, layer=(1, 0)), 5.5)
+
+
 def test_compute_area_hierarchical() -> None:
     import gdsfactory as gf
 
@@ -152,6 +264,7 @@ def test_compute_area_hierarchical() -> None:
 
 
 if __name__ == "__main__":
+    test_compute_area_overlaps()
     test_compute_area_hierarchical()
     # test_compute_area()
     # import gdsfactory as gf
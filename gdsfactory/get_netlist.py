@@ -1,6 +1,7 @@
 """Extract netlist from component port connectivity.
 
-Assumes two ports are connected when they have same width, x, y
+Assumes two ports are connected when they have the same port type and width,
+and their centers are closer than a tolerance.
 
 .. code:: yaml
 
@@ -16,18 +17,49 @@ Assumes two ports are connected when they have same width, x, y
 
 """
 
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy as np
 import omegaconf
+from pydantic import BaseModel, Extra
 
 from gdsfactory.component import Component, ComponentReference
 from gdsfactory.name import clean_name
 from gdsfactory.pdk import get_layer
+from gdsfactory.port import Port, PortArray
 from gdsfactory.serialization import clean_value_json
 from gdsfactory.snap import snap_to_grid
 from gdsfactory.types import LayerSpec
 
 
+class PortMismatch(BaseModel):
+    """Two ports at the same position that do not match.
+
+    Args:
+        kind: width (ports are not connected) or orientation (connected ports
+            that do not face each other).
+        port1: instance_name,port_name or top level port name.
+        port2: instance_name,port_name or top level port name.
+        x: port1 center x in um.
+        y: port1 center y in um.
+        value1: port1 width or orientation.
+        value2: port2 width or orientation.
+    """
+
+    kind: str
+    port1: str
+    port2: str
+    x: float
+    y: float
+    value1: float
+    value2: float
+
+    class Config:
+        """Config for PortMismatch."""
+
+        extra = Extra.forbid
+
+
 def get_instance_name_from_alias(
     component: Component,
     reference: ComponentReference,
@@ -77,6 +109,193 @@ def get_instance_name_from_label(
     return text
 
 
+def get_connections(
+    ports: Union[Dict[str, Port], PortArray],
+    tolerance: int = 1,
+    exclude_port_types: Optional[List] = None,
+    top_ports: Iterable[str] = (),
+) -> Tuple[List[Tuple[str, str]], List[PortMismatch]]:
+    """Returns the pairs of connected ports and their mismatches.
+
+    Finds all the pairs of ports closer than tolerance at once with a KD-tree.
+    Two ports are connected when they also have the same port type and a width
+    difference smaller than tolerance. Ports with different widths are not
+    connected and reported as width mismatches. Connected ports that do not
+    face each other (or that do not face the same way for top level ports) are
+    reported as orientation mismatches.
+
+    Args:
+        ports: {name: port} or PortArray.
+        tolerance: in nm to consider two ports connected.
+        exclude_port_types: a list of port types to exclude.
+        top_ports: names of the top level ports.
+
+    Returns:
+        connections: pairs of port names, in the order of ports.
+        mismatches: width and orientation mismatches.
+    """
+    from scipy.spatial import cKDTree
+
+    port_array = ports if isinstance(ports, PortArray) else PortArray(ports)
+    if exclude_port_types:
+        excluded = [t in exclude_port_types for t in port_array.port_types]
+        port_array = port_array.take(
+            ~np.array(excluded, dtype=bool)[port_array.port_type_codes]
+        )
+    names = port_array.keys
+    # closer than tolerance, with some slack for floating point errors
+    distance = tolerance * 1e-3 * (1 - 1e-6)
+
+    pairs = cKDTree(port_array.centers).query_pairs(r=distance, output_type="ndarray")
+    pairs = pairs.reshape(-1, 2)
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    i, j = pairs.T
+    same_type = port_array.port_type_codes[i] == port_array.port_type_codes[j]
+    i, j = i[same_type], j[same_type]
+
+    mismatches = []
+    widths = port_array.widths
+    same_width = np.abs(widths[i] - widths[j]) < distance
+    for i1, i2 in zip(i[~same_width], j[~same_width]):
+        mismatches.append(
+            PortMismatch(
+                kind="width",
+                port1=names[i1],
+                port2=names[i2],
+                x=port_array.centers[i1, 0],
+                y=port_array.centers[i1, 1],
+                value1=widths[i1],
+                value2=widths[i2],
+            )
+        )
+    i, j = i[same_width], j[same_width]
+
+    counts = np.bincount(np.concatenate((i, j)), minlength=len(names))
+    crowded = np.flatnonzero(counts > 1)
+    if len(crowded):
+        k = crowded[0]
+        names_set = {names[k]}
+        names_set.update(names[j[n]] for n in np.flatnonzero(i == k))
+        names_set.update(names[i[n]] for n in np.flatnonzero(j == k))
+        x, y = port_array.centers[k]
+        raise ValueError(
+            "more than 2 connections at "
+            f"{x, y} {sorted(names_set)}, width  = {widths[k]} "
+        )
+
+    orientations = port_array.orientations
+    top_ports = set(top_ports)
+    is_top = np.array([name in top_ports for name in names], dtype=bool)
+    angle = np.mod(orientations[i] - orientations[j], 360)
+    facing = np.where(
+        is_top[i] != is_top[j],
+        np.isclose(angle, 0) | np.isclose(angle, 360),
+        np.isclose(angle, 180) | (is_top[i] & is_top[j]),
+    )
+    facing |= np.isnan(angle)
+    for i1, i2 in zip(i[~facing], j[~facing]):
+        mismatches.append(
+            PortMismatch(
+                kind="orientation",
+                port1=names[i1],
+                port2=names[i2],
+                x=port_array.centers[i1, 0],
+                y=port_array.centers[i1, 1],
+                value1=orientations[i1],
+                value2=orientations[i2],
+            )
+        )
+    return [(names[i1], names[i2]) for i1, i2 in zip(i, j)], mismatches
+
+
+def _get_port_array(
+    component: Component, reference_names: List[str]
+) -> Tuple[PortArray, List[str]]:
+    """Returns top level and instance ports, and the top level port names.
+
+    Instance ports are named instance_name,port_name. The ports of all the
+    references to the same parent with the same rotation and reflection are
+    transformed at once, so port.center of the returned ports is not
+    transformed, only the port array centers and orientations are.
+
+    Args:
+        component: to extract ports.
+        reference_names: instance name of each component reference.
+    """
+    top_array = PortArray(component.get_ports(depth=0))
+    port_arrays = [top_array]
+    parent_arrays: Dict[int, PortArray] = {}
+    groups: Dict[Tuple[int, Any, Any], List[int]] = {}
+    for index, reference in enumerate(component.references):
+        if not isinstance(reference, ComponentReference):
+            ports = reference.ports.values()
+            port_array = PortArray(ports)
+            port_array.keys = [
+                f"{reference_names[index]},{port.name}" for port in ports
+            ]
+            port_arrays.append(port_array)
+            continue
+        parent = reference.parent
+        if id(parent) not in parent_arrays:
+            parent_arrays[id(parent)] = PortArray(parent.ports)
+        key = (id(parent), reference.rotation, reference.x_reflection)
+        groups.setdefault(key, []).append(index)
+
+    references = component.references
+    for (parent_id, rotation, x_reflection), indices in groups.items():
+        parent_array = parent_arrays[parent_id]
+        n = len(parent_array)
+        if not n:
+            continue
+        origins = [references[index].origin for index in indices]
+        centers, orientations = parent_array.transform(
+            origin=origins, rotation=rotation, x_reflection=x_reflection
+        )
+        port_array = parent_array.take(np.tile(np.arange(n), len(indices)))
+        port_array.keys = [
+            f"{reference_names[index]},{port.name}"
+            for index in indices
+            for port in parent_array.ports
+        ]
+        port_array.centers = centers.reshape(-1, 2)
+        port_array.orientations = np.tile(orientations, len(indices))
+        port_arrays.append(port_array)
+
+    port_array = PortArray.concatenate(port_arrays)
+    last = {key: index for index, key in enumerate(port_array.keys)}
+    if len(last) < len(port_array):
+        # the last port with the same name wins
+        port_array = port_array.take(np.sort(np.fromiter(last.values(), int)))
+    return port_array, top_array.keys
+
+
+def get_port_mismatches(
+    component: Component,
+    tolerance: int = 1,
+    exclude_port_types: Optional[List] = None,
+    get_instance_name: Callable[..., str] = get_instance_name_from_alias,
+) -> List[PortMismatch]:
+    """Returns the width and orientation mismatches of the netlist ports.
+
+    Args:
+        component: to check.
+        tolerance: tolerance in nm to consider two ports connected.
+        exclude_port_types: a list of port types to exclude from netlisting.
+        get_instance_name: returns the instance name of a reference.
+    """
+    reference_names = [
+        get_instance_name(component, reference) for reference in component.references
+    ]
+    ports, top_ports = _get_port_array(component, reference_names)
+    _, mismatches = get_connections(
+        ports,
+        tolerance=tolerance,
+        exclude_port_types=exclude_port_types,
+        top_ports=top_ports,
+    )
+    return mismatches
+
+
 def get_netlist_yaml(
     component: Component,
     full_settings: bool = False,
@@ -105,7 +324,9 @@ def get_netlist(
 ) -> Dict[str, Any]:
     """From a component returns instances, connections and placements dict.
 
-    Assumes that ports with same width, x, y are connected.
+    Assumes that ports with the same port type and width, closer than tolerance,
+    are connected. Use get_port_mismatches to find ports that overlap but have
+    different widths or do not face each other.
 
     Args:
         component: to extract netlist.
@@ -127,31 +348,38 @@ def get_netlist(
     connections = {}
     top_ports = {}
 
-    for reference in component.references:
-        c = reference.parent
-        origin = reference.origin
-        x = float(snap_to_grid(origin[0]))
-        y = float(snap_to_grid(origin[1]))
-        reference_name = get_instance_name(
-            component,
-            reference,
-        )
+    references = component.references
+    reference_names = [
+        get_instance_name(component, reference) for reference in references
+    ]
+    origins = snap_to_grid(
+        np.array([reference.origin for reference in references], dtype=float)
+    )
 
-        instance = {}
+    # serialize the settings of each unique cell once
+    cell_instances: Dict[int, Dict[str, Any]] = {}
 
-        if c.info:
-            instance.update(component=c.name, info=clean_value_json(c.info))
+    for reference, reference_name, (x, y) in zip(
+        references, reference_names, origins.reshape(-1, 2).tolist()
+    ):
+        c = reference.parent
+        if id(c) not in cell_instances:
+            instance = {}
 
-        # Prefer name from settings over c.name
-        if c.settings:
-            settings = c.settings.full if full_settings else c.settings.changed
+            if c.info:
+                instance.update(component=c.name, info=clean_value_json(c.info))
 
-            instance.update(
-                component=getattr(c.settings, "function_name", c.name),
-                settings=clean_value_json(settings),
-            )
+            # Prefer name from settings over c.name
+            if c.settings:
+                settings = c.settings.full if full_settings else c.settings.changed
 
-        instances[reference_name] = instance
+                instance.update(
+                    component=getattr(c.settings, "function_name", c.name),
+                    settings=clean_value_json(settings),
+                )
+            cell_instances[id(c)] = instance
+
+        instances[reference_name] = dict(cell_instances[id(c)])
         placements[reference_name] = dict(
             x=x,
             y=y,
@@ -159,61 +387,22 @@ def get_netlist(
             mirror=reference.x_reflection or 0,
         )
 
-    # store where ports are located
-    name2port = {}
-
-    # Initialize a dict of port locations to Instance1Name,PortNames
-    port_locations = {}
-
-    # TOP level ports
-    ports = component.get_ports(depth=0)
-    top_ports_list = set()
-    for port in ports:
-        src = port.name
-        name2port[src] = port
-        top_ports_list.add(src)
-
-    # lower level ports
-    for reference in component.references:
-        for port in reference.ports.values():
-            reference_name = get_instance_name(
-                component,
-                reference,
-            )
-            src = f"{reference_name},{port.name}"
-            name2port[src] = port
-
-    # build connectivity port_locations = Dict[Tuple(x,y,width), set of portNames]
-    for name, port in name2port.items():
-        if exclude_port_types and port.port_type in exclude_port_types:
-            continue
-        xywt = [
-            round(1000 * snap_to_grid(v, nm=tolerance))
-            for v in (port.x, port.y, port.width)
-        ] + [port.port_type]
-        xywt = tuple(xywt)
-        if xywt not in port_locations:
-            port_locations[xywt] = set()
-        port_locations[xywt].add(name)
-
-    for xywt, names_set in port_locations.items():
-        if len(names_set) > 2:
-            x, y, w, t = xywt
-            raise ValueError(
-                "more than 2 connections at "
-                f"{x / 1000, y / 1000} {list(names_set)}, width  = {w / 1000} "
-            )
-        if len(names_set) == 2:
-            names_list = list(names_set)
-            src = names_list[0]
-            dst = names_list[1]
-            if src in top_ports_list:
-                top_ports[src] = dst
-            elif dst in top_ports_list:
-                top_ports[dst] = src
-            else:
-                src_dest = sorted([src, dst])
-                connections[src_dest[0]] = src_dest[1]
+    port_array, top_ports_list = _get_port_array(component, reference_names)
+    pairs, _ = get_connections(
+        port_array,
+        tolerance=tolerance,
+        exclude_port_types=exclude_port_types,
+        top_ports=top_ports_list,
+    )
+    top_ports_list = set(top_ports_list)
+    for src, dst in pairs:
+        if src in top_ports_list:
+            top_ports[src] = dst
+        elif dst in top_ports_list:
+            top_ports[dst] = src
+        else:
+            src_dest = sorted([src, dst])
+            connections[src_dest[0]] = src_dest[1]
 
     connections_sorted = {k: connections[k] for k in sorted(list(connections.keys()))}
     placements_sorted = {k: placements[k] for k in sorted(list(placements.keys()))}
@@ -249,37 +438,75 @@ def get_netlist_recursive(
 
     Returns:
         Dictionary of netlists, keyed by the name of each component.
+        Each unique cell is extracted once. The netlists of locked Components
+        are cached and shared between calls, so do not modify them in place.
 
     """
-    all_netlists = {}
-
-    # only components with references (subcomponents) warrant a netlist
-    if component.references:
-        netlist = get_netlist_func(component, **kwargs)
-        all_netlists[f"{component.name}{component_suffix}"] = netlist
-
-        # for each reference, expand the netlist
-        for ref in component.references:
-            rcell = ref.parent
-            grandchildren = get_netlist_recursive(
-                component=rcell,
-                component_suffix=component_suffix,
-                get_netlist_func=get_netlist_func,
-                **kwargs,
-            )
-            all_netlists.update(grandchildren)
-            if ref.ref_cell.references:
-                inst_name = get_instance_name(component, ref)
-                netlist_dict = {"component": f"{rcell.name}{component_suffix}"}
-                if hasattr(rcell, "settings") and hasattr(rcell.settings, "full"):
-                    netlist_dict.update(settings=rcell.settings.full)
-                if hasattr(rcell, "info"):
-                    netlist_dict.update(info=rcell.info)
-                netlist["instances"][inst_name] = netlist_dict
-
+    key = (component_suffix, get_netlist_func, get_instance_name, repr(kwargs))
+    all_netlists: Dict[str, Any] = {}
+    stack = [component]
+    visited = set()
+    while stack:
+        cell = stack.pop()
+        # only components with references (subcomponents) warrant a netlist
+        if cell.name in visited or not cell.references:
+            continue
+        visited.add(cell.name)
+        all_netlists[f"{cell.name}{component_suffix}"] = _get_netlist_cell(
+            cell,
+            key=key,
+            component_suffix=component_suffix,
+            get_netlist_func=get_netlist_func,
+            get_instance_name=get_instance_name,
+            **kwargs,
+        )
+        # depth first, children in reference order
+        stack.extend(reversed([ref.parent for ref in cell.references]))
     return all_netlists
 
 
+def _get_netlist_cell(
+    component: Component,
+    key: Tuple[Any, ...],
+    component_suffix: str,
+    get_netlist_func: Callable,
+    get_instance_name: Callable[..., str],
+    **kwargs,
+) -> Dict[str, Any]:
+    """Returns the netlist of one cell for get_netlist_recursive.
+
+    Instances of cells with references point to their own netlist. Locked
+    Components cache it until they are unlocked or a Component they reference
+    changes.
+    """
+    if component._locked:
+        # subscribe to changes in the referenced Components
+        component.get_bounding_box()
+        netlists = component.__dict__.setdefault("_netlists", {})
+        if key in netlists:
+            return netlists[key]
+
+    netlist = get_netlist_func(component, **kwargs)
+    instances: Dict[int, Dict[str, Any]] = {}
+    for ref in component.references:
+        rcell = ref.parent
+        if not rcell.references:
+            continue
+        if id(rcell) not in instances:
+            netlist_dict = {"component": f"{rcell.name}{component_suffix}"}
+            if hasattr(rcell, "settings") and hasattr(rcell.settings, "full"):
+                netlist_dict.update(settings=rcell.settings.full)
+            if hasattr(rcell, "info"):
+                netlist_dict.update(info=rcell.info)
+            instances[id(rcell)] = netlist_dict
+        inst_name = get_instance_name(component, ref)
+        netlist["instances"][inst_name] = instances[id(rcell)]
+
+    if component._locked:
+        netlists[key] = netlist
+    return netlist
+
+
 def _demo_ring_single_array() -> None:
     import gdsfactory as gf
 
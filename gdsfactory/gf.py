@@ -59,6 +59,31 @@ def config_get(key: str) -> None:
     print_config(key)
 
 
+@click.command(name="stats")
+@click.argument("gdspath", type=click.Path(exists=True))
+@click.option("--cellname", "-c", default=None, help="cell to report (top cell)")
+@click.option("--sort-by", "-s", default="gds_bytes", help="column to sort by")
+@click.option("--ascending", "-a", default=False, help="sort ascending", is_flag=True)
+@click.option("--csv", "csvpath", default=None, help="write the stats to a CSV file")
+@click.option("--head", "-n", default=None, type=int, help="only print the first n")
+def stats(
+    gdspath: str,
+    cellname: Optional[str],
+    sort_by: str,
+    ascending: bool,
+    csvpath: Optional[str],
+    head: Optional[int],
+) -> None:
+    """Per cell polygons, vertices, memory, placements and GDS size."""
+    c = gdsfactory.import_gds(gdspath, cellname=cellname, hashed_name=False)
+    df = c.stats(sort_by=sort_by, ascending=ascending)
+    if csvpath:
+        df.to_csv(csvpath, index=False)
+    if head:
+        df = df.head(head)
+    click.echo(df.to_string(index=False))
+
+
 # GDS
 
 
@@ -199,6 +224,7 @@ gds.add_command(diff)
 tool.add_command(config_get)
 tool.add_command(run_tests)
 tool.add_command(install)
+tool.add_command(stats)
 
 # yaml.add_command(webapp)
 yaml.add_command(watch)
@@ -9,6 +9,7 @@ from gdsfactory.component import Component
 from gdsfactory.components.text_rectangular import text_rectangular
 from gdsfactory.components.triangles import triangle
 from gdsfactory.difftest import difftest
+from gdsfactory.executor import get_components
 from gdsfactory.types import Anchor, ComponentSpec, Float2
 
 
@@ -78,6 +79,15 @@ def grid(
             f" have a length of 2, for example shape=(4,6), got {shape}"
         )
 
+    # build component specs (in parallel if there is an active executor)
+    indices = [
+        idx
+        for idx, d in np.ndenumerate(device_array)
+        if d is not None and not isinstance(d, Component)
+    ]
+    for idx, d in zip(indices, get_components([device_array[idx] for idx in indices])):
+        device_array[idx] = d
+
     # Check that shape is valid and reshape array if needed
     if (shape is None) and (device_array.ndim == 2):  # Already in desired shape
         shape = device_array.shape
@@ -0,0 +1,244 @@
+"""Rewrite a Component hierarchy one unique cell at a time.
+
+`map_cells` applies a function to the own geometry of each unique cell
+(memoized by cell identity), children first, and rebuilds the references of
+the parent cells so they point to the rewritten children. Cells whose geometry
+and children do not change are reused, so runtime and memory scale with the
+unique geometry, not with the placed (flattened) geometry.
+
+.. code::
+
+    import gdsfactory as gf
+    from gdsfactory.hierarchy import select_layers
+
+    c = gf.components.mzi()
+    wg = select_layers(c, layers=[(1, 0)])
+
+"""
+import copy as python_copy
+from typing import Callable, Dict, Iterable, Optional
+
+import gdspy
+from phidl.device_layout import CellArray
+
+from gdsfactory.component import Component, _parse_layer
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.types import Layer, LayerSpecs
+
+
+def _is_empty(component: Component) -> bool:
+    return not (
+        component.polygons
+        or component.paths
+        or component.labels
+        or component.references
+    )
+
+
+def _copy_reference(reference, parent: Component, owner: Component):
+    """Returns a copy of reference pointing to another parent."""
+    if isinstance(reference, gdspy.CellArray):
+        new_ref = CellArray(
+            device=parent,
+            columns=reference.columns,
+            rows=reference.rows,
+            spacing=reference.spacing,
+            origin=reference.origin,
+            rotation=reference.rotation,
+            magnification=reference.magnification,
+            x_reflection=reference.x_reflection,
+        )
+    else:
+        new_ref = ComponentReference(
+            parent,
+            origin=reference.origin,
+            rotation=reference.rotation,
+            magnification=reference.magnification,
+            x_reflection=reference.x_reflection,
+        )
+        new_ref.owner = owner
+    new_ref.name = getattr(reference, "name", None) or parent.name
+    return new_ref
+
+
+def map_cells(
+    component: Component,
+    function: Callable[[Component], Optional[Component]],
+    suffix: str = "",
+    remove_empty: bool = True,
+) -> Component:
+    """Returns a Component hierarchy with the geometry of each cell rewritten.
+
+    Each unique cell is rewritten once. The references to rewritten cells are
+    rebuilt and the cells that do not change are reused.
+
+    Args:
+        component: top cell.
+        function: returns a new Component with the rewritten own geometry
+            (polygons, paths and labels, without references) of a cell, or None
+            if the geometry of the cell does not change.
+        suffix: appended to the names of the rewritten cells.
+        remove_empty: removes references to cells that are empty after the
+            rewrite.
+    """
+    from gdsfactory.export.write_gds import get_cells
+
+    memo: Dict[int, Component] = {}
+    for cell in get_cells(component, on_duplicate_cell=None):
+        new = function(cell)
+        children = [memo.get(id(ref.parent), ref.parent) for ref in cell.references]
+        if new is None and all(
+            child is ref.parent for child, ref in zip(children, cell.references)
+        ):
+            memo[id(cell)] = cell
+            continue
+
+        if new is None:
+            new = Component()
+            for polygonset in cell.polygons:
+                new.add_polygon(polygonset)
+            for path in cell.paths:
+                new.add(python_copy.deepcopy(path))
+            _copy_labels(cell.labels, new)
+
+        new.name = f"{cell.name}{suffix}"
+        for reference, child in zip(cell.references, children):
+            if child is reference.parent or not (remove_empty and _is_empty(child)):
+                new.add(_copy_reference(reference, parent=child, owner=new))
+        for port in cell.ports.values():
+            new.add_port(port=port)
+        new.info = python_copy.deepcopy(cell.info)
+        memo[id(cell)] = new
+    return memo[id(component)]
+
+
+def _copy_labels(labels: Iterable, component: Component) -> None:
+    for label in labels:
+        new_label = component.add_label(
+            text=label.text,
+            position=label.position,
+            magnification=label.magnification,
+            rotation=label.rotation,
+            layer=(label.layer, label.texttype),
+        )
+        new_label.anchor = label.anchor
+        new_label.x_reflection = label.x_reflection
+
+
+def filter_layers(
+    cell: Component,
+    keep: Callable[[Layer], bool],
+    include_labels: bool = True,
+) -> Optional[Component]:
+    """Returns a Component with the own geometry of cell on the kept layers.
+
+    Returns None if all the layers of cell are kept.
+
+    Args:
+        cell: to filter (references are ignored).
+        keep: returns True for the layers to keep.
+        include_labels: also filter labels. If False all labels are kept.
+    """
+    polygonsets = [
+        (p, [keep(layer) for layer in zip(p.layers, p.datatypes)])
+        for p in cell.polygons
+    ]
+    paths = [
+        (path, [keep(layer) for layer in zip(path.layers, path.datatypes)])
+        for path in cell.paths
+    ]
+    labels = [
+        (label, not include_labels or keep((label.layer, label.texttype)))
+        for label in cell.labels
+    ]
+    if (
+        all(all(k) for _, k in polygonsets)
+        and all(all(k) for _, k in paths)
+        and all(k for _, k in labels)
+    ):
+        return None
+
+    new = Component()
+    for polygonset, kept in polygonsets:
+        if all(kept):
+            new.add_polygon(polygonset)
+        elif any(kept):
+            for points, layer, datatype, k in zip(
+                polygonset.polygons, polygonset.layers, polygonset.datatypes, kept
+            ):
+                if k:
+                    new.add_polygon(points, layer=(layer, datatype))
+    for path, kept in paths:
+        if all(kept):
+            new.add(python_copy.deepcopy(path))
+        elif any(kept):
+            for layer, polygons in path.get_polygons(by_spec=True).items():
+                if keep(layer):
+                    for points in polygons:
+                        new.add_polygon(points, layer=layer)
+    _copy_labels([label for label, k in labels if k], new)
+    return new
+
+
+def select_layers(
+    component: Component,
+    layers: LayerSpecs,
+    invert_selection: bool = False,
+    include_labels: bool = True,
+    suffix: Optional[str] = None,
+) -> Component:
+    """Returns a new hierarchy with only some layers, without flattening.
+
+    Each unique cell is filtered once and references to cells left empty are
+    removed. The original Component is not modified.
+
+    Args:
+        component: to filter.
+        layers: list of layers to keep.
+        invert_selection: keeps all layers except layers specified.
+        include_labels: also filter labels. If False all labels are kept.
+        suffix: appended to the names of the filtered cells.
+            Defaults to the layers.
+    """
+    from gdsfactory.name import clean_value
+    from gdsfactory.pdk import get_layer
+
+    layers = {_parse_layer(get_layer(layer)) for layer in layers}
+    suffix = f"_{clean_value(sorted(layers))}" if suffix is None else suffix
+
+    def keep(layer: Layer) -> bool:
+        return (tuple(layer) in layers) != invert_selection
+
+    def function(cell: Component) -> Optional[Component]:
+        return filter_layers(cell, keep=keep, include_labels=include_labels)
+
+    return map_cells(component, function, suffix=suffix)
+
+
+def test_select_layers() -> None:
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    n = len(c.get_dependencies(recursive=True))
+    wg = select_layers(c, layers=[(1, 0)])
+    assert wg is not c
+    assert set(wg.get_layers()) == {(1, 0)}
+    assert len(wg.get_dependencies(recursive=True)) <= n
+    assert wg.hash_geometry() == c.extract(layers=[(1, 0)]).hash_geometry()
+
+    # cells that do not change are reused
+    assert select_layers(c, layers=c.get_layers()) is c
+
+
+def test_select_layers_invert() -> None:
+    import gdsfactory as gf
+
+    c = gf.components.straight(length=11.0)
+    c2 = select_layers(c, layers=[gf.LAYER.PORT], invert_selection=True)
+    assert gf.LAYER.PORT not in c2.get_layers()
+    assert gf.LAYER.PORT in c.get_layers()
+
+
+if __name__ == "__main__":
+    test_select_layers()
+    test_select_layers_invert()
@@ -12,6 +12,7 @@ from pydantic import validate_arguments
 
 import gdsfactory as gf
 from gdsfactory.component import Component
+from gdsfactory.executor import get_components
 from gdsfactory.name import get_name_short
 from gdsfactory.types import Anchor, ComponentSpec, Float2, Number
 
@@ -159,7 +160,7 @@ def pack(
     max_size = np.asarray(max_size, dtype=np.float64)  # In case it's integers
     max_size = max_size / precision
 
-    component_list = [gf.get_component(component) for component in component_list]
+    component_list = get_components(component_list)
 
     # Convert Components to rectangles
     rect_dict = {}
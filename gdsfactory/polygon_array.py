@@ -0,0 +1,350 @@
+"""Array-backed polygon storage.
+
+A PolygonArray stores all the polygons of one layer in a single contiguous
+(N, 2) vertex buffer plus an offsets array, instead of one small numpy array
+(and one Python object) per polygon.
+
+It is a drop-in phidl Polygon: `polygons` returns a list of views into the
+buffer, so `get_polygons(by_spec=True)`, `write_gds` and the phidl/gdspy
+methods keep working, while translate, rotate, scale, mirror, bounding box and
+GDS export operate on the whole buffer at once.
+
+.. code::
+
+    import gdsfactory as gf
+
+    c = gf.components.grating_coupler_elliptical_arbitrary()
+    c.compact_polygons()  # one PolygonArray per layer
+
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from phidl.device_layout import Polygon, _reflect_points
+
+_mpone = np.array((-1.0, 1.0))
+
+
+class _PolygonList(list):
+    """List of polygon views that marks its owner for repacking when modified."""
+
+    __slots__ = ("owner",)
+
+    def __init__(self, owner: "PolygonArray", polygons: Sequence[np.ndarray]) -> None:
+        super().__init__(polygons)
+        self.owner = owner
+
+    def _modified(self) -> None:
+        self.owner._dirty = True
+        self.owner._resize_layers(len(self))
+
+
+def _modifier(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._modified()
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(_PolygonList, _name, _modifier(_name))
+
+
+class PolygonArray(Polygon):
+    """Polygons stored in one contiguous vertex buffer.
+
+    Args:
+        polygons: list of polygons, each one an array-like[N][2] of vertices.
+        layer: GDS layer.
+        datatype: GDS datatype.
+        parent: Component that contains the polygons.
+    """
+
+    def __init__(
+        self,
+        polygons: Sequence[np.ndarray],
+        layer: int = 0,
+        datatype: int = 0,
+        parent=None,
+    ) -> None:
+        """Initialize the PolygonArray."""
+        self.parent = parent
+        self.properties = {}
+        self.polygons = polygons
+        self.layers = [layer] * (len(self._offsets) - 1)
+        self.datatypes = [datatype] * (len(self._offsets) - 1)
+
+    @property
+    def polygons(self) -> List[np.ndarray]:
+        """Returns the polygons as views into the vertex buffer."""
+        if self._views is None:
+            self._views = _PolygonList(
+                self, np.split(self._points, self._offsets[1:-1])
+            )
+        return self._views
+
+    @polygons.setter
+    def polygons(self, polygons: Sequence[np.ndarray]) -> None:
+        self._pack(polygons)
+
+    def _pack(self, polygons: Sequence[np.ndarray]) -> None:
+        polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+        sizes = [len(p) for p in polygons]
+        self._offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self._offsets[1:])
+        self._points = (
+            np.concatenate(polygons) if polygons else np.empty((0, 2), dtype=float)
+        )
+        self._views = None
+        self._dirty = False
+
+    def _resize_layers(self, n: int) -> None:
+        """Resizes layers and datatypes to n polygons after a list edit.
+
+        New polygons go on the layer of the last polygon.
+        """
+        if len(self.layers) == n:
+            return
+        if self.layers:
+            self._last_layer = self.layers[-1], self.datatypes[-1]
+        layer, datatype = getattr(self, "_last_layer", (0, 0))
+        self.layers = (list(self.layers) + [layer] * n)[:n]
+        self.datatypes = (list(self.datatypes) + [datatype] * n)[:n]
+
+    @property
+    def points(self) -> np.ndarray:
+        """Returns the (N, 2) vertex buffer with all the polygons."""
+        if self._dirty:
+            self._pack(self._views)
+        return self._points
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Returns the index of the first vertex of each polygon (and the end)."""
+        if self._dirty:
+            self._pack(self._views)
+        return self._offsets
+
+    def __str__(self) -> str:
+        """Returns a short description."""
+        return (
+            f"PolygonArray ({len(self.offsets) - 1} polygons, {len(self.points)} vertices, "
+            f"layers {sorted(set(self.layers))}, "
+            f"datatypes {sorted(set(self.datatypes))})"
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Returns the buffers without the polygon views."""
+        return dict(
+            parent=self.parent,
+            properties=self.properties,
+            layers=self.layers,
+            datatypes=self.datatypes,
+            points=self.points,
+            offsets=self.offsets,
+        )
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restores the buffers."""
+        self.parent = state["parent"]
+        self.properties = state["properties"]
+        self.layers = state["layers"]
+        self.datatypes = state["datatypes"]
+        self._points = state["points"]
+        self._offsets = state["offsets"]
+        self._views = None
+        self._dirty = False
+
+    def copy(self, parent=None) -> "PolygonArray":
+        """Returns a copy with its own vertex buffer."""
+        new = PolygonArray.__new__(PolygonArray)
+        new.__setstate__(self.__getstate__())
+        new.parent = parent
+        new.properties = dict(self.properties)
+        new.layers = list(self.layers)
+        new.datatypes = list(self.datatypes)
+        new._points = self._points.copy()
+        return new
+
+    def _invalidate_bbox(self) -> None:
+        if self.parent is not None:
+            self.parent._bb_valid = False
+
+    def get_bounding_box(self) -> Optional[np.ndarray]:
+        """Returns the bounding box [[xmin, ymin], [xmax, ymax]] or None if empty."""
+        points = self.points
+        if len(points) == 0:
+            return None
+        return np.array((points.min(axis=0), points.max(axis=0)))
+
+    def translate(self, dx: float, dy: float) -> "PolygonArray":
+        """Translates all polygons in place."""
+        self.points[...] += (dx, dy)
+        self._invalidate_bbox()
+        return self
+
+    def rotate(
+        self, angle: float = 45, center: Tuple[float, float] = (0, 0)
+    ) -> "PolygonArray":
+        """Rotates all polygons in place.
+
+        Args:
+            angle: in degrees.
+            center: of the rotation.
+        """
+        angle = np.radians(angle)
+        c0 = np.array(center, dtype=float)
+        points = self.points - c0
+        self.points[...] = (
+            points * np.cos(angle) + points[:, ::-1] * np.sin(angle) * _mpone + c0
+        )
+        self._invalidate_bbox()
+        return self
+
+    def scale(
+        self,
+        scalex: float,
+        scaley: Optional[float] = None,
+        center: Tuple[float, float] = (0, 0),
+    ) -> "PolygonArray":
+        """Scales all polygons in place."""
+        c0 = np.array(center, dtype=float)
+        s = scalex if scaley is None else np.array((scalex, scaley))
+        self.points[...] = (self.points - c0) * s + c0
+        self._invalidate_bbox()
+        return self
+
+    def mirror(self, p1=(0, 1), p2=(0, 0)) -> "PolygonArray":
+        """Mirrors all polygons in place across the line from p1 to p2."""
+        self.points[...] = _reflect_points(self.points, p1, p2)
+        self._invalidate_bbox()
+        return self
+
+    def to_gds(self, outfile, multiplier: float) -> None:
+        """Writes the polygons as GDS BOUNDARY elements.
+
+        Rounds the whole vertex buffer at once. The output is the same as
+        `gdspy.PolygonSet.to_gds`.
+        """
+        if self.properties or (np.diff(self.offsets) > 8190).any():
+            return super().to_gds(outfile, multiplier)
+
+        offsets = self.offsets
+        xy = np.round(self.points * multiplier).astype(">i4")
+        header = np.zeros((len(offsets) - 1, 10), dtype=">u2")
+        header[:, 0] = 4
+        header[:, 1] = 0x0800
+        header[:, 2] = 6
+        header[:, 3] = 0x0D02
+        header[:, 4] = np.array(self.layers, dtype=np.int16).view(np.uint16)
+        header[:, 5] = 6
+        header[:, 6] = 0x0E02
+        header[:, 7] = np.array(self.datatypes, dtype=np.int16).view(np.uint16)
+        header[:, 8] = 12 + 8 * np.diff(offsets)
+        header[:, 9] = 0x1003
+        endel = b"\x00\x04\x11\x00"
+        offsets = offsets.tolist()
+        chunks = []
+        for i, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+            chunks += [
+                header[i].tobytes(),
+                xy[start:stop].tobytes(),
+                xy[start].tobytes(),
+                endel,
+            ]
+        outfile.write(b"".join(chunks))
+
+
+def compact_polygons(component) -> List[PolygonArray]:
+    """Stores the polygons of a Component in one PolygonArray per layer.
+
+    Polygons with GDS properties are kept as they are.
+    Modifies the Component in place and returns the new PolygonArrays.
+
+    Args:
+        component: to compact.
+    """
+    by_layer: Dict[Tuple[int, int], List[np.ndarray]] = {}
+    keep = []
+    for polygonset in component.polygons:
+        if polygonset.properties:
+            keep.append(polygonset)
+            continue
+        for points, layer, datatype in zip(
+            polygonset.polygons, polygonset.layers, polygonset.datatypes
+        ):
+            by_layer.setdefault((layer, datatype), []).append(points)
+
+    arrays = [
+        PolygonArray(polygons, layer=layer, datatype=datatype, parent=component)
+        for (layer, datatype), polygons in by_layer.items()
+    ]
+    component.polygons = keep + arrays
+    return arrays
+
+
+def test_polygon_array_to_gds() -> None:
+    import io
+
+    import gdspy
+
+    polygons = [
+        np.array([(0, 0), (1.5, 0), (1.5, 2.2)]),
+        np.array([(-1, -1), (0.3, -1), (0.3, 0.0007), (-1, 0.2)]),
+    ]
+    expected = io.BytesIO()
+    gdspy.PolygonSet(polygons, layer=3, datatype=1).to_gds(expected, 1000)
+    p = PolygonArray(polygons, layer=3, datatype=1)
+    result = io.BytesIO()
+    p.to_gds(result, 1000)
+    assert result.getvalue() == expected.getvalue()
+
+    p.polygons[0][0] = (0.1, 0.1)
+    assert p.points[0].tolist() == [0.1, 0.1]
+    p.polygons.append(np.array([(5, 5), (6, 5), (6, 6)]))
+    assert len(p.offsets) == 4
+    assert p.get_bounding_box().tolist() == [[-1, -1], [6, 6]]
+    p2 = p.copy()
+    p.move((1, 0))
+    assert p.get_bounding_box().tolist() == [[0, -1], [7, 6]]
+    assert p2.get_bounding_box().tolist() == [[-1, -1], [6, 6]]
+
+
+def test_compact_polygons() -> None:
+    import gdsfactory as gf
+
+    c1 = gf.components.grating_coupler_elliptical_arbitrary()
+    c2 = gf.Component("grating_compact")
+    c2.add_polygon(c1.get_polygons(by_spec=True)[(1, 0)], layer=(1, 0))
+    h = c2.hash_geometry()
+    n = len(c2.polygons)
+
+    arrays = compact_polygons(c2)
+    assert len(arrays) == len(c2.polygons) == 1
+    assert len(arrays[0].polygons) == n
+    assert c2.hash_geometry() == h
+
+    c2.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+    assert set(c2.get_polygons(by_spec=True)) == {(1, 0), (2, 0)}
+
+
+if __name__ == "__main__":
+    test_polygon_array_to_gds()
+    test_compact_polygons()
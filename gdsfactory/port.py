@@ -74,6 +74,8 @@ class Port:
     """Ports are useful to connect Components with each other. Extends phidl \
     port with layer and cross_section.
 
+    Ports only have the attributes in __slots__. Store any extra data in info.
+
     Args:
         name: we name ports clock-wise starting from bottom left.
         center: (x, y) port center coordinate.
@@ -88,7 +90,25 @@ class Port:
 
     """
 
+    __slots__ = (
+        "name",
+        "_center",
+        "_orientation",
+        "parent",
+        "info",
+        "uid",
+        "port_type",
+        "cross_section",
+        "shear_angle",
+        "layer",
+        "_width",
+        "name_original",
+    )
+
     _next_uid = 0
+    # counts the changes to port centers, orientations and widths and to the
+    # ports of Components, so ComponentReference.ports knows when to refresh
+    _changes = 0
 
     def __init__(
         self,
@@ -111,8 +131,8 @@ class Port:
             raise ValueError("You need to define port center.")
 
         self.name = name
-        self.center = np.array(center, dtype="float64")
-        self.orientation = np.mod(orientation, 360) if orientation else orientation
+        self._center = np.array(center, dtype="float64")
+        self._orientation = np.mod(orientation, 360) if orientation else orientation
         self.parent = parent
         self.info: Dict[str, Any] = {}
         self.uid = Port._next_uid
@@ -133,12 +153,42 @@ class Port:
             width = cross_section.width
 
         self.layer = layer
-        self.width = width
+        self._width = width
 
         if self.width < 0:
             raise ValueError(f"Port width must be >=0. Got {self.width}")
         Port._next_uid += 1
 
+    @property
+    def center(self) -> ndarray:
+        """Returns the center of the Port."""
+        return self._center
+
+    @center.setter
+    def center(self, value) -> None:
+        self._center = value
+        Port._changes += 1
+
+    @property
+    def orientation(self) -> Optional[float]:
+        """Returns the orientation in degrees, None for ports without one."""
+        return self._orientation
+
+    @orientation.setter
+    def orientation(self, value: Optional[float]) -> None:
+        self._orientation = value
+        Port._changes += 1
+
+    @property
+    def width(self) -> float:
+        """Returns the width in um."""
+        return self._width
+
+    @width.setter
+    def width(self, value: float) -> None:
+        self._width = value
+        Port._changes += 1
+
     @property
     def midpoint(self) -> Float2:
         warnings.warn(midpoint_deprecation, DeprecationWarning, stacklevel=2)
@@ -367,6 +417,321 @@ class Port:
             )
 
 
+_DIRECTIONS = ("E", "N", "W", "S")
+
+
+class PortsDict(dict):
+    """Ports of a Component, by name, that count their changes in Port._changes."""
+
+    __slots__ = ()
+
+
+def _ports_dict_modifier(name: str):
+    method = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        Port._changes += 1
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__ior__",
+    "clear",
+    "pop",
+    "popitem",
+    "setdefault",
+    "update",
+):
+    setattr(PortsDict, _name, _ports_dict_modifier(_name))
+
+
+def _get_direction_codes(orientations: ndarray) -> ndarray:
+    """Returns 0 (E), 1 (N), 2 (W) or 3 (S) for orientations in degrees.
+
+    None orientations (nan) face east.
+    """
+    angle = np.mod(np.nan_to_num(orientations), 360)
+    return np.select(
+        [(angle <= 45) | (angle >= 315), angle <= 135, angle <= 225], [0, 1, 2], 3
+    )
+
+
+def _get_codes(values: List[Any]) -> Tuple[List[Any], ndarray]:
+    """Returns the unique values and the index of each value in them."""
+    index: Dict[Any, int] = {}
+    unique = []
+    codes = np.empty(len(values), dtype=int)
+    for i, value in enumerate(values):
+        hashable = tuple(value) if isinstance(value, (list, ndarray)) else value
+        key = (type(value), hashable)
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(unique)
+            unique.append(value)
+        codes[i] = code
+    return unique, codes
+
+
+def _concatenate_codes(
+    values_and_codes: List[Tuple[List[Any], ndarray]]
+) -> Tuple[List[Any], ndarray]:
+    """Returns the unique values and codes of several (unique values, codes)."""
+    unique, codes = _get_codes([v for values, _ in values_and_codes for v in values])
+    offsets = np.cumsum([0] + [len(values) for values, _ in values_and_codes])
+    return unique, np.concatenate(
+        [codes[offset + c] for (_, c), offset in zip(values_and_codes, offsets)]
+    )
+
+
+class PortArray:
+    """Columnar view of many ports for vectorized selection, sorting and \
+    transforms.
+
+    Centers, orientations (nan for None), widths, layers and port types are
+    stored as numpy arrays. Layers and port types are stored as codes into a
+    list of unique values.
+
+    Args:
+        ports: dict {key: port} or iterable of ports.
+    """
+
+    __slots__ = (
+        "ports",
+        "keys",
+        "centers",
+        "orientations",
+        "widths",
+        "layers",
+        "layer_codes",
+        "port_types",
+        "port_type_codes",
+    )
+
+    def __init__(self, ports: Union[Dict[Any, Port], typing.Iterable[Port]]) -> None:
+        """Initializes the PortArray from ports."""
+        if isinstance(ports, dict):
+            self.keys = list(ports.keys())
+            self.ports = list(ports.values())
+        else:
+            self.ports = list(ports)
+            self.keys = [port.name for port in self.ports]
+        ports = self.ports
+        self.centers = np.array([port.center for port in ports], dtype=float).reshape(
+            -1, 2
+        )
+        self.orientations = np.array(
+            [
+                np.nan if port.orientation is None else port.orientation
+                for port in ports
+            ],
+            dtype=float,
+        )
+        self.widths = np.array([port.width for port in ports], dtype=float)
+        self.layers, self.layer_codes = _get_codes([port.layer for port in ports])
+        self.port_types, self.port_type_codes = _get_codes(
+            [port.port_type for port in ports]
+        )
+
+    def __len__(self) -> int:
+        """Returns the number of ports."""
+        return len(self.ports)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the object."""
+        return f"PortArray({len(self)} ports, layers {self.layers})"
+
+    def take(self, indices: ndarray) -> PortArray:
+        """Returns a PortArray with the ports at some indices (or a mask)."""
+        indices = np.flatnonzero(indices) if indices.dtype == bool else indices
+        new = object.__new__(PortArray)
+        new.ports = [self.ports[i] for i in indices]
+        new.keys = [self.keys[i] for i in indices]
+        new.centers = self.centers[indices]
+        new.orientations = self.orientations[indices]
+        new.widths = self.widths[indices]
+        new.layers = self.layers
+        new.layer_codes = self.layer_codes[indices]
+        new.port_types = self.port_types
+        new.port_type_codes = self.port_type_codes[indices]
+        return new
+
+    def to_dict(self) -> Dict[str, Port]:
+        """Returns a dict {port name: port}."""
+        return {port.name: port for port in self.ports}
+
+    def _isin(self, codes: ndarray, unique: List[Any], values: List[Any]) -> ndarray:
+        selected = [i for i, u in enumerate(unique) if any(u == v for v in values)]
+        return np.isin(codes, selected)
+
+    def select(
+        self,
+        layer: Optional[Tuple[int, int]] = None,
+        prefix: Optional[str] = None,
+        suffix: Optional[str] = None,
+        orientation: Optional[int] = None,
+        width: Optional[float] = None,
+        layers_excluded: Optional[Tuple[Tuple[int, int], ...]] = None,
+        port_type: Optional[str] = None,
+    ) -> PortArray:
+        """Returns the ports that match all the conditions.
+
+        Args:
+            layer: select ports with port GDS layer.
+            prefix: select ports with key (port name) prefix.
+            suffix: select ports with key (port name) suffix.
+            orientation: select ports with orientation in degrees.
+            width: select ports with port width.
+            layers_excluded: List of layers to exclude.
+            port_type: select ports with port type (optical, electrical ...).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if layer:
+            mask &= self._isin(self.layer_codes, self.layers, [layer])
+        if prefix or suffix:
+            names = np.array([str(key) for key in self.keys], dtype=str)
+            if prefix:
+                mask &= np.char.startswith(names, prefix)
+            if suffix:
+                mask &= np.char.endswith(names, suffix)
+        if orientation is not None:
+            mask &= self.orientations == orientation
+        if layers_excluded:
+            mask &= ~self._isin(self.layer_codes, self.layers, list(layers_excluded))
+        if width:
+            mask &= self.widths == width
+        if port_type:
+            mask &= self._isin(self.port_type_codes, self.port_types, [port_type])
+        return self if mask.all() else self.take(mask)
+
+    def get_direction_codes(self) -> ndarray:
+        """Returns 0 (E), 1 (N), 2 (W) or 3 (S) for each port.
+
+        Ports with None orientation face east.
+        """
+        return _get_direction_codes(self.orientations)
+
+    def facing(self, direction: str = "W") -> PortArray:
+        """Returns the ports facing a direction (E, N, W, S)."""
+        if direction not in _DIRECTIONS:
+            raise PortOrientationError(f"{direction} must be in {list(_DIRECTIONS)} ")
+        codes = self.get_direction_codes()
+        return self.take(codes == _DIRECTIONS.index(direction))
+
+    def sort_clockwise(self) -> PortArray:
+        """Returns the ports sorted clockwise from the bottom left (west)."""
+        codes = self.get_direction_codes()
+        x, y = self.centers[:, 0], self.centers[:, 1]
+        # W south to north, N west to east, E north to south, S east to west
+        rank = np.array((2, 1, 0, 3))[codes]
+        key = np.choose(codes, (-y, x, y, -x))
+        return self.take(np.lexsort((key, rank)))
+
+    def sort_counter_clockwise(self) -> PortArray:
+        """Returns the ports sorted counter-clockwise from the bottom right \
+        (east)."""
+        codes = self.get_direction_codes()
+        x, y = self.centers[:, 0], self.centers[:, 1]
+        # E south to north, N east to west, W north to south, S west to east
+        key = np.choose(codes, (y, -x, -y, x))
+        return self.take(np.lexsort((key, codes)))
+
+    def transform(
+        self,
+        origin: Optional[Float2] = (0, 0),
+        rotation: Optional[float] = None,
+        x_reflection: bool = False,
+    ) -> Tuple[ndarray, ndarray]:
+        """Returns the centers and orientations after a GDS transformation.
+
+        Same as ComponentReference._transform_port for all the ports at once:
+        reflection about the x axis, rotation around (0, 0) in degrees and
+        translation, applied to all the centers as one affine matrix.
+        Orientations are nan for ports with None orientation, which are only
+        translated and then reflected.
+
+        Args:
+            origin: translation, or (k, 2) translations to return (k, n, 2)
+                centers for k placements with the same rotation and reflection.
+            rotation: in degrees.
+            x_reflection: reflect about the x axis first.
+        """
+        origin = np.zeros(2) if origin is None else np.asarray(origin, dtype=float)
+        origin = origin[..., None, :]
+        matrix = get_affine_matrix((0, 0), rotation, x_reflection)
+        x, y = self.centers[:, 0], self.centers[:, 1]
+        centers = (
+            np.column_stack(
+                (
+                    x * matrix[0, 0] + y * matrix[0, 1],
+                    x * matrix[1, 0] + y * matrix[1, 1],
+                )
+            )
+            + origin
+        )
+        orientations = -self.orientations if x_reflection else self.orientations
+        orientations = np.mod(orientations + (rotation or 0), 360)
+
+        no_orientation = np.isnan(orientations)
+        if no_orientation.any():
+            translated = self.centers[no_orientation] + origin
+            if x_reflection:
+                translated[..., 1] = -translated[..., 1]
+            centers[..., no_orientation, :] = translated
+        return centers, orientations
+
+    @classmethod
+    def concatenate(cls, port_arrays: List[PortArray]) -> PortArray:
+        """Returns a PortArray with the ports of several PortArrays."""
+        new = cls([])
+        if not port_arrays:
+            return new
+        new.ports = [port for port_array in port_arrays for port in port_array.ports]
+        new.keys = [key for port_array in port_arrays for key in port_array.keys]
+        new.centers = np.concatenate([a.centers for a in port_arrays])
+        new.orientations = np.concatenate([a.orientations for a in port_arrays])
+        new.widths = np.concatenate([a.widths for a in port_arrays])
+
+        new.layers, new.layer_codes = _concatenate_codes(
+            [(a.layers, a.layer_codes) for a in port_arrays]
+        )
+        new.port_types, new.port_type_codes = _concatenate_codes(
+            [(a.port_types, a.port_type_codes) for a in port_arrays]
+        )
+        return new
+
+
+def get_affine_matrix(
+    origin: Optional[Float2] = (0, 0),
+    rotation: Optional[float] = None,
+    x_reflection: bool = False,
+) -> ndarray:
+    """Returns the 2x3 affine matrix of a GDS transformation.
+
+    Reflection about the x axis, then rotation around (0, 0) in degrees, then
+    translation. Rotations of 0 and 180 degrees are exact.
+
+    Args:
+        origin: translation.
+        rotation: in degrees.
+        x_reflection: reflect about the x axis first.
+    """
+    if not rotation:
+        ca, sa = 1.0, 0.0
+    elif rotation == 180:
+        ca, sa = -1.0, 0.0
+    else:
+        angle = rotation * np.pi / 180
+        ca, sa = np.cos(angle), np.sin(angle)
+    sign = -1.0 if x_reflection else 1.0
+    x0, y0 = (0, 0) if origin is None else origin
+    return np.array([[ca, -sa * sign, x0], [sa, ca * sign, y0]], dtype=float)
+
+
 PortsMap = Dict[str, List[Port]]
 
 
@@ -439,34 +804,7 @@ def sort_ports_clockwise(ports: Dict[str, Port]) -> Dict[str, Port]:
             8   7
 
     """
-    port_list = list(ports.values())
-    direction_ports: PortsMap = {x: [] for x in ["E", "N", "W", "S"]}
-
-    for p in port_list:
-        angle = p.orientation % 360 if p.orientation is not None else 0
-        if angle <= 45 or angle >= 315:
-            direction_ports["E"].append(p)
-        elif angle <= 135 and angle >= 45:
-            direction_ports["N"].append(p)
-        elif angle <= 225 and angle >= 135:
-            direction_ports["W"].append(p)
-        else:
-            direction_ports["S"].append(p)
-
-    east_ports = direction_ports["E"]
-    east_ports.sort(key=lambda p: -p.y)  # sort north to south
-
-    north_ports = direction_ports["N"]
-    north_ports.sort(key=lambda p: +p.x)  # sort west to east
-
-    west_ports = direction_ports["W"]
-    west_ports.sort(key=lambda p: +p.y)  # sort south to north
-
-    south_ports = direction_ports["S"]
-    south_ports.sort(key=lambda p: -p.x)  # sort east to west
-
-    ports = west_ports + north_ports + east_ports + south_ports
-    return {port.name: port for port in ports}
+    return PortArray(ports).sort_clockwise().to_dict()
 
 
 def sort_ports_counter_clockwise(ports: Dict[str, Port]) -> Dict[str, Port]:
@@ -483,34 +821,7 @@ def sort_ports_counter_clockwise(ports: Dict[str, Port]) -> Dict[str, Port]:
             7   8
 
     """
-    port_list = list(ports.values())
-    direction_ports: PortsMap = {x: [] for x in ["E", "N", "W", "S"]}
-
-    for p in port_list:
-        angle = p.orientation % 360 if p.orientation is not None else 0
-        if angle <= 45 or angle >= 315:
-            direction_ports["E"].append(p)
-        elif angle <= 135 and angle >= 45:
-            direction_ports["N"].append(p)
-        elif angle <= 225 and angle >= 135:
-            direction_ports["W"].append(p)
-        else:
-            direction_ports["S"].append(p)
-
-    east_ports = direction_ports["E"]
-    east_ports.sort(key=lambda p: +p.y)  # sort south to north
-
-    north_ports = direction_ports["N"]
-    north_ports.sort(key=lambda p: -p.x)  # sort east to west
-
-    west_ports = direction_ports["W"]
-    west_ports.sort(key=lambda p: -p.y)  # sort north to south
-
-    south_ports = direction_ports["S"]
-    south_ports.sort(key=lambda p: +p.x)  # sort west to east
-
-    ports = east_ports + north_ports + west_ports + south_ports
-    return {port.name: port for port in ports}
+    return PortArray(ports).sort_counter_clockwise().to_dict()
 
 
 def select_ports(
@@ -547,35 +858,18 @@ def select_ports(
     if isinstance(ports, (Component, ComponentReference)):
         ports = ports.ports
 
-    if layer:
-        ports = {p_name: p for p_name, p in ports.items() if p.layer == layer}
-    if prefix:
-        ports = {
-            p_name: p for p_name, p in ports.items() if str(p_name).startswith(prefix)
-        }
-    if suffix:
-        ports = {
-            p_name: p for p_name, p in ports.items() if str(p_name).endswith(suffix)
-        }
-    if orientation is not None:
-        ports = {
-            p_name: p for p_name, p in ports.items() if p.orientation == orientation
-        }
-
-    if layers_excluded:
-        ports = {
-            p_name: p for p_name, p in ports.items() if p.layer not in layers_excluded
-        }
-    if width:
-        ports = {p_name: p for p_name, p in ports.items() if p.width == width}
-    if port_type:
-        ports = {p_name: p for p_name, p in ports.items() if p.port_type == port_type}
-
+    port_array = PortArray(ports).select(
+        layer=layer,
+        prefix=prefix,
+        suffix=suffix,
+        orientation=orientation,
+        width=width,
+        layers_excluded=layers_excluded,
+        port_type=port_type,
+    )
     if clockwise:
-        ports = sort_ports_clockwise(ports)
-    else:
-        ports = sort_ports_counter_clockwise(ports)
-    return ports
+        return port_array.sort_clockwise().to_dict()
+    return port_array.sort_counter_clockwise().to_dict()
 
 
 select_ports_optical = partial(select_ports, port_type="optical")
@@ -613,20 +907,7 @@ def get_ports_facing(ports: List[Port], direction: str = "W") -> List[Port]:
     elif isinstance(ports, (Component, ComponentReference)):
         ports = list(ports.ports.values())
 
-    direction_ports: Dict[str, List[Port]] = {x: [] for x in ["E", "N", "W", "S"]}
-
-    for p in ports:
-        angle = p.orientation % 360 if p.orientation is not None else 0
-        if angle <= 45 or angle >= 315:
-            direction_ports["E"].append(p)
-        elif angle <= 135 and angle >= 45:
-            direction_ports["N"].append(p)
-        elif angle <= 225 and angle >= 135:
-            direction_ports["W"].append(p)
-        else:
-            direction_ports["S"].append(p)
-
-    return direction_ports[direction]
+    return PortArray(ports).facing(direction).ports
 
 
 def deco_rename_ports(component_factory: Callable) -> Callable:
@@ -770,30 +1051,19 @@ def rename_ports_by_orientation(
             S0   S1
 
     """
-    layers_excluded = layers_excluded or []
-    direction_ports: PortsMap = {x: [] for x in ["E", "N", "W", "S"]}
-
     ports = component.ports
     ports = select_ports(ports) if select_ports else ports
+    ports_on_layer = PortArray(ports).select(layers_excluded=layers_excluded)
 
-    ports_on_layer = [p for p in ports.values() if p.layer not in layers_excluded]
+    # ports with 0 or None orientation are renamed as south ports
+    codes = ports_on_layer.get_direction_codes()
+    codes[np.nan_to_num(ports_on_layer.orientations) == 0] = 3
 
-    for p in ports_on_layer:
+    direction_ports: PortsMap = {x: [] for x in _DIRECTIONS}
+    for p, code in zip(ports_on_layer.ports, codes):
         # Make sure we can backtrack the parent component from the port
         p.parent = component
-
-        if p.orientation:
-            angle = p.orientation % 360
-            if angle <= 45 or angle >= 315:
-                direction_ports["E"].append(p)
-            elif angle <= 135 and angle >= 45:
-                direction_ports["N"].append(p)
-            elif angle <= 225 and angle >= 135:
-                direction_ports["W"].append(p)
-            else:
-                direction_ports["S"].append(p)
-        else:
-            direction_ports["S"].append(p)
+        direction_ports[_DIRECTIONS[code]].append(p)
 
     function(direction_ports, prefix=prefix)
     component.ports = {p.name: p for p in component.ports.values()}
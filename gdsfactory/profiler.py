@@ -0,0 +1,355 @@
+"""Profile cell builds.
+
+Records for each cell function the build time (total and self time, without
+children builds), cache hits and misses and the number of polygons and
+vertices produced, as well as the parent -> child build tree.
+
+.. code::
+
+    import gdsfactory as gf
+    from gdsfactory.profiler import CellProfiler
+
+    with CellProfiler() as profiler:
+        c = gf.components.mzi()
+
+    print(profiler.get_dataframe())
+    profiler.print_tree()
+    profiler.write_chrome_trace("build.json")  # open in chrome://tracing or perfetto
+
+When no profiler is active the @cell decorator only checks for it once per call.
+"""
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from gdsfactory.component import Component
+from gdsfactory.types import PathType
+
+
+class CellEvent:
+    """Build (or cache hit) of one cell."""
+
+    __slots__ = (
+        "function_name",
+        "name",
+        "start",
+        "end",
+        "children_time",
+        "cache_hit",
+        "polygons",
+        "vertices",
+        "parent",
+        "children",
+    )
+
+    def __init__(
+        self,
+        function_name: str,
+        name: str,
+        start: float,
+        cache_hit: bool = False,
+        parent: Optional["CellEvent"] = None,
+    ) -> None:
+        """Initialize the event."""
+        self.function_name = function_name
+        self.name = name
+        self.start = start
+        self.end = start
+        self.children_time = 0.0
+        self.cache_hit = cache_hit
+        self.polygons = 0
+        self.vertices = 0
+        self.parent = parent
+        self.children: List[CellEvent] = []
+
+    @property
+    def time(self) -> float:
+        return self.end - self.start
+
+    @property
+    def time_self(self) -> float:
+        return self.time - self.children_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            function=self.function_name,
+            name=self.name,
+            cache_hit=self.cache_hit,
+            time=self.time,
+            time_self=self.time_self,
+            polygons=self.polygons,
+            vertices=self.vertices,
+            children=[child.to_dict() for child in self.children],
+        )
+
+
+class CellProfiler:
+    """Records cell builds while active.
+
+    Use it as a context manager or call `start` and `stop`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self.events: List[CellEvent] = []
+        self.roots: List[CellEvent] = []
+        self._stack: List[CellEvent] = []
+        self._t0 = time.perf_counter()
+
+    def __enter__(self) -> "CellProfiler":
+        """Activates the profiler."""
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Deactivates the profiler."""
+        self.stop()
+
+    def start(self) -> None:
+        """Activates the profiler for all @cell functions."""
+        from gdsfactory.cell import set_profiler
+
+        set_profiler(self)
+
+    def stop(self) -> None:
+        """Deactivates the profiler."""
+        from gdsfactory.cell import set_profiler
+
+        set_profiler(None)
+        self._stack.clear()
+
+    def _add(self, event: CellEvent) -> None:
+        self.events.append(event)
+        if event.parent is None:
+            self.roots.append(event)
+        else:
+            event.parent.children.append(event)
+
+    def record_hit(self, function_name: str, name: str) -> None:
+        """Records a cache hit."""
+        parent = self._stack[-1] if self._stack else None
+        event = CellEvent(
+            function_name, name, time.perf_counter(), cache_hit=True, parent=parent
+        )
+        self._add(event)
+
+    def record_start(self, function_name: str, name: str) -> CellEvent:
+        """Records the start of a cell build (cache miss)."""
+        parent = self._stack[-1] if self._stack else None
+        event = CellEvent(function_name, name, time.perf_counter(), parent=parent)
+        self._add(event)
+        self._stack.append(event)
+        return event
+
+    def record_stop(self, event: CellEvent, component: Component) -> None:
+        """Records the end of a cell build and the geometry it produced."""
+        event.end = time.perf_counter()
+        event.name = component.name
+        for polygonset in component.polygons:
+            event.polygons += len(polygonset.polygons)
+            event.vertices += sum(len(points) for points in polygonset.polygons)
+
+        self._pop(event)
+
+    def record_error(self, event: CellEvent) -> None:
+        """Records the end of a cell build that raised an exception."""
+        event.end = time.perf_counter()
+        self._pop(event)
+
+    def _pop(self, event: CellEvent) -> None:
+        """Pops event and the events of nested builds that raised an exception."""
+        if event not in self._stack:
+            return
+        while self._stack.pop() is not event:
+            pass
+        if event.parent is not None:
+            event.parent.children_time += event.time
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns stats for each cell function.
+
+        hits, misses, hit_rate, time (total build time), time_self (without
+        children builds), polygons and vertices produced.
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        for event in self.events:
+            s = stats.setdefault(
+                event.function_name,
+                dict(
+                    function=event.function_name,
+                    hits=0,
+                    misses=0,
+                    time=0.0,
+                    time_self=0.0,
+                    polygons=0,
+                    vertices=0,
+                ),
+            )
+            if event.cache_hit:
+                s["hits"] += 1
+                continue
+            s["misses"] += 1
+            s["time_self"] += event.time_self
+            s["polygons"] += event.polygons
+            s["vertices"] += event.vertices
+
+        # a recursive cell only counts the outermost build in its total time
+        for event in self.events:
+            if not event.cache_hit and not _has_ancestor(event, event.function_name):
+                stats[event.function_name]["time"] += event.time
+
+        for s in stats.values():
+            s["hit_rate"] = s["hits"] / (s["hits"] + s["misses"])
+        return stats
+
+    def get_dataframe(self, sort_by: str = "time_self", ascending: bool = False):
+        """Returns a pandas DataFrame with the stats for each cell function.
+
+        Args:
+            sort_by: column to sort by (time, time_self, hits, misses, hit_rate,
+                polygons, vertices).
+            ascending: sort order.
+        """
+        import pandas as pd
+
+        columns = [
+            "function",
+            "hits",
+            "misses",
+            "hit_rate",
+            "time",
+            "time_self",
+            "polygons",
+            "vertices",
+        ]
+        df = pd.DataFrame(list(self.get_stats().values()), columns=columns)
+        return df.sort_values(by=sort_by, ascending=ascending, ignore_index=True)
+
+    def write_csv(self, filepath: PathType, **kwargs) -> pathlib.Path:
+        """Writes the stats for each cell function in CSV.
+
+        Keyword Args:
+            sort_by: column to sort by.
+            ascending: sort order.
+        """
+        filepath = pathlib.Path(filepath)
+        self.get_dataframe(**kwargs).to_csv(filepath, index=False)
+        return filepath
+
+    def get_tree(self) -> List[Dict[str, Any]]:
+        """Returns the build tree as a list of nested dicts, one per top cell."""
+        return [event.to_dict() for event in self.roots]
+
+    def print_tree(self, max_depth: Optional[int] = None, hits: bool = False) -> None:
+        """Prints the build tree.
+
+        Args:
+            max_depth: maximum depth to print. None prints all.
+            hits: also print cache hits.
+        """
+        for event in self.roots:
+            _print_event(event, depth=0, max_depth=max_depth, hits=hits)
+
+    def get_chrome_trace(self) -> Dict[str, Any]:
+        """Returns the build as Chrome trace events.
+
+        Open it with chrome://tracing, https://ui.perfetto.dev or speedscope
+        to see the flamegraph.
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        trace_events = []
+        for event in self.events:
+            d = dict(
+                name=event.function_name,
+                cat="cache_hit" if event.cache_hit else "build",
+                ts=(event.start - self._t0) * 1e6,
+                pid=pid,
+                tid=tid,
+                args=dict(
+                    name=event.name,
+                    polygons=event.polygons,
+                    vertices=event.vertices,
+                ),
+            )
+            if event.cache_hit:
+                d.update(ph="i", s="t")
+            else:
+                d.update(ph="X", dur=event.time * 1e6)
+            trace_events.append(d)
+        return dict(traceEvents=trace_events, displayTimeUnit="ms")
+
+    def write_chrome_trace(self, filepath: PathType) -> pathlib.Path:
+        """Writes the build in Chrome trace JSON format."""
+        filepath = pathlib.Path(filepath)
+        filepath.write_text(json.dumps(self.get_chrome_trace()))
+        return filepath
+
+
+def _has_ancestor(event: CellEvent, function_name: str) -> bool:
+    parent = event.parent
+    while parent is not None:
+        if parent.function_name == function_name:
+            return True
+        parent = parent.parent
+    return False
+
+
+def _print_event(
+    event: CellEvent, depth: int, max_depth: Optional[int], hits: bool
+) -> None:
+    if event.cache_hit:
+        if hits:
+            print(f"{'  ' * depth}{event.name} (cache hit)")
+        return
+    print(
+        f"{'  ' * depth}{event.name} {event.time * 1e3:.3f}ms "
+        f"(self {event.time_self * 1e3:.3f}ms, {event.polygons} polygons)"
+    )
+    if max_depth is not None and depth >= max_depth:
+        return
+    for child in event.children:
+        _print_event(child, depth=depth + 1, max_depth=max_depth, hits=hits)
+
+
+def test_cell_profiler() -> None:
+    import gdsfactory as gf
+
+    gf.clear_cache()
+    with CellProfiler() as profiler:
+        c = gf.components.mzi()
+        gf.components.mzi()
+
+    stats = profiler.get_stats()
+    assert stats["mzi"]["misses"] == 1
+    assert stats["mzi"]["hits"] == 1
+    assert stats["straight"]["polygons"] > 0
+    assert stats["mzi"]["time"] >= stats["mzi"]["time_self"]
+
+    tree = profiler.get_tree()
+    assert tree[0]["name"] == c.name
+    assert tree[0]["children"]
+
+    df = profiler.get_dataframe(sort_by="time")
+    assert df["time"].is_monotonic_decreasing
+
+    trace = profiler.get_chrome_trace()
+    assert len(trace["traceEvents"]) == len(profiler.events)
+
+    from gdsfactory.cell import PROFILER
+
+    assert PROFILER is None
+
+
+if __name__ == "__main__":
+    import gdsfactory as gf
+
+    with CellProfiler() as profiler:
+        c = gf.components.mzi()
+        c = gf.components.ring_single()
+
+    print(profiler.get_dataframe())
+    profiler.print_tree()
@@ -59,6 +59,7 @@ from typing_extensions import Literal
 from gdsfactory.add_pins import add_instance_label
 from gdsfactory.cell import cell
 from gdsfactory.component import Component, ComponentReference
+from gdsfactory.executor import get_components
 from gdsfactory.routing.factories import routing_strategy as routing_strategy_factories
 from gdsfactory.types import Route
 
@@ -650,12 +651,15 @@ def _from_yaml(
 
     pdk = get_active_pdk()
 
+    component_specs = []
     for instance_name in instances_dict:
         instance_conf = instances_dict[instance_name]
         component = instance_conf["component"]
         settings = instance_conf.get("settings", {})
-        component_spec = {"component": component, "settings": settings}
-        component = pdk.get_component(component_spec)
+        component_specs.append({"component": component, "settings": settings})
+
+    components = get_components(component_specs)
+    for instance_name, component in zip(instances_dict, components):
         ref = c.add_ref(component, alias=instance_name)
         instances[instance_name] = ref
 
@@ -0,0 +1,330 @@
+"""Lazy GDS reader that loads cells on demand.
+
+`GdsIndex` scans a memory-mapped GDS file once, recording the byte range of
+each cell and the cells it references, without decoding any geometry. Cells are
+only parsed when they, or a cell that references them, are requested. The
+Components built for each cell are kept in the index, so importing another cell
+of the same file reuses the cells already loaded.
+
+Indexes are cached by (path, mtime, size), so a GDS file that changes on disk is
+indexed again. Only the MAX_INDEXES most recently used files are kept, and
+`gf.clear_cache()` clears them all.
+
+.. code::
+
+    from gdsfactory.read.gds_index import get_gds_index
+
+    index = get_gds_index("foundry.gds")
+    index.top_level()
+    c = index.get_component("mmi1x2")
+
+"""
+import io
+import mmap
+import pathlib
+import struct
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import gdspy
+import numpy as np
+from phidl.device_layout import CellArray
+
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.name import get_name_short
+from gdsfactory.snap import snap_to_grid
+from gdsfactory.types import PathType
+
+_BGNSTR = 0x0502
+_STRNAME = 0x0606
+_ENDSTR = 0x0700
+_SNAME = 0x1206
+_ENDLIB = 0x0400
+
+# Components already built for a cell with some import options
+_ComponentKey = Tuple[str, Optional[int], bool]
+
+
+def _decode(record: bytes) -> str:
+    name = record.decode("ascii")
+    return name[:-1] if name.endswith("\0") else name
+
+
+class GdsIndex:
+    """Byte offsets of the cells of a GDS file and their dependencies.
+
+    Args:
+        gdspath: GDS file path.
+    """
+
+    def __init__(self, gdspath: PathType) -> None:
+        """Scans the file records without decoding the elements."""
+        self.gdspath = pathlib.Path(gdspath)
+        stat = self.gdspath.stat()
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+
+        self.cells: Dict[str, Tuple[int, int]] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+        self.components: Dict[_ComponentKey, Component] = {}
+
+        header_end = 0
+        with open(self.gdspath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            unpack = struct.Struct(">HH").unpack_from
+            size = len(data)
+            pos = start = 0
+            name = ""
+            while pos + 4 <= size:
+                length, record_type = unpack(data, pos)
+                if length < 4:
+                    # null padding after ENDLIB
+                    break
+                if record_type == _BGNSTR:
+                    start = pos
+                    header_end = header_end or pos
+                elif record_type == _STRNAME:
+                    name = _decode(data[pos + 4 : pos + length])
+                    if name in self.cells:
+                        raise ValueError(
+                            f"Multiple cells with name {name!r} in {str(gdspath)!r}"
+                        )
+                    self.dependencies[name] = []
+                elif record_type == _SNAME:
+                    child = _decode(data[pos + 4 : pos + length])
+                    if child not in self.dependencies[name]:
+                        self.dependencies[name].append(child)
+                elif record_type == _ENDSTR:
+                    self.cells[name] = (start, pos + length)
+                elif record_type == _ENDLIB:
+                    break
+                pos += length
+            self.header = data[:header_end]
+
+    def top_level(self) -> List[str]:
+        """Returns the names of the cells not referenced by any other cell."""
+        children = {
+            child for children in self.dependencies.values() for child in children
+        }
+        return [name for name in self.cells if name not in children]
+
+    def get_dependencies(self, cellname: str) -> List[str]:
+        """Returns a cell and all the cells it references, children first."""
+        visited = {cellname}
+        order = []
+        stack = [(cellname, iter(self.dependencies[cellname]))]
+        while stack:
+            name, children = stack[-1]
+            for child in children:
+                if child in self.cells and child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(self.dependencies[child])))
+                    break
+            else:
+                stack.pop()
+                order.append(name)
+        return order
+
+    def read_cells(self, cellnames: Iterable[str]) -> gdspy.GdsLibrary:
+        """Returns a gdspy library with only some cells of the file.
+
+        References to cells that are not read keep the cell name as ref_cell.
+
+        Args:
+            cellnames: names of the cells to read.
+        """
+        with open(self.gdspath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            records = [self.header]
+            records += [data[slice(*self.cells[name])] for name in cellnames]
+        records.append(struct.pack(">2H", 4, _ENDLIB))
+        return gdspy.GdsLibrary().read_gds(io.BytesIO(b"".join(records)))
+
+    def get_component(
+        self,
+        cellname: str,
+        snap_to_grid_nm: Optional[int] = None,
+        hashed_name: bool = True,
+        cache: bool = True,
+    ) -> Component:
+        """Returns a Component with a cell of the file and its hierarchy.
+
+        Only the cells that were not loaded before are read from the file.
+
+        Args:
+            cellname: cell to load.
+            snap_to_grid_nm: snap polygons to a nm grid (does not snap if None).
+            hashed_name: appends a hash to shortened component names.
+            cache: returns the cached Component for cellname if it was loaded.
+                If False the Component for cellname is always built again, but
+                the Components of the cells it references are still shared.
+        """
+        if cellname not in self.cells:
+            raise ValueError(
+                f"cell {cellname!r} is not in file {self.gdspath} "
+                f"with cells {self.top_level()}"
+            )
+
+        def key(name: str) -> _ComponentKey:
+            return (name, snap_to_grid_nm, hashed_name)
+
+        if cache and key(cellname) in self.components:
+            return self.components[key(cellname)]
+
+        cellnames = [
+            name
+            for name in self.get_dependencies(cellname)
+            if name == cellname or key(name) not in self.components
+        ]
+        lib = self.read_cells(cellnames)
+        for name in cellnames:
+            component = _cell_to_component(
+                lib.cells[name],
+                components={
+                    child: self.components[key(child)]
+                    for child in self.dependencies[name]
+                    if key(child) in self.components
+                },
+                snap_to_grid_nm=snap_to_grid_nm,
+                hashed_name=hashed_name,
+            )
+            if name != cellname:
+                component.lock()
+                self.components[key(name)] = component
+        if cache:
+            component.lock()
+            self.components[key(cellname)] = component
+        return component
+
+
+def _cell_to_component(
+    cell: gdspy.Cell,
+    components: Dict[str, Component],
+    snap_to_grid_nm: Optional[int] = None,
+    hashed_name: bool = True,
+) -> Component:
+    """Returns a Component from a gdspy Cell.
+
+    Args:
+        cell: to convert.
+        components: Components of the cells referenced by cell, by cell name.
+        snap_to_grid_nm: snap polygons to a nm grid (does not snap if None).
+        hashed_name: appends a hash to a shortened component name.
+    """
+    D = Component(name=get_name_short(cell.name) if hashed_name else cell.name)
+    D.paths = cell.paths
+
+    for label in cell.labels:
+        rotation = label.rotation
+        if rotation is None:
+            rotation = 0
+        label_ref = D.add_label(
+            text=label.text,
+            position=np.asfarray(label.position),
+            magnification=label.magnification,
+            rotation=rotation * 180 / np.pi,
+            layer=(label.layer, label.texttype),
+        )
+        label_ref.anchor = label.anchor
+
+    # convert each reference so it points to the right Component
+    for e in cell.references:
+        ref_cell = e.ref_cell
+        ref_device = components[
+            ref_cell if isinstance(ref_cell, str) else ref_cell.name
+        ]
+        if isinstance(e, gdspy.CellReference):
+            dr = ComponentReference(
+                component=ref_device,
+                origin=e.origin,
+                rotation=e.rotation,
+                magnification=e.magnification,
+                x_reflection=e.x_reflection,
+            )
+        elif isinstance(e, gdspy.CellArray):
+            dr = CellArray(
+                device=ref_device,
+                columns=e.columns,
+                rows=e.rows,
+                spacing=e.spacing,
+                origin=e.origin,
+                rotation=e.rotation,
+                magnification=e.magnification,
+                x_reflection=e.x_reflection,
+            )
+        dr.owner = D
+        D.references.append(dr)
+
+    for p in cell.polygons:
+        if snap_to_grid_nm:
+            points_on_grid = snap_to_grid(p.polygons[0], nm=snap_to_grid_nm)
+            p = gdspy.Polygon(
+                points_on_grid, layer=p.layers[0], datatype=p.datatypes[0]
+            )
+        D.add_polygon(p)
+    return D
+
+
+MAX_INDEXES = 16
+_INDEXES: "OrderedDict[pathlib.Path, GdsIndex]" = OrderedDict()
+
+
+def get_gds_index(gdspath: PathType) -> GdsIndex:
+    """Returns the GdsIndex of a GDS file.
+
+    Indexes are cached until the file modification time or size changes.
+    Only the MAX_INDEXES most recently used indexes are kept.
+
+    Args:
+        gdspath: GDS file path.
+    """
+    gdspath = pathlib.Path(gdspath).resolve()
+    stat = gdspath.stat()
+    index = _INDEXES.get(gdspath)
+    if index is None or (index.mtime, index.size) != (stat.st_mtime_ns, stat.st_size):
+        index = _INDEXES[gdspath] = GdsIndex(gdspath)
+    _INDEXES.move_to_end(gdspath)
+    while len(_INDEXES) > MAX_INDEXES:
+        _INDEXES.popitem(last=False)
+    return index
+
+
+def clear_gds_index_cache() -> None:
+    """Clears the cached GDS indexes and the Components they loaded."""
+    _INDEXES.clear()
+
+
+def test_gds_index(tmp_path) -> None:
+    import gdsfactory as gf
+
+    c = gf.Component("gds_index_top")
+    c << gf.components.mzi()
+    c << gf.components.straight()
+    gdspath = c.write_gds(tmp_path / "top.gds")
+
+    index = get_gds_index(gdspath)
+    assert index.top_level() == [c.name]
+    assert set(index.cells) == {c.name} | {
+        cell.name for cell in c.get_dependencies(recursive=True)
+    }
+    assert get_gds_index(gdspath) is index
+
+    straight = index.get_component(gf.components.straight().name, hashed_name=False)
+    assert straight.hash_geometry() == gf.components.straight().hash_geometry()
+    assert len(index.components) == 1
+
+    top = index.get_component(c.name, hashed_name=False)
+    assert top.hash_geometry(precision=1e-3) == c.hash_geometry(precision=1e-3)
+    assert straight in top.get_dependencies()
+
+
+if __name__ == "__main__":
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    index = get_gds_index(c.write_gds())
+    print(index.top_level())
+    print(index.get_component(c.name))
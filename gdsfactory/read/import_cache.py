@@ -0,0 +1,173 @@
+"""Cache for imported GDS files keyed by file content.
+
+`import_gds` returns the same locked Component for the same GDS (and YAML
+metadata) content and import options, no matter which path the file is read
+from, and reads it again as soon as the file changes.
+
+File hashes are memoized by path, modification time and size, so a cache hit
+does not read the file again.
+
+Both caches are bounded: the least recently used imports that are not
+referenced by a live Component are evicted after MAX_IMPORTS files, and only
+MAX_FILE_HASHES file hashes are kept. `gf.clear_cache()` clears both.
+
+You can also share imported cells across processes with an opt-in on-disk tier.
+
+.. code::
+
+    from gdsfactory.read.import_cache import set_import_disk_cache
+
+    set_import_disk_cache(gf.CONFIG["cache_directory"] / "imports")
+
+Cells are stored with pickle, so only point the disk cache to a trusted directory.
+"""
+import hashlib
+import mmap
+import pathlib
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from gdsfactory.cache import ComponentCache, DiskCache
+from gdsfactory.component import Component
+from gdsfactory.config import CONFIG
+from gdsfactory.types import PathType
+
+MAX_IMPORTS = 256
+MAX_FILE_HASHES = 4096
+
+IMPORT_CACHE = ComponentCache(max_items=MAX_IMPORTS)
+IMPORT_DISK_CACHE: Optional[DiskCache] = None
+
+# path: (mtime, size, sha256)
+_FILE_HASHES: "OrderedDict[pathlib.Path, Tuple[int, int, str]]" = OrderedDict()
+
+
+def set_import_disk_cache(
+    dirpath: Optional[PathType] = None, enabled: bool = True
+) -> None:
+    """Enables or disables the on-disk tier of the import cache.
+
+    Args:
+        dirpath: directory to store the imported cells.
+            Defaults to CONFIG["cache_directory"] / "imports".
+        enabled: False disables the on-disk tier.
+    """
+    global IMPORT_DISK_CACHE
+    IMPORT_DISK_CACHE = (
+        DiskCache(dirpath or CONFIG["cache_directory"] / "imports") if enabled else None
+    )
+
+
+def clear_import_cache() -> None:
+    """Clears the in-memory import cache and the memoized file hashes."""
+    IMPORT_CACHE.clear()
+    _FILE_HASHES.clear()
+
+
+def get_file_hash(filepath: PathType) -> str:
+    """Returns the sha256 of a file, memoized by path, mtime and size."""
+    filepath = pathlib.Path(filepath).resolve()
+    stat = filepath.stat()
+    mtime, size, digest = _FILE_HASHES.get(filepath, (None, None, ""))
+    if (mtime, size) == (stat.st_mtime_ns, stat.st_size):
+        _FILE_HASHES.move_to_end(filepath)
+        return digest
+
+    if stat.st_size:
+        with open(filepath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            digest = hashlib.sha256(data).hexdigest()
+    else:
+        digest = hashlib.sha256(b"").hexdigest()
+    _FILE_HASHES[filepath] = (stat.st_mtime_ns, stat.st_size, digest)
+    _FILE_HASHES.move_to_end(filepath)
+    while len(_FILE_HASHES) > MAX_FILE_HASHES:
+        _FILE_HASHES.popitem(last=False)
+    return digest
+
+
+def get_import_key(
+    gdspath: PathType, read_metadata: bool = True, **options: Any
+) -> str:
+    """Returns the cache key for a GDS file content and import options.
+
+    Args:
+        gdspath: GDS file path.
+        read_metadata: includes the YAML metadata file content, if it exists.
+        options: import options (cellname, snap_to_grid_nm, hashed_name ...).
+    """
+    gdspath = pathlib.Path(gdspath)
+    metadata_filepath = gdspath.with_suffix(".yml")
+    metadata_hash = (
+        get_file_hash(metadata_filepath)
+        if read_metadata and metadata_filepath.exists()
+        else None
+    )
+    return DiskCache.get_key(
+        "import_gds", get_file_hash(gdspath), metadata_hash, read_metadata, options
+    )
+
+
+def load(key: str) -> Optional[Component]:
+    """Returns the imported Component from memory or disk, or None."""
+    component = IMPORT_CACHE.get(key)
+    if component is None and IMPORT_DISK_CACHE is not None:
+        # imported cells are not merged with @cell cells of the same name
+        component = IMPORT_DISK_CACHE.load(key)
+        if component is not None:
+            IMPORT_CACHE[key] = component
+    return component
+
+
+def save(key: str, component: Component) -> None:
+    """Adds the imported Component to the cache."""
+    IMPORT_CACHE[key] = component
+    if IMPORT_DISK_CACHE is not None:
+        IMPORT_DISK_CACHE.save(key, component)
+
+
+def test_import_cache(tmp_path) -> None:
+    import shutil
+
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    gdspath = c.write_gds(tmp_path / "mzi.gds")
+    c1 = gf.import_gds(gdspath)
+    assert c1._locked
+    assert gf.import_gds(gdspath) is c1
+    assert gf.import_gds(gdspath, hashed_name=False) is not c1
+
+    # same content in another path
+    gdspath2 = tmp_path / "mzi2.gds"
+    shutil.copy(gdspath, gdspath2)
+    assert gf.import_gds(gdspath2) is c1
+
+    gf.components.straight().write_gds(gdspath2)
+    assert gf.import_gds(gdspath2).name == gf.components.straight().name
+
+
+def test_import_disk_cache(tmp_path) -> None:
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    gdspath = c.write_gds(tmp_path / "mzi.gds")
+    set_import_disk_cache(tmp_path / "imports")
+    clear_import_cache()
+    try:
+        c1 = gf.import_gds(gdspath)
+        clear_import_cache()
+        c2 = gf.import_gds(gdspath)
+        assert c2 is not c1
+        assert IMPORT_DISK_CACHE.stats.hits == 1
+        assert c2.name == c1.name
+        assert c2.hash_geometry() == c1.hash_geometry()
+    finally:
+        set_import_disk_cache(enabled=False)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_import_cache(pathlib.Path(tempfile.mkdtemp()))
@@ -6,6 +6,7 @@ from gdsfactory.routing.add_electrical_pads_top import add_electrical_pads_top
 from gdsfactory.routing.add_electrical_pads_top_dc import add_electrical_pads_top_dc
 from gdsfactory.routing.add_fiber_array import add_fiber_array
 from gdsfactory.routing.add_fiber_single import add_fiber_single
+from gdsfactory.routing.check_routes import check_routes
 from gdsfactory.routing.fanout import fanout_component, fanout_ports
 from gdsfactory.routing.fanout2x2 import fanout2x2
 from gdsfactory.routing.get_bundle import (
@@ -33,6 +34,7 @@ from gdsfactory.routing.get_route import (
     get_route_from_waypoints_electrical,
     get_route_from_waypoints_electrical_multilayer,
 )
+from gdsfactory.routing.get_route_astar import get_route_astar, get_routes_astar
 from gdsfactory.routing.get_route_from_steps import (
     get_route_from_steps,
     get_route_from_steps_electrical,
@@ -52,6 +54,7 @@ __all__ = [
     "add_electrical_pads_top_dc",
     "add_fiber_array",
     "add_fiber_single",
+    "check_routes",
     "get_bundle",
     "get_bundle_from_steps",
     "get_bundle_from_steps_electrical",
@@ -65,6 +68,8 @@ __all__ = [
     "get_route",
     "get_route_electrical",
     "get_route_electrical_multilayer",
+    "get_route_astar",
+    "get_routes_astar",
     "get_routes_bend180",
     "get_routes_straight",
     "get_route_sbend",
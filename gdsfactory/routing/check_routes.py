@@ -0,0 +1,464 @@
+"""Fast collision checks for routes, without running DRC.
+
+`check_routes` finds routes that cross or overlap each other, and routes that
+cut through the references of a Component.
+
+Each route is reduced to the waypoint segments of its references: straights and
+tapers go from port to port, and bends go from port to corner to port, as in
+the waypoints given to `round_corners`. Segments are boxes as wide as their
+ports. Overlapping horizontal and vertical segments are found with a
+sweep line over x, and parallel segments with a sweep line along them.
+
+The footprint of each reference (bounding box of straights, tapers and bends)
+is then checked against the bounding box of the references of the Component,
+through a two level R-tree of the Component references.
+
+.. code::
+
+    import gdsfactory as gf
+
+    route1 = gf.routing.get_route_from_waypoints([(0, 100), (200, 100), (200, 300)])
+    route2 = gf.routing.get_route_from_waypoints([(100, 0), (100, 250)])
+    c = gf.Component()
+    mmi = c << gf.components.mmi1x2()
+    mmi.move((150, 100))
+
+    for index, other, (x, y) in gf.routing.check_routes([route1, route2], c):
+        print(f"route {index} collides with {other} at ({x}, {y})")
+
+"""
+import bisect
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+from gdsfactory.component import Component
+from gdsfactory.types import Route
+
+Collision = Tuple[int, Union[int, str], Tuple[float, float]]
+
+TOLERANCE = 1e-3
+
+
+def _get_parent_geometry(
+    parents: List[Component],
+) -> Tuple[ndarray, ndarray, ndarray]:
+    """Returns the bounding box corners, waypoints and half widths of cells.
+
+    The waypoints go from port to port through the middle for straights and
+    tapers, and through the corner for bends. Cells with less than two ports
+    have NaN waypoints.
+    """
+    bboxes = []
+    ports = []
+    for parent in parents:
+        bbox = parent.get_bounding_box()
+        bboxes.append(np.zeros((2, 2)) if bbox is None else bbox)
+        port_list = list(parent.ports.values())[:2]
+        if len(port_list) < 2:
+            ports.append((np.nan,) * 7)
+            continue
+        port1, port2 = port_list
+        ports.append(
+            (
+                *port1.center,
+                *port2.center,
+                np.nan if port1.orientation is None else port1.orientation,
+                np.nan if port2.orientation is None else port2.orientation,
+                max(port1.width, port2.width),
+            )
+        )
+    xmin, ymin, xmax, ymax = np.array(bboxes, dtype=float).reshape(-1, 4).T
+    corners = np.stack(
+        [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)], axis=1
+    ).transpose(2, 1, 0)
+
+    ports = np.array(ports, dtype=float).reshape(-1, 7)
+    p1 = ports[:, 0:2]
+    p2 = ports[:, 2:4]
+    a1, a2 = np.deg2rad(ports[:, 4:6].T)
+    d1 = np.column_stack([np.cos(a1), np.sin(a1)])
+    d2 = np.column_stack([np.cos(a2), np.sin(a2)])
+    det = d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0]
+    bend = np.abs(det) > 1e-6
+    # bends: both ports point outwards, the corner is behind them
+    delta = p2 - p1
+    t = (delta[:, 0] * d2[:, 1] - delta[:, 1] * d2[:, 0]) / np.where(bend, det, 1)
+    middle = np.where(bend[:, None], p1 + t[:, None] * d1, (p1 + p2) / 2)
+    points = np.stack([p1, middle, p2], axis=1)
+    return corners, points, ports[:, 6] / 2
+
+
+def _transform(
+    points: ndarray, origin: ndarray, rotation: ndarray, x_reflection: ndarray
+) -> ndarray:
+    """Returns points (n, k, 2) transformed by n references."""
+    x = points[..., 0]
+    y = np.where(x_reflection[:, None], -points[..., 1], points[..., 1])
+    angle = np.deg2rad(rotation)[:, None]
+    c = np.cos(angle)
+    s = np.sin(angle)
+    manhattan = (rotation % 90 == 0)[:, None]
+    c = np.where(manhattan, np.round(c), c)
+    s = np.where(manhattan, np.round(s), s)
+    return np.stack(
+        [x * c - y * s + origin[:, None, 0], x * s + y * c + origin[:, None, 1]],
+        axis=-1,
+    )
+
+
+def get_route_geometry(routes: List[Route]) -> Dict[str, ndarray]:
+    """Returns the waypoint segments and the footprints of routes.
+
+    segments: (n, 4) boxes xmin, ymin, xmax, ymax of each segment, as wide as
+        its ports. Horizontal and vertical segments end at their waypoints,
+        other segments also grow by half their width along.
+        segment_route: route index of each segment.
+        segment_manhattan: True for horizontal or vertical segments.
+    footprints: (m, 4) bounding box of each reference.
+        footprint_route: route index of each reference.
+
+    Args:
+        routes: list of routes.
+    """
+    parents = []
+    parent_ids = {}
+    parent_index = []
+    origins = []
+    rotations = []
+    x_reflections = []
+    n_references = []
+    for route in routes:
+        for reference in route.references:
+            parent = reference.ref_cell
+            i = parent_ids.get(id(parent))
+            if i is None:
+                i = parent_ids[id(parent)] = len(parents)
+                parents.append(parent)
+            parent_index.append(i)
+            origins.append(reference.origin)
+            rotations.append(reference.rotation)
+            x_reflections.append(reference.x_reflection)
+        n_references.append(len(route.references))
+
+    parent_index = np.array(parent_index, dtype=int)
+    route_index = np.repeat(np.arange(len(routes)), n_references)
+    origins = np.array(origins, dtype=float).reshape(-1, 2)
+    rotations = np.nan_to_num(np.array(rotations, dtype=float))
+    x_reflections = np.array(x_reflections, dtype=bool)
+
+    corners, points, half_widths = _get_parent_geometry(parents)
+    corners = _transform(corners[parent_index], origins, rotations, x_reflections)
+    footprints = np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1)
+
+    # each reference has two segments
+    selected = ~np.isnan(half_widths[parent_index])
+    points = _transform(
+        points[parent_index[selected]],
+        origins[selected],
+        rotations[selected],
+        x_reflections[selected],
+    )
+    p0 = points[:, :-1].reshape(-1, 2)
+    p1 = points[:, 1:].reshape(-1, 2)
+    half_width = np.repeat(half_widths[parent_index[selected]], 2)[:, None]
+    length = np.abs(p1 - p0)
+    manhattan = np.any(length < TOLERANCE, axis=1)
+    # manhattan segments only grow across, so routes that meet end to end at a
+    # port do not overlap
+    across = length[:, ::-1] >= TOLERANCE
+    grow = np.where(manhattan[:, None] & ~across, 0, half_width)
+    segments = np.concatenate([np.minimum(p0, p1), np.maximum(p0, p1)], axis=1)
+    segments[:, :2] -= grow
+    segments[:, 2:] += grow
+    return dict(
+        segments=segments,
+        segment_route=np.repeat(route_index[selected], 2),
+        segment_manhattan=manhattan,
+        footprints=footprints,
+        footprint_route=route_index,
+    )
+
+
+def _overlap(boxes1: ndarray, boxes2: ndarray) -> ndarray:
+    """Returns True for the pairs of boxes that overlap more than TOLERANCE."""
+    return np.all(
+        np.minimum(boxes1[:, 2:], boxes2[:, 2:])
+        - np.maximum(boxes1[:, :2], boxes2[:, :2])
+        > TOLERANCE,
+        axis=1,
+    )
+
+
+def _get_parallel_pairs(boxes: ndarray, axis: int) -> ndarray:
+    """Returns the pairs (i, j) of overlapping boxes, with i < j.
+
+    Sweeps along the boxes, that are thin along axis, so each box only tests
+    the boxes next to it across.
+    """
+    if axis == 0:
+        boxes = boxes[:, [1, 0, 3, 2]]
+    pairs = _get_crossing_pairs(boxes, boxes)
+    return pairs[pairs[:, 0] < pairs[:, 1]]
+
+
+def _get_crossing_pairs(horizontal: ndarray, vertical: ndarray) -> ndarray:
+    """Returns the pairs (i, j) of overlapping horizontal and vertical boxes.
+
+    A sweep line over x keeps the horizontal boxes that it crosses sorted by
+    ymin, and each vertical box looks up the ones in its y range.
+    """
+    if not len(horizontal) or not len(vertical):
+        return np.zeros((0, 2), dtype=int)
+    # horizontal boxes enter the sweep line early enough for any vertical box
+    # starting at xmin to see them
+    vertical_width = (vertical[:, 2] - vertical[:, 0]).max()
+    horizontal_height = (horizontal[:, 3] - horizontal[:, 1]).max()
+    n = len(horizontal)
+    xs = np.concatenate(
+        [horizontal[:, 0] - vertical_width, horizontal[:, 2], vertical[:, 0]]
+    )
+    # at the same x: remove, then look up, then add
+    kinds = np.concatenate(
+        [np.full(n, 2), np.zeros(n, dtype=int), np.ones(len(vertical), dtype=int)]
+    )
+    indices = np.concatenate([np.arange(n), np.arange(n), np.arange(len(vertical))])
+    events = np.lexsort((kinds, xs))
+
+    ymins = horizontal[:, 1].tolist()
+    vymins = (vertical[:, 1] - horizontal_height).tolist()
+    vymaxs = vertical[:, 3].tolist()
+    active = []
+    first = []
+    second = []
+    for kind, index in zip(kinds[events].tolist(), indices[events].tolist()):
+        if kind == 2:
+            bisect.insort(active, (ymins[index], index))
+        elif kind == 0:
+            del active[bisect.bisect_left(active, (ymins[index], index))]
+        else:
+            start = bisect.bisect_left(active, (vymins[index], -1))
+            end = bisect.bisect_left(active, (vymaxs[index], -1))
+            for _, h in active[start:end]:
+                first.append(h)
+                second.append(index)
+
+    pairs = np.array([first, second], dtype=int).T.reshape(-1, 2)
+    return pairs[_overlap(horizontal[pairs[:, 0]], vertical[pairs[:, 1]])]
+
+
+def _get_str_tree(boxes: ndarray, node_size: int = 16) -> Tuple[ndarray, ndarray]:
+    """Returns leaf node boxes and the box indices in each node.
+
+    Sort-Tile-Recursive packing: slices along x, then groups along y.
+    """
+    n = len(boxes)
+    n_nodes = max(int(np.ceil(n / node_size)), 1)
+    n_slices = max(int(np.ceil(np.sqrt(n_nodes))), 1)
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    order = np.argsort(centers[:, 0], kind="stable")
+    slices = np.arange(n) * n_slices // max(n, 1)
+    order = order[np.lexsort((centers[order, 1], slices))]
+    node = np.arange(n) // node_size
+    members = np.full((node[-1] + 1, node_size), -1)
+    members[node, np.arange(n) % node_size] = order
+    starts = np.arange(0, n, node_size)
+    sorted_boxes = boxes[order]
+    node_boxes = np.concatenate(
+        [
+            np.minimum.reduceat(sorted_boxes[:, :2], starts),
+            np.maximum.reduceat(sorted_boxes[:, 2:], starts),
+        ],
+        axis=1,
+    )
+    return node_boxes, members
+
+
+def _get_box_pairs(
+    boxes1: ndarray, boxes2: ndarray, chunk_size: int = 4096
+) -> ndarray:
+    """Returns the pairs (i, j) of overlapping boxes1[i] and boxes2[j]."""
+    if not len(boxes1) or not len(boxes2):
+        return np.zeros((0, 2), dtype=int)
+    node_boxes, members = _get_str_tree(boxes2)
+    pairs = []
+    for start in range(0, len(boxes1), chunk_size):
+        chunk = boxes1[start : start + chunk_size]
+        hits = np.all(
+            (chunk[:, None, :2] < node_boxes[None, :, 2:])
+            & (chunk[:, None, 2:] > node_boxes[None, :, :2]),
+            axis=2,
+        )
+        first, nodes = np.nonzero(hits)
+        second = members[nodes]
+        first = np.repeat(first, second.shape[1])
+        second = second.ravel()
+        valid = second >= 0
+        pairs.append(np.column_stack([first[valid] + start, second[valid]]))
+    pairs = np.concatenate(pairs)
+    return pairs[_overlap(boxes1[pairs[:, 0]], boxes2[pairs[:, 1]])]
+
+
+def _get_overlap(boxes1: ndarray, boxes2: ndarray) -> ndarray:
+    """Returns the overlap of the pairs of boxes."""
+    return np.concatenate(
+        [
+            np.maximum(boxes1[:, :2], boxes2[:, :2]),
+            np.minimum(boxes1[:, 2:], boxes2[:, 2:]),
+        ],
+        axis=1,
+    )
+
+
+def _merge_overlaps(
+    keys: List[Tuple[int, Union[int, str]]], boxes: ndarray
+) -> List[Collision]:
+    """Returns one collision for each region of touching overlaps with one key.
+
+    A region grows with the overlaps that touch its bounding box, and the
+    location is the center of that bounding box. Collisions are in the order
+    of the first overlap of each region.
+    """
+    groups: Dict[Tuple[int, Union[int, str]], List[int]] = {}
+    for index, key in enumerate(keys):
+        groups.setdefault(key, []).append(index)
+
+    box_list = boxes.tolist()
+    collisions = []
+    for key, indices in groups.items():
+        regions = []  # first overlap, xmin, ymin, xmax, ymax
+        for index in indices:
+            region = [index, *box_list[index]]
+            i = 0
+            while i < len(regions):
+                other = regions[i]
+                if (
+                    other[1] <= region[3] + TOLERANCE
+                    and region[1] <= other[3] + TOLERANCE
+                    and other[2] <= region[4] + TOLERANCE
+                    and region[2] <= other[4] + TOLERANCE
+                ):
+                    del regions[i]
+                    region = [
+                        min(region[0], other[0]),
+                        min(region[1], other[1]),
+                        min(region[2], other[2]),
+                        max(region[3], other[3]),
+                        max(region[4], other[4]),
+                    ]
+                    i = 0
+                else:
+                    i += 1
+            regions.append(region)
+        for first, xmin, ymin, xmax, ymax in regions:
+            location = (round((xmin + xmax) / 2, 3), round((ymin + ymax) / 2, 3))
+            collisions.append((first, (*key, location)))
+    return [collision for _, collision in sorted(collisions, key=lambda c: c[0])]
+
+
+def check_routes(
+    routes: List[Route],
+    component: Optional[Component] = None,
+) -> List[Collision]:
+    """Returns the routes that collide with each other or with a Component.
+
+    Each collision is (route index, other route index or reference name,
+    (x, y)). Touching overlaps of the same route and other route or reference
+    are one collision at the center of their bounding box, so two routes that
+    overlap along several segments collide once. Routes are checked through
+    the segments of their waypoints, as wide as their ports. Only horizontal
+    and vertical segments are checked against other routes. The footprint of
+    each route reference is checked against the bounding box of the
+    references of component, other than the route references. A route can go
+    into the references where its own ports are, as it connects to them.
+
+    Args:
+        routes: list of routes.
+        component: optional Component with the devices that routes can not
+            cut through.
+
+    """
+    geometry = get_route_geometry(routes)
+    segments = geometry["segments"]
+    segment_route = geometry["segment_route"]
+
+    size = segments[:, 2:] - segments[:, :2]
+    manhattan = geometry["segment_manhattan"]
+    horizontal_ids = np.flatnonzero(manhattan & (size[:, 0] >= size[:, 1]))
+    vertical_ids = np.flatnonzero(manhattan & (size[:, 0] < size[:, 1]))
+
+    pairs = [
+        horizontal_ids[_get_parallel_pairs(segments[horizontal_ids], axis=1)],
+        vertical_ids[_get_parallel_pairs(segments[vertical_ids], axis=0)],
+    ]
+    crossing = _get_crossing_pairs(segments[horizontal_ids], segments[vertical_ids])
+    pairs.append(
+        np.column_stack(
+            [horizontal_ids[crossing[:, 0]], vertical_ids[crossing[:, 1]]]
+        )
+    )
+    pairs = np.concatenate(pairs)
+    route1 = segment_route[pairs[:, 0]]
+    route2 = segment_route[pairs[:, 1]]
+    different = route1 != route2
+    pairs = pairs[different]
+    overlaps = _get_overlap(segments[pairs[:, 0]], segments[pairs[:, 1]])
+    route1, route2 = np.sort([route1[different], route2[different]], axis=0)
+    collisions = _merge_overlaps(
+        list(zip(route1.tolist(), route2.tolist())), overlaps
+    )
+
+    if component is not None:
+        route_references = {
+            id(reference) for route in routes for reference in route.references
+        }
+        devices = []
+        device_boxes = []
+        for reference in component.references:
+            if id(reference) in route_references:
+                continue
+            bbox = reference.get_bounding_box()
+            if bbox is None:
+                continue
+            devices.append(reference)
+            device_boxes.append(np.ravel(bbox))
+        device_boxes = np.array(device_boxes, dtype=float).reshape(-1, 4)
+
+        footprints = geometry["footprints"]
+        footprint_route = geometry["footprint_route"]
+        pairs = _get_box_pairs(footprints, device_boxes)
+
+        # routes can go into the references that they connect to
+        route_ports = np.array(
+            [
+                [port.center for port in list(route.ports)[:2]]
+                if len(route.ports) >= 2
+                else [(np.nan, np.nan)] * 2
+                for route in routes
+            ],
+            dtype=float,
+        ).reshape(-1, 2, 2)
+        ports = route_ports[footprint_route[pairs[:, 0]]]
+        boxes = device_boxes[pairs[:, 1]]
+        connected = np.any(
+            np.all(
+                (ports >= boxes[:, None, :2] - TOLERANCE)
+                & (ports <= boxes[:, None, 2:] + TOLERANCE),
+                axis=2,
+            ),
+            axis=1,
+        )
+        pairs = pairs[~connected]
+        overlaps = _get_overlap(footprints[pairs[:, 0]], device_boxes[pairs[:, 1]])
+        names = [
+            getattr(device, "name", None) or device.ref_cell.name
+            for device in devices
+        ]
+        keys = [
+            (r, names[d])
+            for r, d in zip(footprint_route[pairs[:, 0]].tolist(), pairs[:, 1].tolist())
+        ]
+        collisions += _merge_overlaps(keys, overlaps)
+
+    return collisions
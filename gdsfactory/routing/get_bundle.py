@@ -28,8 +28,12 @@ from gdsfactory.routing.get_bundle_corner import get_bundle_corner
 from gdsfactory.routing.get_bundle_from_steps import get_bundle_from_steps
 from gdsfactory.routing.get_bundle_from_waypoints import get_bundle_from_waypoints
 from gdsfactory.routing.get_bundle_u import get_bundle_udirect, get_bundle_uindirect
-from gdsfactory.routing.get_route import get_route, get_route_from_waypoints
-from gdsfactory.routing.manhattan import generate_manhattan_waypoints
+from gdsfactory.routing.get_route import get_route, get_waypoints_taper
+from gdsfactory.routing.manhattan import (
+    generate_manhattan_waypoints,
+    generate_manhattan_waypoints_batch,
+    round_corners_batch,
+)
 from gdsfactory.routing.path_length_matching import path_length_matched_points
 from gdsfactory.routing.sort_ports import get_port_x, get_port_y
 from gdsfactory.routing.sort_ports import sort_ports as sort_ports_function
@@ -343,15 +347,14 @@ def get_bundle_same_axis(
             cross_section=cross_section,
             **kwargs,
         )
-    return [
-        get_route_from_waypoints(
-            route,
-            bend=bend,
-            cross_section=cross_section,
-            **kwargs,
-        )
-        for route in routes
-    ]
+    taper = get_waypoints_taper(cross_section=cross_section, **kwargs)
+    return round_corners_batch(
+        routes,
+        bend=bend,
+        taper=taper,
+        cross_section=cross_section,
+        **kwargs,
+    )
 
 
 def _get_bundle_waypoints(
@@ -388,7 +391,6 @@ def _get_bundle_waypoints(
         print(f"WARNING! ports1={ports1} or ports2={ports2} are empty")
         return []
 
-    axis = "X" if ports1[0].orientation in [0, 180] else "Y"
     if len(ports1) == 1 and len(ports2) == 1:
         return [
             generate_manhattan_waypoints(
@@ -401,81 +403,69 @@ def _get_bundle_waypoints(
             )
         ]
 
-    # Contains end_straight of tracks which need to be adjusted together
-    end_straights_in_group = []
-
-    # Once a group is finished, all the lengths are appended to end_straights
-    end_straights = []
-
-    # Keep track of how many ports should be routed together
-
-    if axis in {"X", "x"}:
-        x1_prev = get_port_y(ports1[0])
-        x2_prev = get_port_y(ports2[0])
-        y0 = get_port_x(ports2[0])
-        y1 = get_port_x(ports1[0])
-    else:  # X axis
-        x1_prev = get_port_x(ports1[0])
-        x2_prev = get_port_x(ports2[0])
-        y0 = get_port_y(ports2[0])
-        y1 = get_port_y(ports1[0])
-
-    s = sign(y0 - y1)
-    curr_end_straight = 0
-
     end_straight_length = end_straight_length or 15.0
+    end_straights = get_end_straight_lengths(
+        ports1,
+        ports2,
+        separation=separation,
+        end_straight_length=end_straight_length,
+    )
+    return generate_manhattan_waypoints_batch(
+        ports1,
+        ports2,
+        start_straight_length=start_straight_length,
+        end_straight_length=end_straights,
+        cross_section=cross_section,
+        **kwargs,
+    )
 
-    Le = end_straight_length
-
-    # First pass - loop on all the ports to find the tentative end_straights
-    for i in range(len(ports1)):
-        if axis in {"X", "x"}:
-            x1 = get_port_y(ports1[i])
-            x2 = get_port_y(ports2[i])
-            y = get_port_x(ports2[i])
-        else:
-            x1 = get_port_x(ports1[i])
-            x2 = get_port_x(ports2[i])
-            y = get_port_y(ports2[i])
-
-        if are_decoupled(x2, x2_prev, x1, x1_prev, sep=separation):
-            # If this metal track does not impact the previous one, then start a new
-            # group.
-            L = min(end_straights_in_group)
-            end_straights += [max(x - L, 0) + Le for x in end_straights_in_group]
-
-            # Start new group
-            end_straights_in_group = []
-            curr_end_straight = 0
-
-        elif x2 >= x1:
-            curr_end_straight += separation
-        else:
-            curr_end_straight -= separation
-
-        end_straights_in_group.append(curr_end_straight + (y - y0) * s)
 
-        x1_prev = x1
-        x2_prev = x2
+def get_end_straight_lengths(
+    ports1: List[Port],
+    ports2: List[Port],
+    separation: float = 30,
+    end_straight_length: float = 15.0,
+) -> ndarray:
+    """Returns the end straight length of each route of a same axis bundle.
 
-    # Append the last group
-    L = min(end_straights_in_group)
+    Tracks that would collide are grouped. Within a group each track moves
+    its end straight one separation further than the previous one, in the
+    direction of its fanout. All the end straights are computed at once.
 
-    end_straights += [max(x - L, 0) + Le for x in end_straights_in_group]
+    Args:
+        ports1: list of starting ports, sorted along the bundle.
+        ports2: list of end ports, sorted along the bundle.
+        separation: route spacing.
+        end_straight_length: minimum end straight length.
+    """
+    centers1 = np.array([p.center for p in ports1], dtype=float)
+    centers2 = np.array([p.center for p in ports2], dtype=float)
+    axis = "X" if ports1[0].orientation in [0, 180] else "Y"
+    across, along = (1, 0) if axis in {"X", "x"} else (0, 1)
+    x1 = centers1[:, across]
+    x2 = centers2[:, across]
+    y = centers2[:, along]
+    s = sign(y[0] - centers1[0, along])
+
+    # a track starts a new group if it does not impact the previous one
+    decoupled = np.zeros(len(x1), dtype=bool)
+    decoupled[1:] = ~(
+        (x1[:-1] + separation > x2[1:])
+        | (x1[1:] < x2[:-1] + separation)
+        | (x1[1:] < x2[:-1] - separation)
+    )
+    steps = np.where(decoupled, 0, np.where(x2 >= x1, separation, -separation))
+    offsets = np.cumsum(steps)
+    index = np.arange(len(x1))
+    group_start = np.maximum.accumulate(np.where(decoupled, index, 0))
+    end_straights = offsets - offsets[group_start] + steps[group_start]
+    end_straights = end_straights + (y - y[0]) * s
 
-    # Second pass - route the ports pairwise
-    N = len(ports1)
-    return [
-        generate_manhattan_waypoints(
-            ports1[i],
-            ports2[i],
-            start_straight_length=start_straight_length,
-            end_straight_length=end_straights[i],
-            cross_section=cross_section,
-            **kwargs,
-        )
-        for i in range(N)
-    ]
+    # shift each group so its shortest end straight is end_straight_length
+    starts = np.flatnonzero(decoupled | (index == 0))
+    group_min = np.minimum.reduceat(end_straights, starts)
+    group = np.cumsum(decoupled)
+    return np.maximum(end_straights - group_min[group], 0) + end_straight_length
 
 
 def compute_ports_max_displacement(ports1: List[Port], ports2: List[Port]) -> Number:
@@ -503,34 +493,16 @@ def get_min_spacing(
     """Returns the minimum amount of spacing in um required to create a \
     fanout."""
     axis = "X" if ports1[0].orientation in [0, 180] else "Y"
-    j = 0
-    min_j = 0
-    max_j = 0
+    get_port = get_port_y if axis in {"X", "x"} else get_port_x
     if sort_ports:
-        if axis in {"X", "x"}:
-            ports1.sort(key=get_port_y)
-            ports2.sort(key=get_port_y)
-        else:
-            ports1.sort(key=get_port_x)
-            ports2.sort(key=get_port_x)
-
-    for port1, port2 in zip(ports1, ports2):
-        if axis in {"X", "x"}:
-            x1 = get_port_y(ports1)
-            x2 = get_port_y(port2)
-        else:
-            x1 = get_port_x(port1)
-            x2 = get_port_x(port2)
-        if x2 >= x1:
-            j += 1
-        else:
-            j -= 1
-        if j < min_j:
-            min_j = j
-        if j > max_j:
-            max_j = j
-    j = 0
-
+        ports1.sort(key=get_port)
+        ports2.sort(key=get_port)
+
+    x1 = np.array([get_port(port) for port in ports1])
+    x2 = np.array([get_port(port) for port in ports2])
+    j = np.cumsum(np.where(x2 >= x1, 1, -1))
+    min_j = min(int(j.min()), 0)
+    max_j = max(int(j.max()), 0)
     return (max_j - min_j) * sep + 2 * radius + 1.0
 
 
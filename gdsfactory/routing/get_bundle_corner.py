@@ -48,7 +48,7 @@ def _transform_ports(ports, rotation, origin=(0, 0), x_reflection=False):
             p.center, p.orientation, origin, rotation, x_reflection
         )
         new_port.center = new_center
-        new_port.new_orientation = new_orientation
+        new_port.orientation = new_orientation
         ports_transformed.append(new_port)
 
     return ports_transformed
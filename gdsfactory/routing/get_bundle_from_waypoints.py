@@ -15,7 +15,7 @@ from gdsfactory.routing.manhattan import (
     RouteError,
     get_route_error,
     remove_flat_angles,
-    round_corners,
+    round_corners_batch,
 )
 from gdsfactory.routing.path_length_matching import path_length_matched_points
 from gdsfactory.routing.utils import get_list_ports_angle
@@ -206,17 +206,14 @@ def get_bundle_from_waypoints(
             cross_section=cross_section,
             **kwargs,
         )
-    return [
-        round_corners(
-            points=pts,
-            bend=bend,
-            straight=straight,
-            taper=taper,
-            cross_section=cross_section,
-            **kwargs,
-        )
-        for pts in routes
-    ]
+    return round_corners_batch(
+        routes,
+        bend=bend,
+        straight=straight,
+        taper=taper,
+        cross_section=cross_section,
+        **kwargs,
+    )
 
 
 get_bundle_from_waypoints_electrical = gf.partial(
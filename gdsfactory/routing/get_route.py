@@ -67,6 +67,7 @@ def get_route(
     end_straight_length: float = 0.01,
     min_straight_length: float = 0.01,
     cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = "strip",
+    straight_segments: Optional[Union[float, str]] = None,
     **kwargs,
 ) -> Route:
     """Returns a Manhattan Route between 2 ports.
@@ -85,6 +86,9 @@ def get_route(
         end_straight_length: length of end straight.
         min_straight_length: min length of straight for any intermediate segment.
         cross_section: spec.
+        straight_segments: None places one straight per straight section.
+            'power_of_two' or a length reuse the same few straight cells.
+            See gf.routing.manhattan.round_corners.
         kwargs: cross_section settings.
 
 
@@ -140,6 +144,7 @@ def get_route(
         bend=bend90,
         with_sbend=with_sbend,
         cross_section=cross_section,
+        straight_segments=straight_segments,
         **kwargs,
     )
 
@@ -161,12 +166,52 @@ get_route_electrical_multilayer = partial(
 )
 
 
+def get_waypoints_taper(
+    taper: Optional[Callable] = taper_function,
+    cross_section: CrossSectionSpec = strip,
+    **kwargs,
+) -> Optional[Component]:
+    """Returns the taper for routes from waypoints.
+
+    None if the cross_section does not auto_widen.
+
+    Args:
+        taper: function that returns tapers.
+        cross_section: spec.
+        kwargs: cross_section settings.
+    """
+    if isinstance(cross_section, list):
+        return None
+    elif taper:
+        x = gf.get_cross_section(cross_section, **kwargs)
+        auto_widen = x.auto_widen
+        width1 = x.width
+        width2 = x.width_wide if auto_widen else width1
+        taper_length = x.taper_length
+        if auto_widen:
+            taper = (
+                taper(
+                    length=taper_length,
+                    width1=width1,
+                    width2=width2,
+                    cross_section=cross_section,
+                    **kwargs,
+                )
+                if callable(taper)
+                else taper
+            )
+        else:
+            taper = None
+    return taper
+
+
 def get_route_from_waypoints(
     waypoints: Coordinates,
     bend: Callable = bend_euler,
     straight: Callable = straight_function,
     taper: Optional[Callable] = taper_function,
     cross_section: CrossSectionSpec = strip,
+    straight_segments: Optional[Union[float, str]] = None,
     **kwargs,
 ) -> Route:
     """Returns a route formed by the given waypoints with bends instead of \
@@ -182,6 +227,9 @@ def get_route_from_waypoints(
         straight: function that returns straight waveguides
         taper: function that returns tapers
         cross_section:
+        straight_segments: None places one straight per straight section.
+            'power_of_two' or a length reuse the same few straight cells.
+            See gf.routing.manhattan.round_corners.
         kwargs: cross_section settings
 
     .. plot::
@@ -223,28 +271,7 @@ def get_route_from_waypoints(
         c.plot()
 
     """
-    if isinstance(cross_section, list):
-        taper = None
-    elif taper:
-        x = gf.get_cross_section(cross_section, **kwargs)
-        auto_widen = x.auto_widen
-        width1 = x.width
-        width2 = x.width_wide if auto_widen else width1
-        taper_length = x.taper_length
-        if auto_widen:
-            taper = (
-                taper(
-                    length=taper_length,
-                    width1=width1,
-                    width2=width2,
-                    cross_section=cross_section,
-                    **kwargs,
-                )
-                if callable(taper)
-                else taper
-            )
-        else:
-            taper = None
+    taper = get_waypoints_taper(taper, cross_section=cross_section, **kwargs)
     waypoints = np.array(waypoints)
     kwargs.pop("route_filter", "")
 
@@ -254,6 +281,7 @@ def get_route_from_waypoints(
         straight=straight,
         taper=taper,
         cross_section=cross_section,
+        straight_segments=straight_segments,
         **kwargs,
     )
 
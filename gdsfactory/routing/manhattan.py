@@ -168,6 +168,62 @@ def get_straight_distance(p0: ndarray, p1: ndarray) -> float:
     raise RouteError(f"Waveguide points {p0} {p1} are not manhattan")
 
 
+def _get_power_of_two_lengths(nm: int) -> List[float]:
+    """Returns power of two lengths in um that add up to nm.
+
+    Whole um are powers of two in um (1, 2, 4 ...). The rest is split into
+    0.5, 0.25 and 0.125um, and what is left into powers of two in nm
+    (64, 32 ... 1nm), as these add up to any length on the nm grid.
+    """
+    whole, remainder = divmod(nm, 1000)
+    lengths = [
+        float(2**power)
+        for power in reversed(range(whole.bit_length()))
+        if whole >> power & 1
+    ]
+    for part in (500, 250, 125):
+        if remainder >= part:
+            lengths.append(part / 1e3)
+            remainder -= part
+    lengths += [
+        2**power / 1e3
+        for power in reversed(range(remainder.bit_length()))
+        if remainder >> power & 1
+    ]
+    return lengths
+
+
+def get_straight_segments(
+    length: float, straight_segments: Optional[Union[float, str]] = None
+) -> List[float]:
+    """Returns the lengths of the straights that make a straight of length.
+
+    Lengths are computed in nm, so they add up exactly to length.
+
+    Args:
+        length: total length in um.
+        straight_segments: None returns [length]. 'power_of_two' returns power
+            of two lengths from longest to shortest: powers of two in um, then
+            0.5, 0.25 and 0.125um, then powers of two in nm down to 1nm.
+            A number returns as many straights of that length as fit, and
+            splits the shorter remainder in power of two lengths.
+    """
+    if straight_segments is None or length <= 0:
+        return [length]
+
+    nm = int(round(length * 1e3))
+    if straight_segments == "power_of_two":
+        return _get_power_of_two_lengths(nm)
+    if isinstance(straight_segments, (int, float)) and straight_segments > 0:
+        pitch = int(round(straight_segments * 1e3))
+        count, remainder = divmod(nm, pitch)
+        return [pitch / 1e3] * count + _get_power_of_two_lengths(remainder)
+    raise ValueError(
+        f"straight_segments = {straight_segments!r} needs to be None, "
+        "'power_of_two' or a positive length"
+    )
+
+
 def transform(
     points: ndarray,
     translation: ndarray,
@@ -605,6 +661,7 @@ def round_corners(
     with_point_markers: bool = False,
     snap_to_grid_nm: Optional[int] = 1,
     with_sbend: bool = False,
+    straight_segments: Optional[Union[float, str]] = None,
     **kwargs,
 ) -> Route:
     """Returns Route.
@@ -626,6 +683,13 @@ def round_corners(
         with_point_markers: add route points markers (easy for debugging).
         snap_to_grid_nm: nm to snap to grid.
         with_sbend: add sbend in case there are routing errors.
+        straight_segments: None places one straight with the exact length of
+            each straight section. 'power_of_two' places straights with power of
+            two lengths (... 4, 2, 1, 0.5, 0.25, 0.125um, then 64, 32 ... 1nm).
+            A number places straights of that length, and power of two
+            straights for the shorter remainder.
+            Routes reuse the same few straight cells instead of one cell per
+            length. See get_straight_segments.
         kwargs: cross_section settings.
 
     """
@@ -842,12 +906,8 @@ def round_corners(
         total_length += length
 
         if isinstance(cross_section, list):
-            wg = gf.get_component(
-                straight_fall_back_no_taper,
-                length=length,
-                cross_section=xsection,
-                **kwargs,
-            )
+            straight_spec = straight_fall_back_no_taper
+            straight_kwargs = dict(cross_section=xsection, **kwargs)
         elif auto_widen and length > auto_widen_minimum_length and width_wide:
             # Taper starts where straight would have started
             with_taper = True
@@ -875,32 +935,40 @@ def round_corners(
                 cross_section_wide = gf.partial(cross_section, **kwargs_wide)
             else:
                 cross_section_wide = x.copy(width=width_wide)
-            wg = gf.get_component(
-                straight, length=length, cross_section=cross_section_wide
-            )
+            straight_spec = straight
+            straight_kwargs = dict(cross_section=cross_section_wide)
         else:
-            wg = gf.get_component(
-                straight_fall_back_no_taper,
-                length=length,
-                cross_section=xsection,
-                **kwargs,
-            )
+            straight_spec = straight_fall_back_no_taper
+            straight_kwargs = dict(cross_section=xsection, **kwargs)
+
+        segment_lengths = get_straight_segments(length, straight_segments)
+        wgs = [
+            gf.get_component(straight_spec, length=segment_length, **straight_kwargs)
+            for segment_length in segment_lengths
+        ]
 
         if straight_ports is None:
-            straight_ports = [p.name for p in _get_straight_ports(wg, layer=layer)]
+            straight_ports = [p.name for p in _get_straight_ports(wgs[0], layer=layer)]
         pname_west, pname_east = straight_ports
 
-        wg_ref = wg.ref()
-        wg_ref.move(wg.ports[pname_west], (0, 0))
-        if mirror_straight:
-            wg_ref.reflect_v(list(wg_ref.ports.values())[0].name)
-
-        wg_ref.rotate(angle)
-        wg_ref.move(straight_origin)
-
-        if length > 0:
-            references.append(wg_ref)
-            wg_refs += [wg_ref]
+        # segments go one after the other from straight_origin
+        direction = np.array([np.cos(np.deg2rad(angle)), np.sin(np.deg2rad(angle))])
+        if angle % 90 == 0:
+            direction = np.round(direction)
+        offset = 0
+        for wg, segment_length in zip(wgs, segment_lengths):
+            wg_ref = wg.ref()
+            wg_ref.move(wg.ports[pname_west], (0, 0))
+            if mirror_straight:
+                wg_ref.reflect_v(list(wg_ref.ports.values())[0].name)
+
+            wg_ref.rotate(angle)
+            wg_ref.move(straight_origin + offset * direction)
+            offset = snap_to_grid(offset + segment_length)
+
+            if length > 0:
+                references.append(wg_ref)
+                wg_refs += [wg_ref]
 
         port_index_out = 1
         if with_taper:
@@ -942,6 +1010,389 @@ def round_corners(
     return Route(references=references, ports=(port_input, port_output), length=length)
 
 
+def _get_reference_template(
+    reference: ComponentReference,
+) -> Tuple[ndarray, float, bool, Dict[str, Tuple[ndarray, Optional[float]]]]:
+    """Returns origin, rotation, x_reflection and ports of a reference \
+    placed at (0, 0)."""
+    ports = {
+        name: (port.center, port.orientation)
+        for name, port in reference.ports.items()
+    }
+    return (
+        np.array(reference.origin, dtype=float),
+        reference.rotation,
+        reference.x_reflection,
+        ports,
+    )
+
+
+def round_corners_batch(
+    points_list: List[Coordinates],
+    straight: ComponentSpec = straight_function,
+    bend: ComponentSpec = bend_euler,
+    taper: Optional[ComponentSpec] = None,
+    straight_fall_back_no_taper: Optional[ComponentSpec] = None,
+    mirror_straight: bool = False,
+    straight_ports: Optional[List[str]] = None,
+    cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
+    on_route_error: Callable = get_route_error,
+    with_point_markers: bool = False,
+    snap_to_grid_nm: Optional[int] = 1,
+    with_sbend: bool = False,
+    straight_segments: Optional[Union[float, str]] = None,
+    **kwargs,
+) -> List[Route]:
+    """Returns one Route for each list of manhattan points.
+
+    Same as calling `round_corners` for each list of points. The cross_section,
+    bend, taper and straights are resolved once for all the routes, and the
+    bend positions and rotations of all the routes are computed at once. Each
+    reference is placed from a reference placed once at the origin, so the
+    port transforms are not recomputed for every reference.
+
+    Routes with points that `round_corners` can not route (no manhattan
+    segments or bends that do not fit) go through `round_corners`, so
+    on_route_error is called the same way. So do all the routes with a
+    multi-layer cross_section or with_point_markers.
+
+    Args:
+        points_list: list of manhattan routes defined by waypoints.
+        straight: the straight library to use to generate straight portions.
+        bend: the bend to use for 90Deg turns.
+        taper: taper for straight portions. If None, no tapering.
+        straight_fall_back_no_taper: in case there is no space for two tapers.
+        mirror_straight: mirror_straight waveguide.
+        straight_ports: port names for straights. If None finds them automatically.
+        cross_section: spec.
+        on_route_error: function to run when route fails.
+        with_point_markers: add route points markers (easy for debugging).
+        snap_to_grid_nm: nm to snap to grid.
+        with_sbend: add sbend in case there are routing errors.
+        straight_segments: None, 'power_of_two' or a length.
+            See round_corners.
+        kwargs: cross_section settings.
+
+    """
+    from gdsfactory.pdk import get_layer
+
+    settings = dict(
+        straight=straight,
+        bend=bend,
+        taper=taper,
+        straight_fall_back_no_taper=straight_fall_back_no_taper,
+        mirror_straight=mirror_straight,
+        straight_ports=straight_ports,
+        cross_section=cross_section,
+        on_route_error=on_route_error,
+        with_point_markers=with_point_markers,
+        snap_to_grid_nm=snap_to_grid_nm,
+        with_sbend=with_sbend,
+        straight_segments=straight_segments,
+        **kwargs,
+    )
+    if isinstance(cross_section, list) or with_point_markers:
+        return [round_corners(points, **settings) for points in points_list]
+    if not len(points_list):
+        return []
+
+    x = gf.get_cross_section(cross_section, **kwargs)
+    layer = get_layer(x.layer)
+
+    bend90 = (
+        bend
+        if isinstance(bend, Component)
+        else gf.get_component(bend, cross_section=cross_section, **kwargs)
+    )
+    settings.update(bend=bend90)
+
+    if taper is None:
+        taper = taper_function(
+            cross_section=cross_section,
+            width1=x.width,
+            width2=x.width_wide,
+            length=x.taper_length,
+        )
+    elif not isinstance(taper, Component):
+        taper = gf.get_component(taper, cross_section=cross_section, **kwargs)
+    if taper and "length" not in taper.info:
+        _taper_ports = list(taper.ports.values())
+        taper.info["length"] = _taper_ports[-1].x - _taper_ports[0].x
+    settings.update(taper=taper)
+
+    straight_fall_back_no_taper = straight_fall_back_no_taper or straight
+    taper_length = x.taper_length
+    width_wide = x.width_wide
+    with_auto_widen = bool(x.auto_widen and width_wide)
+    if with_auto_widen:
+        taper_west, taper_east = (
+            p.name for p in _get_straight_ports(taper, layer=layer)
+        )
+        if callable(cross_section):
+            kwargs_wide = kwargs.copy()
+            kwargs_wide.update(width=width_wide)
+            cross_section_wide = gf.partial(cross_section, **kwargs_wide)
+        else:
+            cross_section_wide = x.copy(width=width_wide)
+    straight_kwargs = {
+        False: dict(cross_section=cross_section, **kwargs),
+        True: dict(cross_section=cross_section_wide) if with_auto_widen else None,
+    }
+
+    if not bend90.info.get("length"):
+        raise ValueError(f"bend {bend90} needs to have bend.info['length'] defined")
+    bend_length = bend90.info["length"]
+    try:
+        pname_west, pname_north = (
+            p.name for p in _get_bend_ports(bend=bend90, layer=layer)
+        )
+    except ValueError as exc:
+        raise ValueError(
+            f"Did not find 2 ports on layer {layer}. Got {list(bend90.ports.values())}"
+        ) from exc
+    bsx, bsy = bend90.ports[pname_north].center - bend90.ports[pname_west].center
+
+    # bend position and transform of all the bends of all the routes
+    routes_points = [
+        np.array(
+            remove_flat_angles(
+                gf.snap.snap_to_grid(points, nm=snap_to_grid_nm)
+                if snap_to_grid_nm
+                else points
+            )
+        )
+        for points in points_list
+    ]
+    p0 = np.concatenate([points[:-2] for points in routes_points])
+    p1 = np.concatenate([points[1:-1] for points in routes_points])
+    p2 = np.concatenate([points[2:] for points in routes_points])
+    dp1 = p1 - p0
+    dp2 = p2 - p1
+    is_h = np.abs(dp1[:, 1]) < TOLERANCE
+    s1 = np.where(np.where(is_h, dp1[:, 0], dp1[:, 1]) < 0, -1, 1)
+    s2 = np.where(np.where(is_h, dp2[:, 1], dp2[:, 0]) < 0, -1, 1)
+    bend_origins = p1 - np.column_stack(
+        [np.where(is_h, s1 * bsx, 0), np.where(is_h, 0, s1 * bsy)]
+    )
+    transforms_map = {
+        (True, 1, 1): (0, False),
+        (True, 1, -1): (0, True),
+        (True, -1, 1): (180, True),
+        (True, -1, -1): (180, False),
+        (False, 1, 1): (90, True),
+        (False, 1, -1): (90, False),
+        (False, -1, 1): (270, False),
+        (False, -1, -1): (270, True),
+    }
+    bend_transforms = [
+        transforms_map[key] for key in zip(is_h.tolist(), s1.tolist(), s2.tolist())
+    ]
+    bend_offsets = np.cumsum([0] + [len(points) - 2 for points in routes_points])
+
+    bend_templates = {}
+    straight_templates = {}
+    straight_cells = {}
+
+    def get_bend_template(transform):
+        if transform not in bend_templates:
+            bend_ref = gen_sref(bend90, *transform, pname_west, (0, 0))
+            bend_templates[transform] = _get_reference_template(bend_ref)
+        return bend_templates[transform]
+
+    def get_straight_cell(wide: bool, length: float) -> Component:
+        key = (wide, length)
+        if key not in straight_cells:
+            straight_spec = straight if wide else straight_fall_back_no_taper
+            straight_cells[key] = gf.get_component(
+                straight_spec, length=length, **straight_kwargs[wide]
+            )
+        return straight_cells[key]
+
+    def get_straight_template(wg: Component, angle: float):
+        # the placement only depends on the ports used to place the straight
+        first_port = list(wg.ports.values())[0]
+        key = (
+            tuple(wg.ports[straight_ports[0]].center),
+            (first_port.name, first_port.y) if mirror_straight else None,
+            angle,
+        )
+        if key not in straight_templates:
+            wg_ref = wg.ref()
+            wg_ref.move(wg.ports[straight_ports[0]], (0, 0))
+            if mirror_straight:
+                wg_ref.reflect_v(list(wg_ref.ports.values())[0].name)
+            wg_ref.rotate(angle)
+            straight_templates[key] = _get_reference_template(wg_ref)
+        return straight_templates[key]
+
+    def get_taper_template(angle: float, east: bool):
+        key = (taper.name, angle, east)
+        if key not in straight_templates:
+            if east:
+                taper_ref = taper.ref(
+                    port_id=taper_east, rotation=angle + 180, v_mirror=True
+                )
+            else:
+                taper_ref = taper.ref(port_id=taper_west, rotation=angle)
+            straight_templates[key] = _get_reference_template(taper_ref)
+        return straight_templates[key]
+
+    def place(component: Component, template, position) -> ComponentReference:
+        origin, rotation, x_reflection, _ = template
+        return ComponentReference(
+            component,
+            origin=origin + position,
+            rotation=rotation,
+            x_reflection=x_reflection,
+        )
+
+    def get_route(index: int) -> Optional[Route]:
+        """Returns the route, or None if it needs round_corners."""
+        nonlocal straight_ports
+
+        points = routes_points[index]
+        p0_straight = points[0]
+        dp = points[1] - p0_straight
+        bend_orientation = None
+        if _is_vertical(p0_straight, points[1]):
+            if dp[1] != 0:
+                bend_orientation = 90 if dp[1] > 0 else 270
+        elif _is_horizontal(p0_straight, points[1]):
+            if dp[0] != 0:
+                bend_orientation = 0 if dp[0] > 0 else 180
+        if bend_orientation is None:
+            return None
+
+        references = []
+        straight_sections = []
+        bend_points = [points[0]]
+        for i in range(1, points.shape[0] - 1):
+            j = bend_offsets[index] + i - 1
+            bend_origin = bend_origins[j]
+            template = get_bend_template(bend_transforms[j])
+            references.append(place(bend90, template, bend_origin))
+            bend_ports = template[3]
+
+            if abs(dp1[j][1]) < TOLERANCE:
+                axis = 1
+            elif abs(dp1[j][0]) < TOLERANCE:
+                axis = 0
+            else:
+                return None
+            # same as np.isclose
+            matching_ports = [
+                name
+                for name, (center, _) in bend_ports.items()
+                if abs(center[axis] + bend_origin[axis] - points[i][axis])
+                <= 1e-8 + 1e-5 * abs(points[i][axis])
+            ]
+            if not matching_ports or len(bend_ports) != 2:
+                return None
+            next_port = matching_ports[0]
+            (other_port,) = set(bend_ports) - {next_port}
+            bend_points.append(bend_ports[next_port][0] + bend_origin)
+            bend_points.append(bend_ports[other_port][0] + bend_origin)
+
+            if not (
+                _is_vertical(p0_straight, bend_origin)
+                or _is_horizontal(p0_straight, bend_origin)
+            ):
+                return None
+            straight_sections.append(
+                (
+                    p0_straight,
+                    bend_orientation,
+                    get_straight_distance(p0_straight, bend_origin),
+                )
+            )
+            center, bend_orientation = bend_ports[pname_north]
+            p0_straight = center + bend_origin
+
+        bend_points.append(points[-1])
+        if not (
+            _is_vertical(p0_straight, points[-1])
+            or _is_horizontal(p0_straight, points[-1])
+        ):
+            return None
+        straight_sections.append(
+            (
+                p0_straight,
+                bend_orientation,
+                get_straight_distance(p0_straight, points[-1]),
+            )
+        )
+
+        # ensure bend connectivity
+        bend_points = np.array(bend_points)
+        s = np.sign(np.diff(points, axis=0))
+        bs = np.sign(bend_points[1::2] - bend_points[::2])
+        if np.any(bs * s == -1):
+            return None
+
+        total_length = (points.shape[0] - 2) * bend_length
+        wg_refs = []
+        for straight_origin, angle, length in straight_sections:
+            length = snap_to_grid(length)
+            total_length += length
+            with_taper = with_auto_widen and length > x.auto_widen_minimum_length
+            if with_taper:
+                length = length - 2 * taper_length
+                template = get_taper_template(angle, east=False)
+                taper_ref = place(taper, template, straight_origin)
+                references.append(taper_ref)
+                wg_refs.append(taper_ref)
+                straight_origin = template[3][taper_east][0] + straight_origin
+
+            segment_lengths = get_straight_segments(length, straight_segments)
+            wgs = [
+                get_straight_cell(with_taper, segment_length)
+                for segment_length in segment_lengths
+            ]
+            if straight_ports is None:
+                straight_ports = [
+                    p.name for p in _get_straight_ports(wgs[0], layer=layer)
+                ]
+
+            direction = np.array(
+                [np.cos(np.deg2rad(angle)), np.sin(np.deg2rad(angle))]
+            )
+            if angle % 90 == 0:
+                direction = np.round(direction)
+            offset = 0
+            for wg, segment_length in zip(wgs, segment_lengths):
+                template = get_straight_template(wg, angle)
+                position = straight_origin + offset * direction
+                wg_ref = place(wg, template, position)
+                offset = snap_to_grid(offset + segment_length)
+                if length > 0:
+                    references.append(wg_ref)
+                    wg_refs.append(wg_ref)
+
+            port_index_out = 1
+            if with_taper:
+                taper_origin = wg_ref.ports[straight_ports[1]]
+                template = get_taper_template(angle, east=True)
+                taper_ref = place(taper, template, taper_origin.center)
+                references.append(taper_ref)
+                wg_refs.append(taper_ref)
+                port_index_out = 0
+
+        port_input = list(wg_refs[0].ports.values())[0]
+        port_output = list(wg_refs[-1].ports.values())[port_index_out]
+        length = snap_to_grid(float(total_length))
+        return Route(
+            references=references, ports=(port_input, port_output), length=length
+        )
+
+    routes = []
+    for index, points in enumerate(points_list):
+        route = get_route(index)
+        if route is None:
+            route = round_corners(points, **settings)
+        routes.append(route)
+    return routes
+
+
 def generate_manhattan_waypoints(
     input_port: Port,
     output_port: Port,
@@ -996,6 +1447,167 @@ def generate_manhattan_waypoints(
     return points
 
 
+def generate_manhattan_waypoints_batch(
+    ports1: List[Port],
+    ports2: List[Port],
+    start_straight_length: Optional[float] = None,
+    end_straight_length: Union[None, float, ndarray] = None,
+    min_straight_length: Optional[float] = None,
+    bend: ComponentSpec = bend_euler,
+    cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
+    **kwargs,
+) -> List[ndarray]:
+    """Returns the waypoints of many Manhattan routes.
+
+    Same as calling `generate_manhattan_waypoints` for each pair of ports. The
+    bend and cross_section are resolved once, and the straight, S and
+    move aside routes between facing ports are computed for all the ports at
+    once. The other routes go through the `generate_manhattan_waypoints` logic.
+
+    Args:
+        ports1: source ports.
+        ports2: destination ports.
+        start_straight_length: in um.
+        end_straight_length: in um, for all the routes or one for each route.
+        min_straight_length: in um.
+        bend: bend spec.
+        cross_section: spec.
+        kwargs: cross_section settings.
+
+    """
+    if "straight" in kwargs.keys():
+        _ = kwargs.pop("straight")
+    n_routes = len(ports1)
+    if len(ports2) != n_routes:
+        raise ValueError(f"ports1={n_routes} and ports2={len(ports2)} must be equal")
+    if not n_routes:
+        return []
+
+    bend90 = (
+        bend
+        if isinstance(bend, Component)
+        else gf.get_component(bend, cross_section=cross_section, **kwargs)
+    )
+    if isinstance(cross_section, list):
+        x = [gf.get_cross_section(xsection[0], **kwargs) for xsection in cross_section]
+        min_length = min(_x.min_length for _x in x)
+    else:
+        x = gf.get_cross_section(cross_section, **kwargs)
+        min_length = x.min_length
+    start_straight_length = start_straight_length or min_length
+    min_straight_length = min_straight_length or min_length
+    end_straight_lengths = np.broadcast_to(
+        np.asarray(
+            end_straight_length if end_straight_length is not None else 0, dtype=float
+        ),
+        (n_routes,),
+    )
+    end_straight_lengths = np.where(
+        end_straight_lengths != 0, end_straight_lengths, min_length
+    )
+    bs = _get_bend_size(bend90)
+
+    centers1 = np.array([p.center for p in ports1], dtype=float)
+    centers2 = np.array([p.center for p in ports2], dtype=float)
+    orientations1 = np.array(
+        [np.nan if p.orientation is None else p.orientation for p in ports1]
+    )
+    orientations2 = np.array(
+        [np.nan if p.orientation is None else p.orientation for p in ports2]
+    )
+
+    # facing Manhattan ports: the input port points the same way as the route
+    # arrives at the output port
+    with np.errstate(invalid="ignore"):
+        manhattan = (orientations1 % 90 == 0) & (orientations2 % 90 == 0)
+        facing = manhattan & ((orientations1 - orientations2 - 180) % 360 == 0)
+    angles = np.deg2rad(np.where(facing, orientations1, 0))
+    d = np.round(np.column_stack([np.cos(angles), np.sin(angles)]))
+    n = np.column_stack([-d[:, 1], d[:, 0]])
+
+    # input position along the route direction (negative before the output
+    # port) and across it, in the frame used by _generate_route_manhattan_points
+    delta = centers1 - centers2
+    u = (delta * d).sum(axis=1)
+    v = (delta * n).sum(axis=1)
+    side = np.where(v < 0, -1, 1)
+
+    bs1 = bs2 = bs
+    e = end_straight_lengths
+    s = start_straight_length
+    m = min_straight_length
+    threshold = TOLERANCE
+    straight = facing & (np.abs(v) < threshold) & (u <= threshold)
+    sbend = (
+        facing
+        & ~straight
+        & (u + (bs1 + bs2 + e + s) < threshold)
+        & (np.abs(v) - (bs1 + bs2 + m) > -threshold)
+    )
+    # not enough room across for an S route: move aside to the other side
+    # first, then S route back
+    u_aside = u + s + bs1
+    aside = (
+        facing
+        & ~straight
+        & ~sbend
+        & (u + (2 * bs1 + 2 * bs2 + e + s + m) < threshold)
+        & ~(
+            (np.abs(v) - (m + bs1 + bs2) > -threshold)
+            & (-u_aside - (e + bs2) > -threshold)
+        )
+        & ~(u_aside + (e + bs1) > -threshold)
+        & (-u_aside - (e + 2 * bs1 + bs2 + m) > -threshold)
+    )
+
+    def point(u_point, v_point=None) -> ndarray:
+        """Returns points at u along and v across from the output port."""
+        if v_point is None:
+            # across position of the input port
+            return centers1 + (u_point - u)[:, None] * d
+        return centers2 + u_point[:, None] * d + v_point[:, None] * n
+
+    u_end = -e - bs2
+    v_aside = -side * (bs1 + bs2 + m)
+    straights = np.stack([centers1, centers2], axis=1)
+    sbends = np.stack(
+        [centers1, point(u_end), point(u_end, 0 * u), centers2], axis=1
+    )
+    asides = np.stack(
+        [
+            centers1,
+            point(u_aside),
+            point(u_aside, v_aside),
+            point(u_end, v_aside),
+            point(u_end, 0 * u),
+            centers2,
+        ],
+        axis=1,
+    )
+
+    waypoints = []
+    for i in range(n_routes):
+        if straight[i]:
+            waypoints.append(straights[i])
+        elif sbend[i]:
+            waypoints.append(sbends[i])
+        elif aside[i]:
+            waypoints.append(asides[i])
+        else:
+            waypoints.append(
+                _generate_route_manhattan_points(
+                    ports1[i],
+                    ports2[i],
+                    bs1,
+                    bs2,
+                    start_straight_length,
+                    end_straight_lengths[i],
+                    min_straight_length,
+                )
+            )
+    return waypoints
+
+
 def _get_bend_size(bend90: Component):
     p1, p2 = list(bend90.ports.values())[:2]
     bsx = abs(p2.x - p1.x)
@@ -1016,6 +1628,7 @@ def route_manhattan(
     cross_section: Union[CrossSectionSpec, MultiCrossSectionAngleSpec] = strip,
     with_point_markers: bool = False,
     on_route_error: Callable = get_route_error,
+    straight_segments: Optional[Union[float, str]] = None,
     **kwargs,
 ) -> Route:
     """Generates the Manhattan waypoints for a route.
@@ -1035,6 +1648,9 @@ def route_manhattan(
         with_sbend: add sbend in case there are routing errors.
         cross_section: spec.
         with_point_markers: add point markers in the route.
+        on_route_error: function to run when route fails.
+        straight_segments: None, 'power_of_two' or length of the reused
+            straights. See round_corners.
         kwargs: cross_section settings.
 
     """
@@ -1067,6 +1683,7 @@ def route_manhattan(
             cross_section=x,
             with_point_markers=with_point_markers,
             with_sbend=with_sbend,
+            straight_segments=straight_segments,
         )
         return route
 
@@ -0,0 +1,319 @@
+"""Spatial index for region queries on Components.
+
+Each Component gets an STR-packed R-tree with the bounding boxes of its own
+polygons and references, built lazily and cached for locked Components.
+Queries go down the hierarchy only through the references that intersect the
+query region, transforming the region into each child coordinates.
+
+.. code::
+
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    q = c.query(bbox=((0, -5), (10, 5)), layers=[(1, 0)])
+    q.polygons  # {(1, 0): [polygon, ...]}
+    q.references  # references of c that intersect the bbox
+    q.ports  # ports of c inside the bbox
+
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.port import Port
+from gdsfactory.types import Float2, Layer, LayerSpecs
+
+Polygons = Dict[Layer, List[np.ndarray]]
+
+
+class SpatialIndex:
+    """Static R-tree of bounding boxes packed with Sort-Tile-Recursive.
+
+    Args:
+        bboxes: (N, 4) array with xmin, ymin, xmax, ymax of each item.
+        node_capacity: number of children of each node.
+    """
+
+    def __init__(self, bboxes: np.ndarray, node_capacity: int = 16) -> None:
+        """Initialize the index."""
+        bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+        self.node_capacity = m = node_capacity
+        n = len(bboxes)
+
+        # sort by x center into vertical slices and each slice by y center
+        centers = (bboxes[:, :2] + bboxes[:, 2:]) / 2
+        order = np.argsort(centers[:, 0], kind="stable")
+        slice_size = m * int(np.ceil(np.sqrt(np.ceil(n / m)))) if n else 1
+        for start in range(0, n, slice_size):
+            s = order[start : start + slice_size]
+            order[start : start + slice_size] = s[
+                np.argsort(centers[s, 1], kind="stable")
+            ]
+        self.order = order
+
+        # each node covers node_capacity consecutive nodes of the level below
+        levels = [bboxes[order]]
+        while len(levels[-1]) > m:
+            b = levels[-1]
+            starts = np.arange(0, len(b), m)
+            levels.append(
+                np.concatenate(
+                    (
+                        np.minimum.reduceat(b[:, :2], starts),
+                        np.maximum.reduceat(b[:, 2:], starts),
+                    ),
+                    axis=1,
+                )
+            )
+        self.levels = levels[::-1]
+
+    def query(self, bbox: Sequence[Float2]) -> np.ndarray:
+        """Returns the sorted indices of the items that intersect a bbox.
+
+        Args:
+            bbox: ((xmin, ymin), (xmax, ymax)).
+        """
+        (xmin, ymin), (xmax, ymax) = bbox
+        m = self.node_capacity
+        candidates = np.arange(len(self.levels[0]))
+        for depth, level in enumerate(self.levels):
+            if depth:
+                candidates = (candidates[:, None] * m + np.arange(m)).ravel()
+                candidates = candidates[candidates < len(level)]
+            b = level[candidates]
+            candidates = candidates[
+                (b[:, 0] <= xmax)
+                & (b[:, 2] >= xmin)
+                & (b[:, 1] <= ymax)
+                & (b[:, 3] >= ymin)
+            ]
+        return np.sort(self.order[candidates])
+
+
+class ComponentQuery(BaseModel):
+    """Elements of a Component that intersect a region.
+
+    Attributes:
+        polygons: dict of layer to polygons, in the Component coordinates,
+            whose bounding box intersects the region, including the polygons
+            of the references.
+        references: references of the Component that intersect the region.
+        ports: ports of the Component inside the region.
+    """
+
+    polygons: Polygons
+    references: List[Any]
+    ports: List[Port]
+
+    class Config:
+        """Config for ComponentQuery."""
+
+        arbitrary_types_allowed = True
+
+
+class _CellIndex:
+    """Index of the polygons and references of one Component."""
+
+    def __init__(self, component: Component) -> None:
+        from gdsfactory.polygon_array import PolygonArray
+
+        polygons = []
+        layers = []
+        bboxes = []
+        for polygonset in component.polygons:
+            if isinstance(polygonset, PolygonArray) and len(polygonset.points):
+                starts = polygonset.offsets[:-1]
+                bboxes.append(
+                    np.concatenate(
+                        (
+                            np.minimum.reduceat(polygonset.points, starts),
+                            np.maximum.reduceat(polygonset.points, starts),
+                        ),
+                        axis=1,
+                    )
+                )
+            else:
+                bboxes.extend(
+                    np.concatenate((p.min(axis=0), p.max(axis=0)))[None]
+                    for p in polygonset.polygons
+                )
+            polygons.extend(polygonset.polygons)
+            layers.extend(zip(polygonset.layers, polygonset.datatypes))
+        for path in component.paths:
+            for layer, path_polygons in path.get_polygons(by_spec=True).items():
+                bboxes.extend(
+                    np.concatenate((p.min(axis=0), p.max(axis=0)))[None]
+                    for p in path_polygons
+                )
+                polygons.extend(path_polygons)
+                layers.extend([layer] * len(path_polygons))
+
+        self.polygons = polygons
+        self.layers = layers
+        self.polygon_index = SpatialIndex(
+            np.concatenate(bboxes) if bboxes else np.empty((0, 4))
+        )
+
+        self.references = []
+        bboxes = []
+        for reference in component.references:
+            bbox = reference.get_bounding_box()
+            if bbox is not None:
+                self.references.append(reference)
+                bboxes.append(bbox.ravel())
+        self.reference_index = SpatialIndex(np.array(bboxes).reshape(-1, 4))
+
+
+def get_index(component: Component) -> _CellIndex:
+    """Returns the spatial index of a Component.
+
+    Locked Components cache it until they or any Component they reference change.
+    """
+    if not component._locked:
+        return _CellIndex(component)
+
+    # subscribe to changes in the referenced Components
+    component.get_bounding_box()
+    index = component.__dict__.get("_spatial_index")
+    if index is None:
+        index = component.__dict__["_spatial_index"] = _CellIndex(component)
+    return index
+
+
+def _intersects(polygon: np.ndarray, bbox: np.ndarray) -> bool:
+    return bool(
+        (polygon.min(axis=0) <= bbox[1]).all()
+        and (polygon.max(axis=0) >= bbox[0]).all()
+    )
+
+
+def _inverse_transform_bbox(
+    reference: ComponentReference, bbox: np.ndarray
+) -> np.ndarray:
+    """Returns the bbox in the coordinates of the reference parent."""
+    (xmin, ymin), (xmax, ymax) = bbox
+    points = np.array(((xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)))
+    points = points - np.asarray(reference.origin, dtype=float)
+    if reference.rotation:
+        angle = -np.radians(reference.rotation)
+        c, s = np.cos(angle), np.sin(angle)
+        points = points @ np.array(((c, s), (-s, c)))
+    if reference.magnification is not None:
+        points = points / reference.magnification
+    if reference.x_reflection:
+        points[:, 1] = -points[:, 1]
+    return np.array((points.min(axis=0), points.max(axis=0)))
+
+
+def _query_polygons(
+    component: Component,
+    bbox: np.ndarray,
+    layers: Optional[set],
+    polygons: Polygons,
+) -> None:
+    index = get_index(component)
+    for i in index.polygon_index.query(bbox):
+        layer = index.layers[i]
+        if layers is None or layer in layers:
+            polygons.setdefault(layer, []).append(np.array(index.polygons[i]))
+
+    for i in index.reference_index.query(bbox):
+        reference = index.references[i]
+        parent = reference.ref_cell
+        if isinstance(reference, ComponentReference) and isinstance(parent, Component):
+            child_polygons: Polygons = {}
+            child_bbox = _inverse_transform_bbox(reference, bbox)
+            _query_polygons(parent, child_bbox, layers, child_polygons)
+            child_polygons = reference._transform_polygons(child_polygons)
+        else:
+            child_polygons = reference.get_polygons(by_spec=True)
+
+        for layer, layer_polygons in child_polygons.items():
+            if layers is not None and layer not in layers:
+                continue
+            layer_polygons = [p for p in layer_polygons if _intersects(p, bbox)]
+            if layer_polygons:
+                polygons.setdefault(layer, []).extend(layer_polygons)
+
+
+def query(
+    component: Component,
+    bbox: Sequence[Float2],
+    layers: Optional[LayerSpecs] = None,
+) -> ComponentQuery:
+    """Returns the polygons, references and ports that intersect a region.
+
+    Polygons are tested by their bounding box.
+
+    Args:
+        component: to query.
+        bbox: ((xmin, ymin), (xmax, ymax)) region.
+        layers: only return polygons and ports on these layers. None returns all.
+    """
+    from gdsfactory.pdk import get_layer
+
+    bbox = np.asarray(bbox, dtype=float)
+    layers = None if layers is None else {get_layer(layer) for layer in layers}
+    polygons: Polygons = {}
+    _query_polygons(component, bbox, layers, polygons)
+
+    index = get_index(component)
+    references = [index.references[i] for i in index.reference_index.query(bbox)]
+    ports = [
+        port
+        for port in component.ports.values()
+        if (bbox[0] <= port.center).all()
+        and (port.center <= bbox[1]).all()
+        and (layers is None or tuple(port.layer) in layers)
+    ]
+    return ComponentQuery.construct(
+        polygons=polygons, references=references, ports=ports
+    )
+
+
+def test_spatial_index() -> None:
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 1000, size=(1000, 2))
+    bboxes = np.concatenate((xy, xy + 5), axis=1)
+    index = SpatialIndex(bboxes)
+    bbox = ((100, 100), (300, 200))
+    expected = np.flatnonzero(
+        (bboxes[:, 0] <= 300)
+        & (bboxes[:, 2] >= 100)
+        & (bboxes[:, 1] <= 200)
+        & (bboxes[:, 3] >= 100)
+    )
+    assert np.array_equal(index.query(bbox), expected)
+
+
+def test_query() -> None:
+    import gdsfactory as gf
+
+    c = gf.Component("query_top")
+    mzi = gf.components.mzi()
+    ref = c << mzi
+    ref.rotate(90)
+    ref.movex(100)
+    c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+    c.add_ports(ref.ports)
+
+    bbox = ((-10, -10), (10, 10))
+    q = c.query(bbox)
+    assert list(q.polygons) == [(2, 0)]
+    assert not q.references
+    assert not q.ports
+
+    bbox = c.bbox
+    q = c.query(bbox, layers=[(1, 0)])
+    assert len(q.references) == 1
+    assert len(q.ports) == len(c.ports)
+    flat = c.get_polygons(by_spec=True)
+    assert len(q.polygons[(1, 0)]) == len(flat[(1, 0)])
+
+
+if __name__ == "__main__":
+    test_spatial_index()
+    test_query()
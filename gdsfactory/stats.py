@@ -0,0 +1,184 @@
+"""Per cell statistics of a Component hierarchy.
+
+Reports for each unique cell its polygons, vertices, estimated bytes in memory,
+number of placements in the flattened layout and bytes in the GDS file.
+Computed in one hierarchical pass, without flattening.
+
+.. code::
+
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    df = c.stats(sort_by="flat_vertices")
+    df.to_csv("mzi_stats.csv")
+
+or from the command line
+
+.. code::
+
+    gf tool stats mzi.gds --sort-by gds_bytes --csv mzi_stats.csv
+
+"""
+import pathlib
+from typing import Any, Dict, List
+
+import gdspy
+
+from gdsfactory.component import Component
+from gdsfactory.types import PathType
+
+columns = [
+    "name",
+    "placements",
+    "polygons",
+    "vertices",
+    "references",
+    "ports",
+    "labels",
+    "nbytes",
+    "gds_bytes",
+    "flat_polygons",
+    "flat_vertices",
+]
+
+
+def get_stats(
+    component: Component, unit: float = 1e-6, precision: float = 1e-9
+) -> List[Dict[str, Any]]:
+    """Returns stats for each unique cell of a Component, top cell first.
+
+    name, placements (number of instances in the flattened layout),
+    polygons and vertices of the cell (without references), references, ports,
+    labels, nbytes (estimated memory), gds_bytes (size of the cell records in
+    the GDS file), flat_polygons and flat_vertices (polygons and vertices times
+    placements).
+
+    Args:
+        component: top cell.
+        unit: GDS unit size. 1um by default.
+        precision: GDS database unit. 1nm by default.
+    """
+    from gdsfactory.cache import get_component_size
+    from gdsfactory.export.write_gds import encode_cell, get_cells
+
+    cells = list(get_cells(component, on_duplicate_cell=None))
+    multiplier = unit / precision
+
+    # parents come after their children, so go backwards to count placements
+    placements = {id(cell): 0 for cell in cells}
+    placements[id(component)] = 1
+    for cell in reversed(cells):
+        for ref in cell.references:
+            if not isinstance(ref.ref_cell, gdspy.Cell):
+                continue
+            n = ref.columns * ref.rows if isinstance(ref, gdspy.CellArray) else 1
+            placements[id(ref.ref_cell)] += placements[id(cell)] * n
+
+    stats = []
+    for cell in reversed(cells):
+        polygons = 0
+        vertices = 0
+        for polygonset in cell.polygons:
+            polygons += len(polygonset.polygons)
+            vertices += sum(len(points) for points in polygonset.polygons)
+        for path in cell.paths:
+            path_polygons = path.to_polygonset().polygons
+            polygons += len(path_polygons)
+            vertices += sum(len(points) for points in path_polygons)
+
+        n = placements[id(cell)]
+        stats.append(
+            dict(
+                name=cell.name,
+                placements=n,
+                polygons=polygons,
+                vertices=vertices,
+                references=len(cell.references),
+                ports=len(getattr(cell, "ports", {})),
+                labels=len(cell.labels),
+                nbytes=get_component_size(cell),
+                gds_bytes=len(encode_cell(cell, multiplier)),
+                flat_polygons=polygons * n,
+                flat_vertices=vertices * n,
+            )
+        )
+    return stats
+
+
+def get_dataframe(
+    component: Component, sort_by: str = "gds_bytes", ascending: bool = False
+):
+    """Returns a pandas DataFrame with the stats for each unique cell.
+
+    Args:
+        component: top cell.
+        sort_by: column to sort by (name, placements, polygons, vertices,
+            references, ports, labels, nbytes, gds_bytes, flat_polygons,
+            flat_vertices).
+        ascending: sort order.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(get_stats(component), columns=columns)
+    return df.sort_values(by=sort_by, ascending=ascending, ignore_index=True)
+
+
+def write_csv(component: Component, filepath: PathType, **kwargs) -> pathlib.Path:
+    """Writes the stats for each unique cell in CSV.
+
+    Keyword Args:
+        sort_by: column to sort by.
+        ascending: sort order.
+    """
+    filepath = pathlib.Path(filepath)
+    get_dataframe(component, **kwargs).to_csv(filepath, index=False)
+    return filepath
+
+
+def test_stats() -> None:
+    import gdsfactory as gf
+
+    c = gf.Component("stats")
+    straight = gf.components.straight()
+    c << straight
+    c.add_array(straight, columns=3, rows=2, spacing=(20, 5))
+    mzi = gf.components.mzi()
+    c << mzi
+    c << mzi
+
+    stats = {s["name"]: s for s in get_stats(c)}
+    assert stats[c.name]["placements"] == 1
+    assert stats[mzi.name]["placements"] == 2
+    assert stats[straight.name]["placements"] == 7 + 2 * sum(
+        ref.parent is straight for ref in mzi.references
+    )
+
+    flat = c.flatten()
+    assert sum(s["flat_polygons"] for s in stats.values()) == len(flat.polygons)
+
+    gds_bytes = sum(s["gds_bytes"] for s in stats.values())
+    assert gds_bytes < c.write_gds().stat().st_size
+
+    df = c.stats(sort_by="flat_vertices")
+    assert df["flat_vertices"].is_monotonic_decreasing
+    assert len(df) == len(stats)
+
+
+def test_stats_unnamed() -> None:
+    import warnings
+
+    import gdsfactory as gf
+
+    c = gf.Component()
+    c << gf.components.straight()
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", message=".*Unnamed cells")
+        stats = get_stats(c)
+    assert c.name in {s["name"] for s in stats}
+
+
+if __name__ == "__main__":
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    print(get_dataframe(c).to_string())
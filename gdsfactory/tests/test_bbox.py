@@ -0,0 +1,35 @@
+import numpy as np
+
+import gdsfactory as gf
+
+
+def test_bbox_invalidates_parents() -> None:
+    """Adding polygons to a child Component updates the cached parent bbox."""
+    child = gf.Component("bbox_child")
+    child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    parent = gf.Component("bbox_parent")
+    parent << child
+    top = gf.Component("bbox_top")
+    ref = top << parent
+    ref.rotate(30)
+    assert np.allclose(top.bbox, ref.bbox)
+    assert parent.xmax == 1
+
+    child.add_polygon([(0, 0), (5, 0), (5, 1)], layer=(1, 0))
+    assert parent.xmax == 5
+    assert top.xmax == ref.xmax
+
+
+def test_bbox_rotated_reference() -> None:
+    """Non-manhattan reference bbox from the convex hull matches the polygons."""
+    c = gf.Component("bbox_rotated")
+    ref = c << gf.components.mzi()
+    ref.rotate(33)
+    points = np.concatenate(ref.get_polygons())
+    bbox = np.array((points.min(axis=0), points.max(axis=0)))
+    assert np.allclose(ref.get_bounding_box(), bbox)
+
+
+if __name__ == "__main__":
+    test_bbox_invalidates_parents()
+    test_bbox_rotated_reference()
@@ -0,0 +1,79 @@
+import gc
+
+import gdsfactory as gf
+from gdsfactory.cache import ComponentCache
+
+
+@gf.cell
+def _child(width: float = 1.0) -> gf.Component:
+    c = gf.Component()
+    c.add_polygon([(0, 0), (width, 0), (width, 1)], layer=(1, 0))
+    return c
+
+
+def test_child_of_uncached_parent_is_not_evicted() -> None:
+    cache = gf.get_cache()
+    gf.set_cache(ComponentCache(max_items=2))
+    try:
+        child = _child()
+        parent = gf.Component("uncached_parent")
+        parent << child
+        del child
+
+        for width in (2, 3, 4):
+            _child(width=width)
+
+        assert gf.get_cache().is_pinned("_child")
+        assert parent.references[0].parent is _child(), "child was rebuilt"
+
+        del parent
+        gc.collect()
+        for width in (2, 3, 4):
+            _child(width=width)
+        assert "_child" not in gf.get_cache()
+    finally:
+        gf.set_cache(cache)
+
+
+def test_child_of_evicted_parent_is_not_evicted() -> None:
+    cache = ComponentCache(max_items=1)
+    child = gf.Component("child")
+    cache["child"] = child
+    parent = gf.Component("parent")
+    parent << child
+    cache["parent"] = parent
+    del child
+
+    cache["other"] = gf.Component("other")
+    assert "parent" not in cache
+    assert "child" in cache, "child is still referenced by a live parent"
+    assert parent.references[0].parent is cache["child"]
+
+
+def test_evict_skips_pinned_keys() -> None:
+    class CountingCache(ComponentCache):
+        checks = 0
+
+        def is_pinned(self, key: str) -> bool:
+            CountingCache.checks += 1
+            return super().is_pinned(key)
+
+    cache = CountingCache(max_items=10)
+    parent = gf.Component("parent")
+    for i in range(200):
+        child = gf.Component(f"pinned{i}")
+        parent << child
+        cache[f"pinned{i}"] = child
+
+    CountingCache.checks = 0
+    for i in range(1000):
+        cache[f"other{i}"] = gf.Component(f"other{i}")
+    assert CountingCache.checks < 3 * 1000, "pinned keys are checked once"
+    assert len(cache) == 200
+
+    del parent, child
+    gc.collect()
+    for i in range(400):
+        cache[f"new{i}"] = gf.Component(f"new{i}")
+    assert len(cache) == 10
+    assert list(cache) == [f"new{i}" for i in range(390, 400)]
@@ -19,6 +19,52 @@ def test_validator_error() -> None:
         _dummy2(length="error")
 
 
+@gf.cell
+def _dummy_alias(length: int = 3) -> gf.Component:
+    return _dummy(length=length)
+
+
+def test_alias_is_copied() -> None:
+    c1 = _dummy(length=5)
+    c2 = _dummy_alias(length=5)
+    assert c2 is not c1
+    assert c1.name == "_dummy_length5", c1.name
+    assert c2.name == "_dummy_alias_length5", c2.name
+
+
+def test_signature_defaults() -> None:
+    assert _dummy(3, 0.5) is _dummy()
+    assert _dummy(length=3, wg_width=0.6) is _dummy(wg_width=0.6)
+    assert _dummy(wg_width=0.6).settings.changed == {"wg_width": 0.6}
+
+
+_calls = []
+
+
+@gf.cell
+def _dummy_counted(length: float = 3) -> gf.Component:
+    _calls.append(length)
+    c = gf.Component()
+    c << gf.components.straight(length=length)
+    return c
+
+
+def test_disk_cache(tmp_path) -> None:
+    gf.set_disk_cache(tmp_path)
+    try:
+        c1 = _dummy_counted(length=5)
+        gf.clear_cache()
+        c2 = _dummy_counted(length=5)
+    finally:
+        gf.set_disk_cache(enabled=False)
+
+    assert _calls == [5], _calls
+    assert c2.name == c1.name
+    assert c2.hash_geometry() == c1.hash_geometry()
+    assert c2.settings.full == c1.settings.full
+    assert gf.components.straight(length=5.0) is c2.references[0].parent
+
+
 if __name__ == "__main__":
     # test_raise_error_args()
     test_validator_error()
@@ -0,0 +1,81 @@
+import gdsfactory as gf
+from gdsfactory.routing.check_routes import check_routes
+
+
+def test_check_routes_bundle() -> None:
+    n = 10
+    ports1 = [
+        gf.Port(f"a{i}", center=(i * 10, 0), width=0.5, orientation=90, layer=(1, 0))
+        for i in range(n)
+    ]
+    ports2 = [
+        gf.Port(
+            f"b{i}", center=(i * 5 + 200, 300), width=0.5, orientation=270, layer=(1, 0)
+        )
+        for i in range(n)
+    ]
+    routes = gf.routing.get_bundle(ports1, ports2, separation=5)
+    assert check_routes(routes) == []
+
+    # a route across the bundle collides once with each route
+    route = gf.routing.get_route_from_waypoints([(-50, 280), (400, 280)])
+    collisions = check_routes(routes + [route])
+    assert sorted(index for index, _, _ in collisions) == list(range(n))
+    for index, other, (x, y) in collisions:
+        assert other == n
+        assert y == 280
+        assert abs(x - routes[index].ports[1].x) < 1
+
+
+def test_check_routes_component() -> None:
+    c = gf.Component()
+    mmi1 = c << gf.components.mmi1x2()
+    mmi2 = c << gf.components.mmi1x2()
+    mmi2.move((200, 100))
+    obstacle = c << gf.components.rectangle(size=(10, 10), layer=(1, 0))
+    obstacle.move((100, 30))
+
+    route = gf.routing.get_route(mmi1.ports["o2"], mmi2.ports["o1"])
+    c.add(route.references)
+    assert check_routes([route], c) == []
+
+    route = gf.routing.get_route_from_waypoints([(50, 35), (150, 35)])
+    c.add(route.references)
+    collisions = check_routes([route], c)
+    assert [(index, other) for index, other, _ in collisions] == [(0, obstacle.name)]
+    ((x, y),) = (location for _, _, location in collisions)
+    assert 100 < x < 110 and y == 35
+
+
+def test_check_routes_merges_overlaps() -> None:
+    # route1 is 4 straights along the overlap with route2
+    route1 = gf.routing.get_route_from_waypoints(
+        [(0, 0), (200, 0)], straight_segments=50
+    )
+    route2 = gf.routing.get_route_from_waypoints([(25, 0), (175, 0)])
+    route3 = gf.routing.get_route_from_waypoints(
+        [(-20, 20), (50, 20), (50, -30), (150, -30), (150, 20), (220, 20)]
+    )
+    assert len(route1.references) == 4
+    collisions = check_routes([route1, route2])
+    assert collisions == [(0, 1, (100, 0))]
+
+    # route3 crosses route1 twice, in two separate places
+    collisions = check_routes([route1, route3])
+    assert [(index, other) for index, other, _ in collisions] == [(0, 1), (0, 1)]
+    assert sorted(location for _, _, location in collisions) == [(50, 0), (150, 0)]
+
+
+def test_check_routes_end_to_end() -> None:
+    route1 = gf.routing.get_route_from_waypoints([(0, 0), (100, 0)])
+    route2 = gf.routing.get_route_from_waypoints([(100, 0), (200, 0)])
+    route3 = gf.routing.get_route_from_waypoints([(100, -50), (100, 50)])
+    assert check_routes([route1, route2]) == []
+    assert [(i, j) for i, j, _ in check_routes([route1, route3])] == [(0, 1)]
+
+
+if __name__ == "__main__":
+    test_check_routes_bundle()
+    test_check_routes_component()
+    test_check_routes_merges_overlaps()
+    test_check_routes_end_to_end()
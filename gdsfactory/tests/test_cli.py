@@ -15,5 +15,18 @@ def test_cli() -> None:
     assert result.output.startswith(__version__)
 
 
+def test_cli_stats(tmp_path) -> None:
+    from gdsfactory.components import mzi
+
+    c = mzi()
+    gdspath = c.write_gds(tmp_path / "mzi.gds")
+    csvpath = tmp_path / "mzi.csv"
+    runner = CliRunner()
+    result = runner.invoke(gf, ["tool", "stats", str(gdspath), "--csv", str(csvpath)])
+    assert result.exit_code == 0, result.output
+    assert c.name in result.output
+    assert csvpath.read_text().startswith("name,placements")
+
+
 if __name__ == "__main__":
     test_cli()
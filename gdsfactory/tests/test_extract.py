@@ -0,0 +1,31 @@
+import numpy as np
+
+import gdsfactory as gf
+
+
+def _get_polygons(component, layers):
+    return {
+        layer: sorted(np.round(p, 3).tolist() for p in polygons)
+        for layer, polygons in component.get_polygons(by_spec=True).items()
+        if layer in layers
+    }
+
+
+def test_extract_keeps_hierarchy() -> None:
+    c = gf.components.mzi()
+    layers = [(1, 0)]
+    flat = c.extract(layers=layers)
+    hierarchical = c.extract(layers=layers, flatten=False)
+
+    assert not flat.references
+    assert hierarchical.references
+    assert len(hierarchical.references) == len(c.references)
+    assert hierarchical.get_layers() == {(1, 0)}
+    assert _get_polygons(hierarchical, layers) == _get_polygons(flat, layers)
+
+    dependencies = c.get_dependencies(recursive=True)
+    expected = {cell.name for cell in dependencies if (1, 0) in cell.get_layers()}
+    cells = hierarchical.get_dependencies(recursive=True)
+    assert len(cells) == len(expected), "each unique cell is filtered once"
+    assert {cell.name.rsplit("_[", 1)[0] for cell in cells} == expected
+    assert c.get_layers() != hierarchical.get_layers(), "original is not modified"
@@ -0,0 +1,28 @@
+import os
+
+import gdsfactory as gf
+from gdsfactory.read import gds_index
+from gdsfactory.read.gds_index import get_gds_index
+
+
+def test_gds_index_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(gds_index, "MAX_INDEXES", 2)
+    gf.clear_cache()
+    gdspaths = [
+        gf.components.straight(length=length).write_gds(tmp_path / f"s{length}.gds")
+        for length in (1, 2, 3)
+    ]
+    indexes = [get_gds_index(gdspath) for gdspath in gdspaths]
+    assert len(gds_index._INDEXES) == 2
+    assert get_gds_index(gdspaths[2]) is indexes[2]
+    assert get_gds_index(gdspaths[0]) is not indexes[0], "evicted"
+
+    gf.components.straight(length=5).write_gds(gdspaths[2])
+    stat = gdspaths[2].stat()
+    os.utime(gdspaths[2], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    index = get_gds_index(gdspaths[2])
+    assert index is not indexes[2], "file changed"
+    assert index.top_level() == [gf.components.straight(length=5).name]
+
+    gf.clear_cache()
+    assert not gds_index._INDEXES
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.routing.get_bundle import (
+    get_bundle_same_axis,
+    get_end_straight_lengths,
+    get_min_spacing,
+)
+from gdsfactory.routing.manhattan import (
+    generate_manhattan_waypoints,
+    generate_manhattan_waypoints_batch,
+)
+
+
+def get_ports(n: int = 200, orientation: int = 90):
+    rng = np.random.default_rng(0)
+    ports1 = []
+    ports2 = []
+    for i in range(n):
+        x1, x2 = rng.integers(-300, 300, size=2)
+        y2 = rng.choice([-100, 0, 15, 40, 80, 300])
+        port1 = gf.Port(
+            f"a{i}", center=(x1, 0), width=0.5, orientation=90, layer=(1, 0)
+        )
+        port2 = gf.Port(
+            f"b{i}", center=(x2, y2), width=0.5, orientation=270, layer=(1, 0)
+        )
+        ports1.append(port1.rotate(orientation - 90, center=(0, 0)))
+        ports2.append(port2.rotate(orientation - 90, center=(0, 0)))
+    return ports1, ports2
+
+
+@pytest.mark.parametrize("orientation", [0, 90, 180, 270])
+def test_generate_manhattan_waypoints_batch(orientation) -> None:
+    ports1, ports2 = get_ports(orientation=orientation)
+    end_straight_lengths = np.arange(len(ports1)) % 7 * 5.0
+    waypoints = generate_manhattan_waypoints_batch(
+        ports1, ports2, end_straight_length=end_straight_lengths
+    )
+    for port1, port2, end_straight_length, points in zip(
+        ports1, ports2, end_straight_lengths, waypoints
+    ):
+        points_ref = generate_manhattan_waypoints(
+            port1, port2, end_straight_length=end_straight_length
+        )
+        assert np.allclose(points, points_ref, atol=1e-9)
+
+
+def test_get_bundle_same_axis_waypoints() -> None:
+    c = gf.Component()
+    n = 20
+    ports1 = [
+        gf.Port(f"a{i}", center=(i * 10, 0), width=0.5, orientation=90, layer=(1, 0))
+        for i in range(n)
+    ]
+    ports2 = [
+        gf.Port(
+            f"b{i}", center=(i * 5 + 60, 500), width=0.5, orientation=270, layer=(1, 0)
+        )
+        for i in range(n)
+    ]
+    routes = get_bundle_same_axis(ports1, ports2, separation=5)
+    for route, port1, port2 in zip(routes, ports1, ports2):
+        c.add(route.references)
+        assert np.allclose(route.ports[0].center, port1.center)
+        assert np.allclose(route.ports[1].center, port2.center)
+
+    end_straight_lengths = get_end_straight_lengths(ports1, ports2, separation=5)
+    # ports up to x=120 fan out to the right, the others to the left
+    assert list(end_straight_lengths) == [15 + 5 * i for i in range(12)] + [
+        15 + 5 * i for i in (0, 6, 5, 4, 3, 2, 1, 0)
+    ]
+
+    min_spacing = get_min_spacing(ports1, ports2, sep=5, radius=5)
+    assert min_spacing == 13 * 5 + 2 * 5 + 1
+
+
+if __name__ == "__main__":
+    test_generate_manhattan_waypoints_batch(90)
+    test_get_bundle_same_axis_waypoints()
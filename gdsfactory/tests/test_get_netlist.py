@@ -1,4 +1,5 @@
 import gdsfactory as gf
+from gdsfactory.get_netlist import get_port_mismatches
 
 
 def test_get_netlist_cell_array() -> None:
@@ -7,6 +8,67 @@ def test_get_netlist_cell_array() -> None:
     assert len(n.keys()) == 5
 
 
+def test_get_netlist_tolerance() -> None:
+    """Ports closer than tolerance that round to different grid points."""
+    c = gf.Component()
+    s1 = c << gf.components.straight(length=10)
+    s2 = c << gf.components.straight(length=10)
+    s1.movex(0.0004999)
+    s2.movex(10.0005001)
+    n = c.get_netlist()
+    assert len(n["connections"]) == 1, n["connections"]
+    assert not get_port_mismatches(c)
+
+
+def test_get_port_mismatches() -> None:
+    c = gf.Component()
+    s1 = c << gf.components.straight(length=10)
+    s2 = c << gf.components.straight(length=10, width=0.6)
+    s3 = c << gf.components.straight(length=10)
+    s2.movex(10)
+    s3.rotate(90)
+    s3.movey(-10)
+    n = c.get_netlist()
+    assert len(n["connections"]) == 1, n["connections"]
+
+    mismatches = {m.kind: m for m in get_port_mismatches(c)}
+    assert set(mismatches) == {"width", "orientation"}
+    width = mismatches["width"]
+    assert {width.port1, width.port2} == {f"{s1.name},o2", f"{s2.name},o1"}
+    assert {width.value1, width.value2} == {0.5, 0.6}
+    orientation = mismatches["orientation"]
+    assert {orientation.port1, orientation.port2} == {
+        f"{s1.name},o1",
+        f"{s3.name},o2",
+    }
+
+
+def test_get_netlist_recursive_cache() -> None:
+    c = gf.components.mzi_lattice()
+    netlists = c.get_netlist_recursive()
+    mzi_names = [name for name in netlists if name != c.name]
+    assert mzi_names
+
+    netlists2 = c.get_netlist_recursive()
+    assert netlists2 == netlists
+    assert all(netlists2[name] is netlists[name] for name in netlists)
+    assert c.get_netlist_recursive(full_settings=True)[c.name] is not netlists[c.name]
+
+    c.unlock()
+    assert c.get_netlist_recursive()[c.name] is not netlists[c.name]
+    c.lock()
+
+    # instances of the same cell share the serialized settings
+    c = gf.Component()
+    straight = gf.components.straight(length=3)
+    c << straight
+    c << straight
+    instances = list(c.get_netlist()["instances"].values())
+    assert instances[0] == instances[1]
+    assert instances[0] is not instances[1]
+    assert instances[0]["settings"] is instances[1]["settings"]
+
+
 if __name__ == "__main__":
     c = gf.c.array()
     n = c.get_netlist()
@@ -0,0 +1,60 @@
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.routing.get_route_astar import (
+    SearchBudgetError,
+    _is_apart,
+    get_route_astar,
+    get_routes_astar,
+)
+from gdsfactory.routing.manhattan import RouteError
+
+
+def _get_port(name, center, orientation) -> gf.Port:
+    return gf.Port(
+        name, center=center, orientation=orientation, width=0.5, layer=(1, 0)
+    )
+
+
+def test_get_routes_astar_coarse() -> None:
+    c = gf.Component("test_get_routes_astar_coarse")
+    obstacle = c << gf.components.rectangle(size=(400, 100), layer=(1, 0))
+    obstacle.move((20, -50))
+    ports1 = [_get_port(f"a{i}", (0, y), 180) for i, y in enumerate((30, -30))]
+    ports2 = [_get_port(f"b{i}", (440, y), 0) for i, y in enumerate((30, -30))]
+
+    fine = get_routes_astar(c, ports1, ports2, coarse_factor=1)
+    coarse = get_routes_astar(c, ports1, ports2, coarse_factor=4)
+    for route_fine, route_coarse in zip(fine, coarse):
+        assert route_fine.length <= route_coarse.length <= 1.05 * route_fine.length
+        polygons = [p for ref in route_coarse.references for p in ref.get_polygons()]
+        assert _is_apart(polygons, obstacle.get_polygons(), 7.9)
+
+
+def test_get_route_astar_errors() -> None:
+    c = gf.Component("test_get_route_astar_errors")
+    obstacle = c << gf.components.rectangle(size=(20, 100), layer=(1, 0))
+    obstacle.move((40, -40))
+    port1 = _get_port("a", (0, 0), 0)
+    port2 = _get_port("b", (100, 0), 180)
+    with pytest.raises(SearchBudgetError):
+        get_route_astar(c, port1, port2, max_nodes=10, coarse_factor=1)
+
+    # walls around port1
+    for size, origin in [
+        ((80, 10), (-40, 30)),
+        ((80, 10), (-40, -40)),
+        ((10, 80), (-40, -40)),
+    ]:
+        c.add_ref(gf.components.rectangle(size=size, layer=(1, 0))).move(origin)
+    with pytest.raises(RouteError, match="No route found"):
+        get_route_astar(c, port1, port2)
+
+
+def test_get_routes_astar_fails_fast() -> None:
+    """A net without room for its jog fails near its coarse path."""
+    c = gf.Component("test_get_routes_astar_fails_fast")
+    ports1 = [_get_port(f"a{i}", (0, 20 * i), 0) for i in range(5)]
+    ports2 = [_get_port(f"b{i}", (200, 20 * i + 5), 180) for i in range(5)]
+    with pytest.raises(RouteError, match="No route found"):
+        get_routes_astar(c, ports1, ports2, distance=2, max_nodes=100_000)
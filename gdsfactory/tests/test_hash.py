@@ -6,7 +6,8 @@ Tests are failing for python3.7
 
 
 import gdsfactory as gf
-from gdsfactory.component import hash_file
+from gdsfactory.component import Component, hash_file
+from gdsfactory.gdsdiff.gdsdiff import xor_polygons
 
 
 def test_hash_geometry() -> None:
@@ -18,6 +19,75 @@ def test_hash_geometry() -> None:
     assert h1 != h2
 
 
+def test_hash_geometry_hierarchical() -> None:
+    """Hierarchical hash depends on geometry and reference transformations."""
+    c1 = gf.components.mzi(delta_length=10)
+    c2 = gf.components.mzi(delta_length=10)
+    c3 = gf.components.mzi(delta_length=11)
+    assert c1.hash_geometry(flat=False) == c2.hash_geometry(flat=False)
+    assert c1.hash_geometry(flat=False) != c3.hash_geometry(flat=False)
+    assert c1.hash_geometry(flat=False) != c1.hash_geometry()
+
+    top1 = gf.Component("hash_top1")
+    ref = top1 << c1
+    ref.rotate(90)
+    top2 = gf.Component("hash_top2")
+    top2 << c1
+    assert top1.hash_geometry(flat=False) != top2.hash_geometry(flat=False)
+
+
+def test_hash_geometry_memoized() -> None:
+    """Locked Components rehash after a referenced Component changes."""
+    child = gf.Component("hash_child")
+    child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    parent = gf.Component("hash_parent")
+    parent << child
+    parent.lock()
+    h1 = parent.hash_geometry()
+    h1_hierarchical = parent.hash_geometry(flat=False)
+    assert parent.hash_geometry() == h1
+
+    child.add_polygon([(0, 0), (2, 0), (2, 2)], layer=(1, 0))
+    assert parent.hash_geometry() != h1
+    assert parent.hash_geometry(flat=False) != h1_hierarchical
+
+
+def test_hash_geometry_memoized_edits() -> None:
+    """Locked Components rehash after removing layers or moving a reference."""
+    child = gf.Component("hash_edit_child")
+    child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+    parent = gf.Component("hash_edit_parent")
+    ref = parent << child
+    parent.lock()
+
+    hashes = {parent.hash_geometry(), parent.hash_geometry(flat=False)}
+    parent.remove_layers([(2, 0)])
+    hashes.update([parent.hash_geometry(), parent.hash_geometry(flat=False)])
+    assert len(hashes) == 4
+
+    ref.move((5, 0))
+    hashes.update([parent.hash_geometry(), parent.hash_geometry(flat=False)])
+    assert len(hashes) == 6
+
+
+def test_xor_polygons_hierarchical_hash(monkeypatch) -> None:
+    """xor_polygons only compares hierarchical hashes before the XOR."""
+    hash_geometry = Component.hash_geometry
+    flat_hashes = []
+
+    def spy(self, precision: float = 1e-4, flat: bool = True) -> str:
+        flat_hashes.append(flat)
+        return hash_geometry(self, precision=precision, flat=flat)
+
+    monkeypatch.setattr(Component, "hash_geometry", spy)
+    c1 = gf.components.mzi()
+    c2 = c1.flatten()
+    assert not xor_polygons(c1, c2).polygons
+    assert not xor_polygons(c1, c1).polygons
+    assert not any(flat_hashes)
+
+
 def _test_hash_array_file() -> None:
     """Test hash of a component with an array of references."""
     c = gf.Component("array")
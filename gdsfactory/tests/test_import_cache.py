@@ -0,0 +1,25 @@
+import gdsfactory as gf
+from gdsfactory.read import import_cache
+
+
+def test_import_cache_bounded(tmp_path, monkeypatch) -> None:
+    gf.clear_cache()
+    monkeypatch.setattr(import_cache.IMPORT_CACHE, "max_items", 2)
+    monkeypatch.setattr(import_cache, "MAX_FILE_HASHES", 3)
+    gdspaths = [
+        gf.components.straight(length=length).write_gds(tmp_path / f"s{length}.gds")
+        for length in (1, 2, 3, 4)
+    ]
+
+    top = gf.Component("import_cache_top")
+    top << gf.import_gds(gdspaths[0])
+    for gdspath in gdspaths[1:]:
+        gf.import_gds(gdspath)
+
+    assert len(import_cache.IMPORT_CACHE) == 2
+    assert len(import_cache._FILE_HASHES) == 3
+    assert gf.import_gds(gdspaths[0]) is top.references[0].parent, "referenced"
+
+    gf.clear_cache()
+    assert not import_cache.IMPORT_CACHE
+    assert not import_cache._FILE_HASHES
@@ -0,0 +1,34 @@
+import gdsfactory as gf
+from gdsfactory.executor import get_components, parallel_build
+
+specs = [
+    "mzi",
+    "ring_single",
+    dict(component="mmi2x2", settings=dict(length_mmi=7)),
+    gf.partial(gf.components.straight, length=3),
+    gf.partial(gf.components.spiral_inner_io, length=500),
+]
+
+
+def _get_cells(components):
+    return [
+        sorted((cell.name, cell.hash_geometry()) for cell in c.get_dependencies(True))
+        + [(c.name, c.hash_geometry())]
+        for c in components
+    ]
+
+
+def test_parallel_build_matches_serial() -> None:
+    gf.clear_cache()
+    serial = _get_cells(get_components(specs))
+
+    gf.clear_cache()
+    with parallel_build(max_workers=2):
+        components = get_components(specs)
+    parallel = _get_cells(components)
+
+    assert parallel == serial
+    cache = gf.get_cache()
+    for component in components:
+        for cell in component.get_dependencies(True):
+            assert cache.get(cell.name, cell) is cell, "duplicated cell name"
@@ -0,0 +1,70 @@
+import pickle
+
+import numpy as np
+from phidl.device_layout import Polygon
+
+import gdsfactory as gf
+from gdsfactory.polygon_array import PolygonArray
+
+
+def _get_polygons(component):
+    return {
+        layer: sorted(np.round(p, 3).tolist() for p in polygons)
+        for layer, polygons in component.get_polygons(by_spec=True).items()
+    }
+
+
+def test_compact_polygons_round_trip(tmp_path) -> None:
+    c1 = gf.components.ring_single().flatten()
+    c2 = c1.copy()
+    c2.unlock()
+    c2.compact_polygons()
+    assert all(isinstance(p, PolygonArray) for p in c2.polygons)
+    assert len(c2.polygons) == len(c1.get_layers())
+
+    assert _get_polygons(c2) == _get_polygons(c1)
+    assert c2.hash_geometry() == c1.hash_geometry()
+
+    c3 = pickle.loads(pickle.dumps(c2))
+    assert _get_polygons(c3) == _get_polygons(c1)
+
+    gdspath = c2.write_gds(tmp_path / "compact.gds")
+    c4 = gf.import_gds(gdspath, cellname=c2.name)
+    assert _get_polygons(c4) == _get_polygons(c1)
+
+
+def test_polygon_array_transforms() -> None:
+    polygons = [
+        np.array([(0, 0), (2, 0), (2, 1)]),
+        np.array([(-1, -1), (0, -1), (0, 3), (-1, 3)]),
+    ]
+    p1 = Polygon(polygons[0], gds_layer=1, gds_datatype=0, parent=None)
+    p2 = Polygon(polygons[1], gds_layer=1, gds_datatype=0, parent=None)
+    array = PolygonArray(polygons, layer=1)
+
+    for p in (p1, p2, array):
+        p.rotate(30, center=(1, 1)).move((3, -2)).mirror((0, 0), (1, 1))
+
+    for expected, points in zip((p1, p2), array.polygons):
+        np.testing.assert_allclose(points, expected.polygons[0], atol=1e-9)
+
+
+def test_polygon_array_append(tmp_path) -> None:
+    c = gf.components.ring_single().flatten().copy()
+    c.unlock()
+    c.compact_polygons()
+    array = c.polygons[0]
+    layer = (array.layers[0], array.datatypes[0])
+    expected = _get_polygons(c)
+    triangle = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0]]
+    expected[layer] = sorted(expected[layer] + [triangle])
+
+    array.polygons.append(np.array(triangle))
+    assert len(array.layers) == len(array.datatypes) == len(array.polygons)
+    assert _get_polygons(c) == expected
+
+    gdspath = c.write_gds(tmp_path / "append.gds")
+    assert _get_polygons(gf.import_gds(gdspath, cellname=c.name)) == expected
+
+    array.polygons.pop(0)
+    assert len(array.layers) == len(array.polygons) == len(expected[layer]) - 1
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.port import Port, PortArray
+
+
+def get_direction(port: Port) -> str:
+    angle = port.orientation % 360 if port.orientation is not None else 0
+    if angle <= 45 or angle >= 315:
+        return "E"
+    elif angle <= 135:
+        return "N"
+    elif angle <= 225:
+        return "W"
+    return "S"
+
+
+def sort_clockwise(ports):
+    keys = {
+        "W": lambda p: +p.y,
+        "N": lambda p: +p.x,
+        "E": lambda p: -p.y,
+        "S": lambda p: -p.x,
+    }
+    sorted_ports = []
+    for direction in "WNES":
+        side = [p for p in ports if get_direction(p) == direction]
+        sorted_ports += sorted(side, key=keys[direction])
+    return sorted_ports
+
+
+def get_ports():
+    rng = np.random.default_rng(0)
+    orientations = [None, 0, 45, 90, 135, 180, 225, 270, 315, 30.5]
+    return {
+        f"o{i}": Port(
+            name=f"o{i}",
+            center=rng.integers(-5, 5, size=2) + rng.choice([0, 0.1, 0.25], size=2),
+            width=float(rng.choice([0.5, 1.0])),
+            orientation=orientations[i % len(orientations)],
+            layer=[(1, 0), (2, 0)][i % 2],
+            port_type=["optical", "electrical"][i % 3 == 0],
+        )
+        for i in range(40)
+    }
+
+
+def test_port_array_select() -> None:
+    ports = get_ports()
+    port_array = PortArray(ports)
+    selected = port_array.select(layer=(1, 0), width=0.5, suffix="1")
+    assert selected.ports == [
+        p
+        for name, p in ports.items()
+        if p.layer == (1, 0) and p.width == 0.5 and name.endswith("1")
+    ]
+    selected = port_array.select(layers_excluded=((2, 0),), port_type="electrical")
+    assert selected.ports == [
+        p for p in ports.values() if p.layer != (2, 0) and p.port_type == "electrical"
+    ]
+    assert port_array.select(orientation=90).ports == [
+        p for p in ports.values() if p.orientation == 90
+    ]
+
+
+def test_port_array_sort() -> None:
+    ports = get_ports()
+    port_list = list(ports.values())
+    assert PortArray(ports).sort_clockwise().ports == sort_clockwise(port_list)
+    assert list(gf.port.sort_ports_clockwise(ports).values()) == sort_clockwise(
+        port_list
+    )
+    for direction in "ENWS":
+        assert gf.port.get_ports_facing(ports, direction) == [
+            p for p in port_list if get_direction(p) == direction
+        ]
+
+
+@pytest.mark.parametrize("x_reflection", [False, True])
+@pytest.mark.parametrize("rotation", [None, 90, 180, 33])
+def test_port_array_transform(rotation, x_reflection) -> None:
+    ports = get_ports()
+    ref = ComponentReference(gf.Component())
+    origin = (3.5, 0.3)
+    centers, orientations = PortArray(ports).transform(
+        origin=origin, rotation=rotation, x_reflection=x_reflection
+    )
+    for port, center, orientation in zip(ports.values(), centers, orientations):
+        center_ref, orientation_ref = ref._transform_port(
+            port.center, port.orientation, origin, rotation, x_reflection
+        )
+        assert np.array_equal(center, center_ref)
+        if orientation_ref is None:
+            assert np.isnan(orientation)
+        else:
+            assert orientation == orientation_ref
+
+
+def test_port_slots() -> None:
+    port = Port("o1", center=(0, 0), width=0.5, orientation=0, layer=(1, 0))
+    assert not hasattr(port, "__dict__")
+    with pytest.raises(AttributeError):
+        port.new_orientation = 90
+    port.info["new_orientation"] = 90
+    assert port.copy().info["new_orientation"] == 90
+
+
+if __name__ == "__main__":
+    test_port_array_select()
+    test_port_array_sort()
+    test_port_array_transform(rotation=33, x_reflection=True)
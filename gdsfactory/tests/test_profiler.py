@@ -0,0 +1,45 @@
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.profiler import CellProfiler
+
+
+@gf.cell
+def _failing(fail: bool = True) -> gf.Component:
+    if fail:
+        raise ValueError("failed build")
+    return gf.Component()
+
+
+@gf.cell
+def _parent_of_failing() -> gf.Component:
+    c = gf.Component()
+    try:
+        _failing()
+    except ValueError:
+        pass
+    c << _failing(fail=False)
+    return c
+
+
+def test_profiler_pops_failed_builds() -> None:
+    with CellProfiler() as profiler:
+        with pytest.raises(ValueError):
+            _failing()
+        assert not profiler._stack
+
+        c = gf.components.straight(length=1.234)
+
+    assert not profiler._stack
+    names = [event["name"] for event in profiler.get_tree()]
+    assert names == ["_failing", c.name], "failed build must not be a parent"
+
+
+def test_profiler_failed_child_build() -> None:
+    with CellProfiler() as profiler:
+        c = _parent_of_failing()
+
+    (root,) = profiler.get_tree()
+    assert root["name"] == c.name
+    children = [child["name"] for child in root["children"]]
+    assert children == ["_failing", "_failing_failFalse"]
@@ -0,0 +1,63 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.routing.manhattan import round_corners, round_corners_batch
+
+
+def get_points_list(n: int = 50):
+    rng = np.random.default_rng(0)
+    points_list = []
+    for _ in range(n):
+        point = rng.integers(-500, 500, size=2).astype(float)
+        points = [point]
+        horizontal = rng.random() < 0.5
+        for _ in range(rng.integers(1, 6)):
+            step = rng.choice([-1, 1]) * rng.integers(5, 200) + rng.choice([0, 0.5])
+            point = point + ((step, 0) if horizontal else (0, step))
+            points.append(point)
+            horizontal = not horizontal
+        points_list.append(np.array(points))
+    return points_list
+
+
+def get_settings(route):
+    references = [
+        (
+            "route" if ref.parent.name.startswith("route_") else ref.parent.name,
+            tuple(np.round(ref.origin, 6)),
+            (ref.rotation or 0) % 360,
+            bool(ref.x_reflection),
+        )
+        for ref in route.references
+    ]
+    ports = [
+        (tuple(np.round(port.center, 6)), port.orientation) for port in route.ports
+    ]
+    return references, ports, route.length
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        dict(auto_widen=True),
+        dict(straight_segments="power_of_two", mirror_straight=True),
+        dict(cross_section="metal3", bend=gf.components.wire_corner),
+    ],
+)
+def test_round_corners_batch(settings) -> None:
+    points_list = get_points_list()
+    with warnings.catch_warnings():
+        # some routes have bends that do not fit
+        warnings.simplefilter("ignore")
+        routes = round_corners_batch(points_list, **settings)
+        routes_ref = [round_corners(points, **settings) for points in points_list]
+    for route, route_ref in zip(routes, routes_ref):
+        assert get_settings(route) == get_settings(route_ref)
+
+
+if __name__ == "__main__":
+    test_round_corners_batch({})
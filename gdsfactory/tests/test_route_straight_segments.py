@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.geometry.boolean import boolean
+from gdsfactory.routing.manhattan import get_straight_segments
+
+
+def test_get_straight_segments() -> None:
+    assert get_straight_segments(13.5) == [13.5]
+    assert get_straight_segments(13.5, "power_of_two") == [8, 4, 1, 0.5]
+    assert get_straight_segments(0.123, "power_of_two") == [
+        0.064,
+        0.032,
+        0.016,
+        0.008,
+        0.002,
+        0.001,
+    ]
+    assert get_straight_segments(0.999, "power_of_two") == [
+        0.5,
+        0.25,
+        0.125,
+        0.064,
+        0.032,
+        0.016,
+        0.008,
+        0.004,
+    ]
+    assert get_straight_segments(25.001, 10) == [10, 10, 4, 1, 0.001]
+    assert get_straight_segments(20, 10) == [10, 10]
+    with pytest.raises(ValueError):
+        get_straight_segments(20, "fibonacci")
+
+
+def get_routes(straight_segments, cross_section=gf.cross_section.strip):
+    c = gf.Component()
+    rng = np.random.default_rng(0)
+    for i in range(20):
+        x1, y1 = rng.integers(30, 500, size=2)
+        y0 = 600 * i
+        points = [(0, y0), (x1, y0), (x1, y0 + y1), (x1 + 100.123, y0 + y1)]
+        route = gf.routing.get_route_from_waypoints(
+            points, straight_segments=straight_segments, cross_section=cross_section
+        )
+        c.add(route.references)
+    return c, route
+
+
+@pytest.mark.parametrize("straight_segments", ["power_of_two", 10])
+@pytest.mark.parametrize("auto_widen", [False, True])
+def test_round_corners_straight_segments(straight_segments, auto_widen) -> None:
+    cross_section = gf.partial(gf.cross_section.strip, auto_widen=auto_widen)
+    c1, route1 = get_routes(None, cross_section=cross_section)
+    c2, route2 = get_routes(straight_segments, cross_section=cross_section)
+
+    assert route1.length == route2.length
+    for port1, port2 in zip(route1.ports, route2.ports):
+        assert np.allclose(port1.center, port2.center)
+        assert port1.orientation == port2.orientation
+    for layer in c1.get_layers():
+        assert not boolean(c1, c2, "xor", layer=layer).get_polygons()
+
+    straights1 = {ref.parent.name for ref in c1.references}
+    straights2 = {ref.parent.name for ref in c2.references}
+    assert len(c2.references) > len(c1.references)
+    if not auto_widen:
+        assert len(straights2) < len(straights1) / 2
+    assert len(c2.get_netlist()["connections"]) == len(c2.references) - 20
+
+
+if __name__ == "__main__":
+    test_get_straight_segments()
+    test_round_corners_straight_segments("power_of_two", False)
@@ -0,0 +1,26 @@
+import gdsfactory as gf
+
+
+def test_query_after_edits() -> None:
+    """Locked Components rebuild their spatial index after they change."""
+    child = gf.Component("query_edit_child")
+    child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    child.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+    c = gf.Component("query_edit_top")
+    ref = c << child
+    c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+    c.lock()
+
+    bbox = ((-1, -1), (2, 2))
+    assert set(c.query(bbox).polygons) == {(1, 0), (2, 0)}
+
+    c.remove_layers([(2, 0)])
+    q = c.query(bbox)
+    assert set(q.polygons) == {(1, 0)}
+    assert len(q.polygons[(1, 0)]) == 1
+
+    ref.move((10, 0))
+    assert not c.query(bbox).polygons
+    q = c.query(((9, -1), (12, 2)))
+    assert len(q.references) == 1
+    assert set(q.polygons) == {(1, 0)}
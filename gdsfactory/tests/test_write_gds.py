@@ -0,0 +1,80 @@
+import warnings
+
+import gdspy
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.component import _timestamp2019
+from gdsfactory.export.write_gds import write_gds
+from gdsfactory.gdsdiff.gdsdiff import xor_polygons
+from gdsfactory.geometry.compute_area import compute_area
+
+
+def _get_cells(gdspath):
+    lib = gdspy.GdsLibrary(infile=gdspath)
+    return {
+        name: {
+            spec: sorted(p.round(3).tolist() for p in polygons)
+            for spec, polygons in cell.get_polygons(by_spec=True, depth=0).items()
+        }
+        for name, cell in lib.cells.items()
+    }
+
+
+def test_write_gds_matches_gdspy(tmp_path) -> None:
+    """The streaming writer writes the same cells as gdspy.GdsLibrary."""
+    c = gf.components.mzi_lattice()
+    lib = gdspy.GdsLibrary(unit=1e-6, precision=1e-9)
+    lib.add(c, include_dependencies=True)
+    lib.write_gds(tmp_path / "gdspy.gds", timestamp=_timestamp2019)
+
+    gdspath = write_gds(c, tmp_path / "stream.gds")
+    assert _get_cells(gdspath) == _get_cells(tmp_path / "gdspy.gds")
+
+
+def test_write_gds_parallel_xor(tmp_path) -> None:
+    """Cells encoded in parallel have the same geometry as the serial ones."""
+    c = gf.grid(
+        [
+            gf.components.mzi_lattice(),
+            gf.components.ring_single(),
+            gf.components.grating_coupler_elliptical_arbitrary(),
+        ]
+    )
+    serial = write_gds(c, tmp_path / "serial.gds")
+    parallel = write_gds(c, tmp_path / "parallel.gds", max_workers=2)
+
+    c1 = gf.import_gds(serial)
+    c2 = gf.import_gds(parallel)
+    assert not xor_polygons(c1, c2, hash_geometry=False).polygons
+    assert _get_cells(parallel) == _get_cells(serial)
+
+
+def test_write_gds_error_keeps_previous_file(tmp_path) -> None:
+    gdspath = write_gds(gf.components.straight(), tmp_path / "c.gds")
+    data = gdspath.read_bytes()
+
+    c = gf.Component("duplicated_cells")
+    c << gf.Component("a")
+    c << gf.Component("a")
+    for max_workers in (1, 2):
+        with pytest.raises(ValueError):
+            write_gds(
+                c, gdspath, on_duplicate_cell="error", max_workers=max_workers
+            )
+        assert gdspath.read_bytes() == data
+        assert list(tmp_path.glob("*")) == [gdspath]
+
+
+def test_unnamed_cells_warning(tmp_path) -> None:
+    c = gf.Component()
+    c << gf.components.straight()
+    c << gf.Component()
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", message=".*Unnamed cells")
+        compute_area(c, layer=(1, 0))
+        c.extract(layers=[(1, 0)], flatten=False)
+
+    with pytest.warns(UserWarning, match="Unnamed cells"):
+        c.write_gds(tmp_path / "unnamed.gds")